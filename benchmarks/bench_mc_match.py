@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark multiple-choice option matching in subset_respondents.
+
+Compares the old regex substring scan (``str.contains(option)``) with the
+exact-token lookup through the cached option index, on a synthetic
+multiple-choice column.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_mc_match.py [--rows 65000] [--options 60]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from so_lib.index import build_option_index, option_index
+
+
+def make_column(n_rows, n_options, seed=0):
+    """Generate ;-delimited answers picking 1-8 options per respondent."""
+    rng = np.random.default_rng(seed)
+    options = np.array([f"Option {i}" for i in range(n_options)] + ['C++', 'C#'], dtype=object)
+    answers = []
+    for size in rng.integers(1, 9, n_rows):
+        answers.append(';'.join(rng.choice(options, size=size, replace=False)))
+    return pd.DataFrame({'Q': answers}), list(options)
+
+
+def timed(func, repeat=3):
+    """Best wall-clock time of ``repeat`` calls, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MC option matching")
+    parser.add_argument('--rows', type=int, default=65000)
+    parser.add_argument('--options', type=int, default=60)
+    args = parser.parse_args()
+
+    raw_data, options = make_column(args.rows, args.options)
+    targets = options[:10]
+
+    regex_ms = timed(lambda: [raw_data['Q'].str.contains(o, na=False) for o in targets])
+    literal_ms = timed(lambda: [raw_data['Q'].str.contains(o, regex=False, na=False) for o in targets])
+    build_ms = timed(lambda: build_option_index(raw_data['Q']))
+    option_index(raw_data, 'Q')
+    lookup_ms = timed(lambda: [option_index(raw_data, 'Q').mask(o) for o in targets])
+
+    print(f"{args.rows} rows, {len(options)} options, {len(targets)} lookups")
+    print(f"  str.contains (regex):    {regex_ms:8.2f} ms")
+    print(f"  str.contains (literal):  {literal_ms:8.2f} ms")
+    print(f"  index build (once):      {build_ms:8.2f} ms")
+    print(f"  index lookups (cached):  {lookup_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,8 @@ except ImportError:
     print("Error: pandas is required. Install it using 'pip install pandas openpyxl'")
     sys.exit(1)
 
+from so_lib.memory import memory_report
+
 # Path to the Stack Overflow 2024 raw data file
 DATA_FILE_PATH = "/Users/mariamhassan/Downloads/Task 3/so_2024_raw.xlsx"
 
@@ -71,6 +73,16 @@ def display_info(dataframes):
         print(f"  Column names: {', '.join(df.columns[:5])}{'...' if len(df.columns) > 5 else ''}")
         print(f"  Memory usage: {df.memory_usage(deep=True).sum() / (1024**2):.2f} MB")
 
+    # Live usage of the whole process against the analysis budget (SO_MEMORY_LIMIT)
+    report = memory_report()
+    print(f"\nProcess memory: {report['usage'] / (1024**2):.2f} MB")
+    if report['limit'] is None:
+        print("Memory budget: none (set SO_MEMORY_LIMIT, e.g. 4G, to enable chunking and spilling)")
+    else:
+        print(f"Memory budget: {report['limit'] / (1024**2):.2f} MB "
+              f"({report['usage'] / report['limit'] * 100:.1f}% used, "
+              f"{report['available'] / (1024**2):.2f} MB available)")
+
 
 def main():
     """Main function to parse arguments and execute the script."""
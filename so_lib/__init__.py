@@ -8,13 +8,81 @@ __version__ = '0.1.0'
 
 from .core import (
     load_data,
+    use_data,
+    resolve_data_path,
+    preload,
+    append_responses,
     list_questions,
     search_questions,
-    search_options
+    search_options,
+    question_info,
+    validation_report,
+    convert_data
 )
 
 from .analysis import (
+    respondents,
+    count_respondents,
     subset_respondents,
+    subset_where,
     distribution_sc,
-    distribution_mc
-)
\ No newline at end of file
+    distribution_mc,
+    groupby_stat,
+    crosstab
+)
+
+from .ordinal import (
+    register_ordinal,
+    ordinal_distribution,
+    ordinal_crosstab
+)
+
+from .derived import (
+    register_derived,
+    derived_columns,
+    bucket,
+    matches,
+    option_count
+)
+
+from .cooccurrence import (
+    cooccurrence_matrix,
+    top_pairs,
+    frequent_itemsets,
+    top_combinations
+)
+
+from .paired import (
+    paired_questions,
+    paired_metrics,
+    all_paired_metrics
+)
+
+from .cube import (
+    build_cube,
+    load_cube,
+    cube_distribution
+)
+
+from .similarity import (
+    encode_respondents,
+    similar_respondents,
+    cluster_respondents
+)
+
+from .significance import (
+    compare,
+    compare_all
+)
+
+from .text import (
+    text_index,
+    search_text
+)
+
+from .report import build_report
+
+from .memory import memory_report
+
+from .query import parse_query
+from .subset import Subset
\ No newline at end of file
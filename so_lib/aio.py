@@ -0,0 +1,224 @@
+"""
+Asyncio interface for the Stack Overflow Survey Data Analysis Library.
+
+This module provides awaitable versions of the library's loading and
+query functions for use in asyncio applications. Each coroutine runs the synchronous function on
+the event loop's default executor, so parsing and indexing never block
+the loop::
+
+    from so_lib import aio
+
+    await aio.preload('so_2024_raw.xlsx')
+    dist = await aio.distribution_sc('MainBranch')
+"""
+
+import asyncio
+import contextvars
+import functools
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from . import analysis, cooccurrence, core, ordinal, paired, significance, similarity, text
+from . import cube as cube_module
+from .sampling import Estimate, SampleSize
+from .subset import Subset
+
+
+async def _run(func, *args, **kwargs):
+    """Run a synchronous function on the default executor, in the caller's context (see core.use_data)."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
+
+
+async def preload(file_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Awaitable version of so_lib.core.preload; resolves to the loaded data."""
+    return await asyncio.wrap_future(core.preload(file_path))
+
+
+async def load_data(file_path: Optional[str] = None, reload: bool = False) -> Dict[str, pd.DataFrame]:
+    """Awaitable version of so_lib.core.load_data."""
+    return await _run(core.load_data, file_path, reload=reload)
+
+
+async def append_responses(source: Union[str, pd.DataFrame], file_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Awaitable version of so_lib.core.append_responses."""
+    return await _run(core.append_responses, source, file_path=file_path)
+
+
+async def list_questions() -> pd.DataFrame:
+    """Awaitable version of so_lib.core.list_questions."""
+    return await _run(core.list_questions)
+
+
+async def search_questions(query: str) -> pd.DataFrame:
+    """Awaitable version of so_lib.core.search_questions."""
+    return await _run(core.search_questions, query)
+
+
+async def search_options(question_id: str, query: str = None) -> Dict[str, Union[str, List[str], Dict[str, int]]]:
+    """Awaitable version of so_lib.core.search_options."""
+    return await _run(core.search_options, question_id, query)
+
+
+async def respondents(expression: Optional[str] = None) -> Subset:
+    """Awaitable version of so_lib.analysis.respondents."""
+    return await _run(analysis.respondents, expression)
+
+
+async def count_respondents(
+    expression: Optional[str] = None,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Union[int, Estimate]:
+    """Awaitable version of so_lib.analysis.count_respondents."""
+    return await _run(analysis.count_respondents, expression, sample=sample, seed=seed)
+
+
+async def subset_respondents(question_id: str, option: str, match: str = 'token') -> pd.DataFrame:
+    """Awaitable version of so_lib.analysis.subset_respondents."""
+    return await _run(analysis.subset_respondents, question_id, option, match=match)
+
+
+async def subset_where(expression: str) -> pd.DataFrame:
+    """Awaitable version of so_lib.analysis.subset_where."""
+    return await _run(analysis.subset_where, expression)
+
+
+async def distribution_sc(
+    question_id: str,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Dict[str, Union[str, Dict[str, float]]]:
+    """Awaitable version of so_lib.analysis.distribution_sc."""
+    return await _run(analysis.distribution_sc, question_id, sample=sample, seed=seed)
+
+
+async def distribution_mc(
+    question_id: str,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Dict[str, Union[str, Dict[str, float]]]:
+    """Awaitable version of so_lib.analysis.distribution_mc."""
+    return await _run(analysis.distribution_mc, question_id, sample=sample, seed=seed)
+
+
+async def groupby_stat(
+    numeric_question_id: str,
+    by_question_id: str,
+    stats: Sequence[str] = ('count', 'mean', 'median')
+) -> Dict[str, Union[str, Dict[str, Dict[str, float]]]]:
+    """Awaitable version of so_lib.analysis.groupby_stat."""
+    return await _run(analysis.groupby_stat, numeric_question_id, by_question_id, stats=stats)
+
+
+async def crosstab(
+    row_question_id: str,
+    column_question_id: str,
+    normalize: Optional[str] = None
+) -> Dict[str, Union[str, pd.DataFrame]]:
+    """Awaitable version of so_lib.analysis.crosstab."""
+    return await _run(analysis.crosstab, row_question_id, column_question_id, normalize=normalize)
+
+
+async def ordinal_distribution(question_id: str) -> Dict[str, object]:
+    """Awaitable version of so_lib.ordinal.ordinal_distribution."""
+    return await _run(ordinal.ordinal_distribution, question_id)
+
+
+async def ordinal_crosstab(ordinal_question_id: str, by_question_id: str) -> Dict[str, object]:
+    """Awaitable version of so_lib.ordinal.ordinal_crosstab."""
+    return await _run(ordinal.ordinal_crosstab, ordinal_question_id, by_question_id)
+
+
+async def compare(
+    question_id: str,
+    segment_a: Union[str, Subset],
+    segment_b: Union[str, Subset],
+    test: str = 'z',
+    correction: str = 'holm',
+    alpha: float = 0.05
+) -> Dict[str, object]:
+    """Awaitable version of so_lib.significance.compare."""
+    return await _run(significance.compare, question_id, segment_a, segment_b,
+                      test=test, correction=correction, alpha=alpha)
+
+
+async def compare_all(
+    segment_a: Union[str, Subset],
+    segment_b: Union[str, Subset],
+    question_ids: Optional[Sequence[str]] = None,
+    test: str = 'z',
+    correction: str = 'holm',
+    alpha: float = 0.05
+) -> pd.DataFrame:
+    """Awaitable version of so_lib.significance.compare_all."""
+    return await _run(significance.compare_all, segment_a, segment_b, question_ids=question_ids,
+                      test=test, correction=correction, alpha=alpha)
+
+
+async def cooccurrence_matrix(question_id: str) -> Dict[str, object]:
+    """Awaitable version of so_lib.cooccurrence.cooccurrence_matrix."""
+    return await _run(cooccurrence.cooccurrence_matrix, question_id)
+
+
+async def top_pairs(question_id: str, n: int = 10, by: str = 'count', min_count: int = 1) -> pd.DataFrame:
+    """Awaitable version of so_lib.cooccurrence.top_pairs."""
+    return await _run(cooccurrence.top_pairs, question_id, n=n, by=by, min_count=min_count)
+
+
+async def frequent_itemsets(question_id: str, min_support: float = 0.05, max_size: int = 3,
+                            top_k: Optional[int] = None) -> pd.DataFrame:
+    """Awaitable version of so_lib.cooccurrence.frequent_itemsets."""
+    return await _run(cooccurrence.frequent_itemsets, question_id,
+                      min_support=min_support, max_size=max_size, top_k=top_k)
+
+
+async def top_combinations(question_id: str, n: int = 10) -> pd.DataFrame:
+    """Awaitable version of so_lib.cooccurrence.top_combinations."""
+    return await _run(cooccurrence.top_combinations, question_id, n=n)
+
+
+async def paired_metrics(prefix: str) -> Dict[str, object]:
+    """Awaitable version of so_lib.paired.paired_metrics."""
+    return await _run(paired.paired_metrics, prefix)
+
+
+async def all_paired_metrics(max_workers: Optional[int] = None) -> Dict[str, Dict[str, object]]:
+    """Awaitable version of so_lib.paired.all_paired_metrics."""
+    return await _run(paired.all_paired_metrics, max_workers=max_workers)
+
+
+async def cube_distribution(question_id: str, where: Optional[str] = None, cube=None) -> Dict[str, object]:
+    """Awaitable version of so_lib.cube.cube_distribution."""
+    return await _run(cube_module.cube_distribution, question_id, where=where, cube=cube)
+
+
+async def search_text(query: str, question_ids: Optional[Sequence[str]] = None, top_k: Optional[int] = 10,
+                      mode: str = 'any', stem: bool = False) -> pd.DataFrame:
+    """Awaitable version of so_lib.text.search_text."""
+    return await _run(text.search_text, query, question_ids=question_ids, top_k=top_k, mode=mode, stem=stem)
+
+
+async def similar_respondents(
+    rows: Union[int, Sequence[int]],
+    n: int = 10,
+    metric: str = 'cosine',
+    question_ids: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Awaitable version of so_lib.similarity.similar_respondents."""
+    return await _run(similarity.similar_respondents, rows, n=n, metric=metric, question_ids=question_ids)
+
+
+async def cluster_respondents(
+    k: int = 8,
+    question_ids: Optional[Sequence[str]] = None,
+    batch_size: int = 1024,
+    iterations: int = 100,
+    top_features: int = 5,
+    seed: Optional[int] = 0
+) -> Dict[str, object]:
+    """Awaitable version of so_lib.similarity.cluster_respondents."""
+    return await _run(similarity.cluster_respondents, k=k, question_ids=question_ids, batch_size=batch_size,
+                      iterations=iterations, top_features=top_features, seed=seed)
@@ -4,17 +4,90 @@ Analysis functionality for the Stack Overflow Survey Data Analysis Library.
 This module provides functions for analyzing the survey data.
 """
 
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
 import pandas as pd
-from .core import load_data, list_questions
+from .core import load_data, list_questions, query_backend, question_info
+from .index import DERIVED_COLUMNS, answer_counts, column, indicator_matrix, option_index, option_vocabulary
+from .query import Predicate, parse_query
+from .sampling import Estimate, SampleSize, draw_sample, estimate_distribution
+from .subset import MC_MATCH_MODES, Subset
 
-def subset_respondents(question_id: str, option: str) -> pd.DataFrame:
+def respondents(expression: Optional[str] = None) -> Subset:
+    """
+    Get a view of the respondents, optionally filtered by an expression.
+
+    The view holds row positions only; chain select() and where() to narrow
+    it and call count(), column(), distribution() or to_frame() on it.
+
+    Args:
+        expression: Optional filter expression (see so_lib.query)
+
+    Returns:
+        Subset of the loaded responses
+
+    Raises:
+        ValueError: If the expression is invalid or references an unknown question
+    """
+    try:
+        data = load_data()
+        view = Subset(data['raw data'], data['schema'])
+        return view.where(expression) if expression else view
+    except Exception as e:
+        print(f"Error creating subset: {e}")
+        raise
+
+def count_respondents(
+    expression: Optional[str] = None,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Union[int, Estimate]:
+    """
+    Count the respondents, optionally those matching a filter expression.
+
+    Args:
+        expression: Optional filter expression (see so_lib.query)
+        sample: Estimate the count from a cached stratified sample instead
+            of all respondents: a fraction in (0, 1] or a number of rows
+            (see so_lib.sampling). None (default) counts exactly.
+        seed: Seed of the sample
+
+    Returns:
+        The number of respondents, or an Estimate of it with the margin of
+        error at 95% confidence if ``sample`` is given
+
+    Raises:
+        ValueError: If the expression or sample is invalid
+    """
+    try:
+        if sample is None:
+            return respondents(expression).count()
+
+        data = load_data()
+        drawn = draw_sample(data['raw data'], sample, seed)
+
+        # The filter only runs over the sampled rows
+        view = Subset(drawn.frame, data['schema'])
+        selected = view.where(expression).rows if expression else view.rows
+        y = np.zeros((len(drawn), 1))
+        y[selected] = 1
+        ratios, margins = drawn.estimate_ratios(y)
+        return Estimate(float(ratios[0] * drawn.population_size), float(margins[0] * drawn.population_size))
+    except Exception as e:
+        print(f"Error counting respondents: {e}")
+        raise
+
+def subset_respondents(question_id: str, option: str, match: str = 'token') -> pd.DataFrame:
     """
     Create a subset of respondents based on their answer to a specific question.
 
     Args:
         question_id: Question identifier
         option: Selected option value
+        match: How options of multiple-choice questions are matched. 'token'
+            (default) selects respondents whose ``;``-delimited answer contains
+            exactly ``option``; 'contains' selects answers that contain
+            ``option`` as a literal substring anywhere.
 
     Returns:
         DataFrame containing only respondents who selected the specified option
@@ -28,39 +101,73 @@ def subset_respondents(question_id: str, option: str) -> pd.DataFrame:
     if not option or not isinstance(option, str):
         raise ValueError("Option must be a non-empty string")
 
-    try:
-        data = load_data()
-        raw_data = data['raw data']
-        schema = data['schema']
-
-        # Check if the question exists
-        if question_id not in raw_data.columns:
-            raise ValueError(f"Question ID '{question_id}' not found in the dataset")
-
-        # Get the question type (SC - single choice, MC - multiple choice)
-        question_type = schema.loc[schema['column'] == question_id, 'type'].iloc[0]
+    if match not in MC_MATCH_MODES:
+        raise ValueError(f"Match mode must be one of: {', '.join(MC_MATCH_MODES)}")
 
-        if question_type == 'SC':
-            # For single-choice questions, do an exact match
-            subset = raw_data[raw_data[question_id] == option]
-        else:
-            # For multiple-choice questions, check if the option is in the string
-            subset = raw_data[raw_data[question_id].str.contains(option, na=False)]
-
-        return subset
+    try:
+        backend = query_backend()
+        if backend is not None and match == 'token' and question_id not in DERIVED_COLUMNS:
+            # Filter in the database instead of loading every response
+            question = question_info(backend.metadata(), question_id)
+            op = 'has' if question['type'] == 'MC' else '=='
+            return backend.select(Predicate(question_id, op, option))
+
+        return respondents().select(question_id, option, match=match).to_frame()
     except Exception as e:
         print(f"Error creating subset: {e}")
         raise
 
-def distribution_sc(question_id: str) -> Dict[str, Union[str, Dict[str, float]]]:
+def subset_where(expression: str) -> pd.DataFrame:
+    """
+    Create a subset of respondents matching a filter expression.
+
+    Args:
+        expression: Filter expression, e.g.
+            ``MainBranch == "I am a developer by profession" and LanguageHaveWorkedWith has "Rust"``
+
+    Returns:
+        DataFrame containing only respondents matching the expression
+
+    Raises:
+        ValueError: If the expression is invalid or references an unknown question
+    """
+    query = parse_query(expression)
+
+    # Derived columns are computed from the loaded responses
+    backend = query_backend() if not any(question_id in DERIVED_COLUMNS for question_id in query.columns) else None
+    if backend is not None:
+        try:
+            # Filter in the database instead of loading every response
+            columns = backend.metadata()['raw data'].columns
+            for column in query.columns:
+                if column not in columns:
+                    raise ValueError(f"Question ID '{column}' not found in the dataset")
+            return backend.select(query.root)
+        except Exception as e:
+            print(f"Error creating subset: {e}")
+            raise
+
+    return respondents(expression).to_frame()
+
+def distribution_sc(
+    question_id: str,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Dict[str, Union[str, Dict[str, float]]]:
     """
     Calculate the distribution of answers for a single-choice question.
 
     Args:
         question_id: Question identifier
+        sample: Estimate the distribution from a cached stratified sample
+            instead of all respondents: a fraction in (0, 1] or a number of
+            rows (see so_lib.sampling). None (default) computes it exactly.
+        seed: Seed of the sample
 
     Returns:
-        Dictionary with question information and distribution of answers
+        Dictionary with question information and distribution of answers.
+        Estimated distributions also have 'margin' (margins of error in
+        percentage points at 95% confidence, by option) and 'sample'.
 
     Raises:
         ValueError: If question_id is invalid or not a single-choice question
@@ -69,50 +176,68 @@ def distribution_sc(question_id: str) -> Dict[str, Union[str, Dict[str, float]]]
         raise ValueError("Question ID must be a non-empty string")
 
     try:
-        data = load_data()
-        raw_data = data['raw data']
-        schema = data['schema']
-
-        # Check if the question exists
-        if question_id not in raw_data.columns:
-            raise ValueError(f"Question ID '{question_id}' not found in the dataset")
-
-        # Get the question type and verify it's a single-choice question
-        question_type = schema.loc[schema['column'] == question_id, 'type'].iloc[0]
-
-        if question_type != 'SC':
-            raise ValueError(f"Question '{question_id}' is not a single-choice question")
+        if sample is not None:
+            data = load_data()
+            question = question_info(data, question_id, expected_type='SC')
+            drawn = draw_sample(data['raw data'], sample, seed)
+
+            # Shares of the sampled respondents who answered the question
+            matrix, options = indicator_matrix(drawn.frame, question_id, 'SC')
+            answered = np.asarray(matrix.sum(axis=1)).ravel() > 0
+            distribution, margin = estimate_distribution(drawn, matrix, options, answered)
+            return {
+                "question_id": question_id,
+                "question_text": question['question_text'],
+                "distribution": distribution,
+                "margin": margin,
+                "sample": drawn.info()
+            }
+
+        backend = query_backend() if question_id not in DERIVED_COLUMNS else None
+        if backend is not None:
+            # Count answers with an indexed GROUP BY instead of loading every response
+            question = question_info(backend.metadata(), question_id, expected_type='SC')
+            value_counts = backend.value_counts(question_id)
+        else:
+            data = load_data()
+            question = question_info(data, question_id, expected_type='SC')
 
-        # Calculate the distribution
-        total_responses = len(raw_data[~raw_data[question_id].isna()])
-        value_counts = raw_data[question_id].value_counts()
+            # Calculate the distribution from the cached answer counts
+            value_counts = answer_counts(data['raw data'], question_id)
+        total_responses = value_counts.sum()
 
         distribution = {
             option: count / total_responses * 100
             for option, count in value_counts.items()
         }
 
-        # Get the question text
-        question_text = schema.loc[schema['column'] == question_id, 'question_text'].iloc[0]
-
         return {
             "question_id": question_id,
-            "question_text": question_text,
+            "question_text": question['question_text'],
             "distribution": distribution
         }
     except Exception as e:
         print(f"Error calculating distribution: {e}")
         raise
 
-def distribution_mc(question_id: str) -> Dict[str, Union[str, Dict[str, float]]]:
+def distribution_mc(
+    question_id: str,
+    sample: Optional[SampleSize] = None,
+    seed: int = 0
+) -> Dict[str, Union[str, Dict[str, float]]]:
     """
     Calculate the distribution of answers for a multiple-choice question.
 
     Args:
         question_id: Question identifier
+        sample: Estimate the distribution from a cached stratified sample,
+            as in distribution_sc. None (default) computes it exactly.
+        seed: Seed of the sample
 
     Returns:
-        Dictionary with question information and distribution of answers
+        Dictionary with question information and distribution of answers.
+        Estimated distributions also have 'margin' and 'sample', as in
+        distribution_sc.
 
     Raises:
         ValueError: If question_id is invalid or not a multiple-choice question
@@ -123,49 +248,212 @@ def distribution_mc(question_id: str) -> Dict[str, Union[str, Dict[str, float]]]
     try:
         data = load_data()
         raw_data = data['raw data']
-        schema = data['schema']
-
-        # Check if the question exists
-        if question_id not in raw_data.columns:
-            raise ValueError(f"Question ID '{question_id}' not found in the dataset")
-
-        # Get the question type and verify it's a multiple-choice question
-        question_type = schema.loc[schema['column'] == question_id, 'type'].iloc[0]
-
-        if question_type != 'MC':
-            raise ValueError(f"Question '{question_id}' is not a multiple-choice question")
-
-        # For multiple-choice questions, we need to count each option separately
-        options_count = {}
+        question = question_info(data, question_id, expected_type='MC')
+
+        if sample is not None:
+            # Shares of all sampled respondents, as for the exact distribution
+            drawn = draw_sample(raw_data, sample, seed)
+            matrix, options = indicator_matrix(drawn.frame, question_id, 'MC')
+            distribution, margin = estimate_distribution(drawn, matrix, options)
+            return {
+                "question_id": question_id,
+                "question_text": question['question_text'],
+                "distribution": distribution,
+                "margin": margin,
+                "sample": drawn.info()
+            }
+
+        # For multiple-choice questions, count each option from the cached index
+        options_count = option_index(raw_data, question_id).counts()
         total_respondents = len(raw_data)
 
-        # Filter out NaN values
-        non_null_data = raw_data[~raw_data[question_id].isna()]
-
-        # Process each respondent's answer
-        for answer in non_null_data[question_id]:
-            if isinstance(answer, str):
-                options = answer.split(';')
-                for option in options:
-                    if option in options_count:
-                        options_count[option] += 1
-                    else:
-                        options_count[option] = 1
-
         # Calculate percentages based on total respondents
         distribution = {
             option: count / total_respondents * 100
             for option, count in options_count.items()
         }
 
-        # Get the question text
-        question_text = schema.loc[schema['column'] == question_id, 'question_text'].iloc[0]
-
         return {
             "question_id": question_id,
-            "question_text": question_text,
+            "question_text": question['question_text'],
             "distribution": distribution
         }
     except Exception as e:
         print(f"Error calculating distribution: {e}")
-        raise
\ No newline at end of file
+        raise
+
+GROUP_STATS = ('count', 'mean', 'median', 'std', 'min', 'max', 'sum')
+
+def groupby_stat(
+    numeric_question_id: str,
+    by_question_id: str,
+    stats: Sequence[str] = ('count', 'mean', 'median')
+) -> Dict[str, Union[str, Dict[str, Dict[str, float]]]]:
+    """
+    Calculate statistics of a numeric question for each answer to another question.
+
+    For multiple-choice groupings a respondent counts toward every option
+    they selected. All groups are computed in one grouped aggregation over
+    (row, option) pairs from the cached option index, without copying the
+    responses of each group.
+
+    Args:
+        numeric_question_id: Question with numeric answers, e.g. 'ConvertedCompYearly'.
+            Non-numeric answers are ignored.
+        by_question_id: Single- or multiple-choice question to group by
+        stats: Statistics to compute, any of: count, mean, median, std, min, max, sum
+
+    Returns:
+        Dictionary with both question IDs and the statistics for each group,
+        ordered by number of numeric answers (descending)
+
+    Raises:
+        ValueError: If a question ID or statistic is invalid
+    """
+    for question_id in (numeric_question_id, by_question_id):
+        if not question_id or not isinstance(question_id, str):
+            raise ValueError("Question ID must be a non-empty string")
+
+    stats = list(stats)
+    unknown = [stat for stat in stats if stat not in GROUP_STATS]
+    if not stats or unknown:
+        raise ValueError(f"Statistics must be chosen from: {', '.join(GROUP_STATS)}")
+
+    try:
+        data = load_data()
+        raw_data = data['raw data']
+        question_info(data, numeric_question_id)
+        by_question = question_info(data, by_question_id)
+
+        values = pd.to_numeric(column(raw_data, numeric_question_id), errors='coerce').to_numpy(dtype=float)
+
+        # (row, group) pairs: one per selected option for MC, one per answer for SC
+        if by_question['type'] == 'MC':
+            index = option_index(raw_data, by_question_id)
+            rows, codes = index.codes()
+            groups = index.options
+        else:
+            codes, groups = pd.factorize(column(raw_data, by_question_id))
+            rows = np.flatnonzero(codes >= 0)
+            codes = codes[rows]
+            groups = np.asarray(groups, dtype=object)
+
+        pair_values = values[rows]
+        answered = ~np.isnan(pair_values)
+        pairs = pd.DataFrame({'group': codes[answered], 'value': pair_values[answered]})
+
+        table = pairs.groupby('group')['value'].agg(stats)
+        table = table.reindex(np.arange(len(groups)))
+        if 'count' in stats:
+            table['count'] = table['count'].fillna(0).astype(int)
+
+        sizes = np.bincount(pairs['group'].to_numpy(), minlength=len(groups))
+        order = np.argsort(-sizes, kind='stable')
+
+        statistics = {
+            groups[code]: {
+                stat: (None if pd.isna(table.at[code, stat]) else table.at[code, stat].item())
+                for stat in stats
+            }
+            for code in order
+        }
+
+        return {
+            "question_id": numeric_question_id,
+            "by_question_id": by_question_id,
+            "statistics": statistics
+        }
+    except Exception as e:
+        print(f"Error calculating grouped statistics: {e}")
+        raise
+
+CROSSTAB_NORMALIZE = ('index', 'columns')
+
+def crosstab(
+    row_question_id: str,
+    column_question_id: str,
+    normalize: Optional[str] = None
+) -> Dict[str, Union[str, pd.DataFrame]]:
+    """
+    Cross-tabulate the answers to two questions.
+
+    Respondents count toward every option they selected in multiple-choice
+    questions. The whole table is one sparse product of the two questions'
+    indicator matrices, without building a subset per option.
+
+    Args:
+        row_question_id: Single- or multiple-choice question for the rows
+        column_question_id: Single- or multiple-choice question for the columns
+        normalize: None for respondent counts; 'index' for percentages of
+            each row option's respondents, 'columns' for percentages of each
+            column option's respondents. As in distribution_sc and
+            distribution_mc, percentages over a single-choice question are
+            relative to the respondents who answered it.
+
+    Returns:
+        Dictionary with both question IDs and texts and a 'table' DataFrame
+        indexed by the row question's options, with one column per option of
+        the column question, both ordered by frequency
+
+    Raises:
+        ValueError: If a question ID or normalize is invalid
+    """
+    for question_id in (row_question_id, column_question_id):
+        if not question_id or not isinstance(question_id, str):
+            raise ValueError("Question ID must be a non-empty string")
+
+    if normalize is not None and normalize not in CROSSTAB_NORMALIZE:
+        raise ValueError(f"Normalize must be None or one of: {', '.join(CROSSTAB_NORMALIZE)}")
+
+    try:
+        data = load_data()
+        raw_data = data['raw data']
+        row_question = question_info(data, row_question_id)
+        column_question = question_info(data, column_question_id)
+
+        rows, row_options = indicator_matrix(raw_data, row_question_id, row_question['type'])
+        columns, column_options = indicator_matrix(raw_data, column_question_id, column_question['type'])
+        counts = (rows.T @ columns).toarray().astype(np.int64)
+
+        table = pd.DataFrame(
+            counts,
+            index=pd.Index(row_options, name=row_question_id),
+            columns=pd.Index(column_options, name=column_question_id)
+        )
+
+        if normalize is not None:
+            if normalize == 'index':
+                group, other, other_type = rows, columns, column_question['type']
+            else:
+                group, other, other_type = columns, rows, row_question['type']
+
+            # Respondents the percentages are relative to: everyone for MC,
+            # those who answered for SC
+            if other_type == 'MC':
+                counted = np.ones(len(raw_data))
+            else:
+                counted = np.asarray(other.sum(axis=1)).ravel() > 0
+            totals = group.T @ counted.astype(float)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if normalize == 'index':
+                    table = table.div(np.where(totals > 0, totals, np.nan), axis=0) * 100
+                else:
+                    table = table.div(np.where(totals > 0, totals, np.nan), axis=1) * 100
+
+        row_order = option_vocabulary(raw_data, row_question_id, row_question['type']).index
+        column_order = option_vocabulary(raw_data, column_question_id, column_question['type']).index
+        table = table.reindex(index=row_order, columns=column_order)
+        table.index.name = row_question_id
+        table.columns.name = column_question_id
+
+        return {
+            "row_question_id": row_question_id,
+            "row_question_text": row_question['question_text'],
+            "column_question_id": column_question_id,
+            "column_question_text": column_question['question_text'],
+            "table": table
+        }
+    except Exception as e:
+        print(f"Error calculating crosstab: {e}")
+        raise
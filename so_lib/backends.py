@@ -0,0 +1,503 @@
+"""
+Storage backends for the Stack Overflow Survey Data Analysis Library.
+
+A backend reads a dataset (the 'schema' and 'raw data' tables returned by
+load_data) from one kind of file:
+
+- ExcelBackend: workbooks with one sheet per table, parsed in one call
+- CsvBackend: responses read in chunks, with the schema in a sibling CSV
+  file (e.g. survey_results_public.csv and survey_results_schema.csv)
+- ParquetBackend: responses in a Parquet file with a sibling schema file
+  (requires pyarrow)
+- SqliteBackend: a SQLite database with 'schema' and 'raw_data' tables
+
+The backend is chosen by file extension, or by a URI scheme that takes
+precedence over the extension, e.g. ``sqlite:///survey.db`` (relative) or
+``csv:////data/export.txt`` (absolute). The SQLite backend can also answer
+single-choice distributions and filter expressions with indexed SQL
+queries, without loading the responses into memory.
+"""
+
+import importlib.util
+import os
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .index import MC_SEPARATOR
+from .query import And, Node, Not, Or, Predicate
+
+# Number of CSV rows parsed at a time
+CSV_CHUNK_SIZE = 50000
+
+SQLITE_SCHEMA_TABLE = 'schema'
+SQLITE_RESPONSES_TABLE = 'raw_data'
+# Position of each response in the original order
+SQLITE_ROW_COLUMN = '_row'
+
+# Schema columns of the official survey_results_schema.csv
+_OFFICIAL_SCHEMA_COLUMNS = {'qname': 'column', 'question': 'question_text'}
+
+# In the official schema every choice question has type 'MC'; its 'selector'
+# tells multiple answers (MAVR, MAHR, MACOL) from single ones (SAVR, DL, ...)
+_MULTIPLE_CHOICE_SELECTORS = ('MAVR', 'MAHR', 'MACOL')
+
+_URI_PATTERN = re.compile(r'^(?P<scheme>[A-Za-z][A-Za-z0-9]+):(?P<path>.*)$')
+
+
+def _quote(identifier: str) -> str:
+    """Quote an SQL identifier."""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def infer_schema(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build a schema for responses that come without one.
+
+    Columns with ``;``-delimited answers are multiple-choice, other text
+    columns single-choice and numeric columns free text (TE), matching how
+    numeric questions are typed in the survey schema.
+
+    Args:
+        raw_data: Survey responses
+
+    Returns:
+        Schema DataFrame with columns column, question_text and type
+    """
+    types = []
+    for column in raw_data.columns:
+        values = raw_data[column]
+        if pd.api.types.is_numeric_dtype(values):
+            types.append('TE')
+        elif values.dropna().astype(str).str.contains(MC_SEPARATOR, regex=False).any():
+            types.append('MC')
+        else:
+            types.append('SC')
+
+    return pd.DataFrame({
+        'column': [str(column) for column in raw_data.columns],
+        'question_text': [str(column) for column in raw_data.columns],
+        'type': types
+    })
+
+
+def _normalize_schema(schema: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the official survey schema to the columns and types load_data uses.
+
+    The official schema names questions in 'qname' and 'question', and types
+    every choice question 'MC' with the kind of choice in 'selector'. Choice
+    questions with a multiple-answer selector become 'MC', other choice
+    questions 'SC'; free-text questions stay 'TE'.
+    """
+    if 'column' not in schema.columns and 'qname' in schema.columns:
+        schema = schema.rename(columns=_OFFICIAL_SCHEMA_COLUMNS)
+
+        if 'selector' in schema.columns and 'type' in schema.columns:
+            selectors = schema['selector'].astype(str).str.strip().str.upper()
+            types = schema['type'].astype(str).str.strip().str.upper()
+            schema = schema.assign(type=np.where(
+                types == 'MC',
+                np.where(selectors.isin(_MULTIPLE_CHOICE_SELECTORS), 'MC', 'SC'),
+                schema['type']
+            ))
+    return schema
+
+
+class Backend:
+    """Reads a dataset from one kind of file."""
+
+    # Whether value_counts() and select() are implemented
+    supports_queries = False
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path to the data file
+        """
+        self.path = path
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path!r})"
+
+    def read(self) -> Dict[str, pd.DataFrame]:
+        """
+        Read the whole dataset.
+
+        Returns:
+            Dictionary of DataFrames with at least 'schema' and 'raw data'
+        """
+        raise NotImplementedError
+
+    def write(self, data: Dict[str, pd.DataFrame]) -> None:
+        """Write a dataset in this backend's format."""
+        raise NotImplementedError
+
+    def metadata(self) -> Dict[str, pd.DataFrame]:
+        """The schema and a zero-row DataFrame with the response columns."""
+        raise NotImplementedError
+
+    def value_counts(self, question_id: str, node: Optional[Node] = None) -> pd.Series:
+        """
+        Number of respondents giving each answer to a question.
+
+        Args:
+            question_id: Question identifier
+            node: Optional filter (see so_lib.query) restricting the respondents
+
+        Returns:
+            Counts of the non-missing answers, most common first
+        """
+        raise NotImplementedError
+
+    def select(self, node: Optional[Node] = None) -> pd.DataFrame:
+        """
+        Responses matching a filter, indexed by their position in the dataset.
+
+        Args:
+            node: Filter (see so_lib.query); None selects every response
+        """
+        raise NotImplementedError
+
+
+class ExcelBackend(Backend):
+    """Excel workbook with one sheet per table."""
+
+    def read(self) -> Dict[str, pd.DataFrame]:
+        # One call parses every sheet, instead of one pass over the file per sheet
+        return pd.read_excel(self.path, sheet_name=None)
+
+    def write(self, data: Dict[str, pd.DataFrame]) -> None:
+        with pd.ExcelWriter(self.path) as writer:
+            for sheet, frame in data.items():
+                frame.to_excel(writer, sheet_name=sheet, index=False)
+
+
+class _FileBackend(Backend):
+    """Responses in one file and the schema in a sibling file."""
+
+    # File extensions of schema files, in order of preference
+    schema_suffixes: Tuple[str, ...] = ('.csv',)
+
+    def schema_path(self) -> Optional[Path]:
+        """
+        Sibling file holding the schema, if there is one.
+
+        For ``survey.csv`` this is ``survey_schema.csv`` or
+        ``survey.schema.csv``; for the official ``survey_results_public.csv``
+        it is also ``survey_results_schema.csv``.
+        """
+        path = Path(self.path)
+        stems = [f"{path.stem}_schema", f"{path.stem}.schema"]
+        if path.stem.endswith('_public'):
+            stems.append(path.stem[:-len('_public')] + '_schema')
+
+        for suffix in self.schema_suffixes:
+            for stem in stems:
+                candidate = path.with_name(stem + suffix)
+                if candidate.exists():
+                    return candidate
+        return None
+
+    def _read_schema(self, path: Path) -> pd.DataFrame:
+        if path.suffix.lower() == '.parquet':
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    def _read_responses(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def read(self) -> Dict[str, pd.DataFrame]:
+        raw_data = self._read_responses()
+        schema_path = self.schema_path()
+        schema = _normalize_schema(self._read_schema(schema_path)) if schema_path else infer_schema(raw_data)
+        return {'schema': schema, 'raw data': raw_data}
+
+    def _schema_target(self) -> Path:
+        path = Path(self.path)
+        return path.with_name(f"{path.stem}_schema{self.schema_suffixes[0]}")
+
+
+class CsvBackend(_FileBackend):
+    """Responses in a CSV file, read a chunk at a time."""
+
+    def _read_responses(self) -> pd.DataFrame:
+        chunks = list(pd.read_csv(self.path, chunksize=CSV_CHUNK_SIZE))
+        if not chunks:
+            return pd.read_csv(self.path)
+        return pd.concat(chunks, ignore_index=True)
+
+    def write(self, data: Dict[str, pd.DataFrame]) -> None:
+        data['raw data'].to_csv(self.path, index=False)
+        data['schema'].to_csv(self._schema_target(), index=False)
+
+
+def _require_parquet_engine() -> None:
+    """Raise ImportError unless pandas can read and write Parquet files."""
+    if importlib.util.find_spec('pyarrow') is None and importlib.util.find_spec('fastparquet') is None:
+        raise ImportError("Parquet files require pyarrow. Install it using 'pip install pyarrow'")
+
+
+class ParquetBackend(_FileBackend):
+    """Responses in a Parquet file."""
+
+    schema_suffixes = ('.parquet', '.csv')
+
+    def _read_responses(self) -> pd.DataFrame:
+        _require_parquet_engine()
+        return pd.read_parquet(self.path)
+
+    def write(self, data: Dict[str, pd.DataFrame]) -> None:
+        _require_parquet_engine()
+        data['raw data'].to_parquet(self.path, index=False)
+        data['schema'].to_parquet(self._schema_target(), index=False)
+
+
+def _to_number(value):
+    """Numeric value of an answer, or None, like pd.to_numeric(errors='coerce')."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_sql(node: Node) -> Tuple[str, List[object]]:
+    """
+    Translate a filter expression node into an SQL condition.
+
+    Conditions are never NULL, so ``not`` matches unanswered questions as
+    in Query.mask. Exact matches compare the column directly and can use
+    its index; numeric comparisons go through the so_number() function
+    that SqliteBackend registers on its connections.
+
+    Args:
+        node: Root of a parsed filter expression (Query.root)
+
+    Returns:
+        Tuple of the SQL condition and its parameters
+    """
+    if isinstance(node, And) or isinstance(node, Or):
+        parts = [filter_sql(child) for child in node.children]
+        joiner = ' AND ' if isinstance(node, And) else ' OR '
+        return '(' + joiner.join(sql for sql, _ in parts) + ')', [p for _, params in parts for p in params]
+
+    if isinstance(node, Not):
+        sql, params = filter_sql(node.child)
+        return f"(NOT {sql})", params
+
+    if not isinstance(node, Predicate):
+        raise ValueError(f"Unsupported filter node: {node!r}")
+
+    column = _quote(node.column)
+    if node.op == 'has':
+        sep = MC_SEPARATOR
+        return (f"({column} IS NOT NULL AND instr('{sep}' || {column} || '{sep}', '{sep}' || ? || '{sep}') > 0)",
+                [node.value])
+    if node.op == 'in':
+        # Numbers match by value, as in Predicate.evaluate
+        numbers = [value for value in node.value if isinstance(value, float)]
+        texts = [value for value in node.value if not isinstance(value, float)]
+        parts = []
+        if texts:
+            parts.append(f"({column} IS NOT NULL AND {column} IN ({', '.join('?' for _ in texts)}))")
+        if numbers:
+            parts.append(f"COALESCE(so_number({column}) IN ({', '.join('?' for _ in numbers)}), 0)")
+        return '(' + ' OR '.join(parts) + ')', texts + numbers
+    if isinstance(node.value, float):
+        op = '=' if node.op == '==' else node.op
+        return f"COALESCE(so_number({column}) {op} ?, 0)", [node.value]
+    if node.op == '==':
+        return f"({column} IS NOT NULL AND {column} = ?)", [node.value]
+    if node.op == '!=':
+        return f"({column} IS NOT NULL AND {column} <> ?)", [node.value]
+    raise ValueError(f"Operator '{node.op}' requires a numeric value")
+
+
+class SqliteBackend(Backend):
+    """
+    SQLite database with a schema table and a table of responses.
+
+    Every schema question except free text gets an index on its column, so
+    distributions and exact-match filters are answered from the indexes.
+    """
+
+    supports_queries = True
+
+    # Metadata per (database path, file signature)
+    _METADATA: Dict[Tuple[str, Tuple[int, int]], Dict[str, pd.DataFrame]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No such file: {self.path}")
+        # Read-only, so a mistyped path can't create an empty database
+        connection = sqlite3.connect(Path(self.path).resolve().as_uri() + '?mode=ro', uri=True)
+        connection.create_function('so_number', 1, _to_number, deterministic=True)
+        return connection
+
+    def read(self) -> Dict[str, pd.DataFrame]:
+        with closing(self._connect()) as connection:
+            schema = pd.read_sql_query(f"SELECT * FROM {_quote(SQLITE_SCHEMA_TABLE)}", connection)
+            raw_data = pd.read_sql_query(
+                f"SELECT * FROM {_quote(SQLITE_RESPONSES_TABLE)} ORDER BY {_quote(SQLITE_ROW_COLUMN)}",
+                connection
+            )
+        raw_data = raw_data.drop(columns=SQLITE_ROW_COLUMN)
+        return {'schema': schema, 'raw data': raw_data}
+
+    def write(self, data: Dict[str, pd.DataFrame]) -> None:
+        schema = data['schema']
+        raw_data = data['raw data'].reset_index(drop=True)
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        with closing(sqlite3.connect(self.path)) as connection:
+            schema.to_sql(SQLITE_SCHEMA_TABLE, connection, index=False)
+            raw_data.to_sql(SQLITE_RESPONSES_TABLE, connection, index=True, index_label=SQLITE_ROW_COLUMN)
+
+            table = _quote(SQLITE_RESPONSES_TABLE)
+            indexed = [SQLITE_ROW_COLUMN] + [
+                question_id for question_id, question_type in zip(schema['column'], schema['type'])
+                if question_type != 'TE' and question_id in raw_data.columns
+            ]
+            for number, column in enumerate(dict.fromkeys(indexed)):
+                connection.execute(f"CREATE INDEX {_quote(f'ix_{number}')} ON {table} ({_quote(column)})")
+            connection.commit()
+
+    def metadata(self) -> Dict[str, pd.DataFrame]:
+        stat = os.stat(self.path)
+        key = (os.path.abspath(self.path), (stat.st_mtime_ns, stat.st_size))
+        cached = self._METADATA.get(key)
+        if cached is None:
+            with closing(self._connect()) as connection:
+                schema = pd.read_sql_query(f"SELECT * FROM {_quote(SQLITE_SCHEMA_TABLE)}", connection)
+                columns = pd.read_sql_query(f"SELECT * FROM {_quote(SQLITE_RESPONSES_TABLE)} LIMIT 0", connection)
+            cached = {'schema': schema, 'raw data': columns.drop(columns=SQLITE_ROW_COLUMN)}
+            self._METADATA[key] = cached
+        return dict(cached)
+
+    def _where(self, node: Optional[Node], conditions: Sequence[str] = ()) -> Tuple[str, List[object]]:
+        """WHERE clause combining fixed conditions with a filter."""
+        conditions = list(conditions)
+        params: List[object] = []
+        if node is not None:
+            sql, params = filter_sql(node)
+            conditions.append(sql)
+        return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+    def value_counts(self, question_id: str, node: Optional[Node] = None) -> pd.Series:
+        column = _quote(question_id)
+        where, params = self._where(node, [f"{column} IS NOT NULL"])
+        sql = (f"SELECT {column}, COUNT(*) FROM {_quote(SQLITE_RESPONSES_TABLE)}{where} "
+               f"GROUP BY {column} ORDER BY COUNT(*) DESC, {column}")
+
+        with closing(self._connect()) as connection:
+            pairs = connection.execute(sql, params).fetchall()
+
+        return pd.Series(
+            [count for _, count in pairs],
+            index=pd.Index([value for value, _ in pairs], name=question_id),
+            name='count',
+            dtype=np.int64
+        )
+
+    def select(self, node: Optional[Node] = None) -> pd.DataFrame:
+        where, params = self._where(node)
+        sql = (f"SELECT * FROM {_quote(SQLITE_RESPONSES_TABLE)}{where} "
+               f"ORDER BY {_quote(SQLITE_ROW_COLUMN)}")
+
+        with closing(self._connect()) as connection:
+            frame = pd.read_sql_query(sql, connection, params=params)
+
+        frame = frame.set_index(SQLITE_ROW_COLUMN)
+        frame.index.name = None
+        return frame
+
+
+BACKENDS = {
+    'xlsx': ExcelBackend,
+    'csv': CsvBackend,
+    'parquet': ParquetBackend,
+    'sqlite': SqliteBackend,
+}
+
+_EXTENSIONS = {
+    '.xlsx': 'xlsx', '.xlsm': 'xlsx', '.xls': 'xlsx', '.ods': 'xlsx',
+    '.csv': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.sqlite': 'sqlite', '.sqlite3': 'sqlite', '.db': 'sqlite',
+}
+
+
+def parse_location(location: str) -> Tuple[str, str]:
+    """
+    Split a data location into a backend name and a file path.
+
+    Args:
+        location: File path, or URI such as ``sqlite:///survey.db``.
+            After ``scheme://``, one more ``/`` starts a relative path and
+            two start an absolute one.
+
+    Returns:
+        Tuple of the backend name (a key of BACKENDS) and the file path
+
+    Raises:
+        ValueError: If the format can't be determined
+    """
+    location = str(location)
+    match = _URI_PATTERN.match(location)
+    if match and match.group('scheme').lower() in BACKENDS:
+        path = match.group('path')
+        if path.startswith('//'):
+            path = path[2:]
+        if path.startswith('/'):
+            path = path[1:]
+        return match.group('scheme').lower(), path
+
+    kind = _EXTENSIONS.get(Path(location).suffix.lower())
+    if kind is None:
+        raise ValueError(
+            f"Unsupported data file format: {location} "
+            f"(expected one of {', '.join(sorted(_EXTENSIONS))} or a {', '.join(BACKENDS)} URI)"
+        )
+    return kind, location
+
+
+def data_location(location: str) -> str:
+    """File path of a data location, without any URI scheme."""
+    try:
+        return parse_location(location)[1]
+    except ValueError:
+        return str(location)
+
+
+def open_backend(location: str) -> Backend:
+    """
+    Backend for a data file, chosen by URI scheme or file extension.
+
+    Args:
+        location: File path or URI (see parse_location)
+
+    Returns:
+        Backend instance; nothing is read until it is used
+    """
+    kind, path = parse_location(location)
+    return BACKENDS[kind](path)
+
+
+def save_data(data: Dict[str, pd.DataFrame], location: str) -> None:
+    """
+    Write a dataset in the format of the target location.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        location: Target file path or URI (see parse_location)
+    """
+    open_backend(location).write(data)
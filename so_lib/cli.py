@@ -2,198 +2,869 @@
 Command-line interface for the Stack Overflow Survey Data Analysis Library.
 
 This module provides a CLI for interacting with the library functions.
+Every command can print human-readable text (the default) or stream its
+results as JSON, JSON Lines or CSV with ``--format``. The ``batch`` command
+runs many commands against one loaded dataset.
 """
 
 import argparse
+import contextlib
+import csv
+import shlex
 import sys
 import json
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
 
-from .core import load_data, list_questions, search_questions, search_options
-from .analysis import subset_respondents, distribution_sc, distribution_mc
+import pandas as pd
+
+from .core import convert_data, load_data, list_questions, search_questions, search_options, use_data
+from .analysis import count_respondents, respondents, distribution_sc, distribution_mc
+from .cooccurrence import PAIR_METRICS, top_pairs
+from .similarity import SIMILARITY_METRICS, cluster_respondents, similar_respondents
+from .memory import chunk_rows, frame_row_bytes
+from .ordinal import natural_order, ordinal_crosstab, ordinal_distribution
+from .report import build_report
+from .significance import CORRECTIONS, TESTS, compare, compare_all
+from .text import search_text
+
+OUTPUT_FORMATS = ('table', 'json', 'jsonl', 'csv')
+
+# Option orders of distributions: most common first, or natural (scale order
+# for ordinal answers such as age ranges, otherwise numbers compared by value)
+DISTRIBUTION_ORDERS = ('frequency', 'natural')
+
+# Number of rows converted to records at a time when streaming DataFrames
+STREAM_CHUNK_SIZE = 10000
+
+QUESTION_COLUMNS = ['question_id', 'type', 'question_text']
+
+def _question_lines(questions):
+    """Yield one line of text per question"""
+    for question_id, question_type, question_text in zip(
+        questions['question_id'], questions['type'], questions['question_text']
+    ):
+        yield f"{question_id} ({question_type}): {question_text}"
+
+def _option_lines(options_data):
+    """Yield the lines of text describing a question's options"""
+    yield f"Options for question: {options_data['question_id']}"
+    for option in options_data['options']:
+        yield f"- {option}"
+
+def _sorted_distribution(dist_data, order='frequency'):
+    """Distribution items sorted by percentage (descending) or in natural order"""
+    if order == 'natural':
+        distribution = dist_data['distribution']
+        return [(option, distribution[option]) for option in natural_order(list(distribution))]
+    return sorted(
+        dist_data['distribution'].items(),
+        key=lambda x: x[1],
+        reverse=True
+    )
+
+def _distribution_lines(dist_data, order='frequency'):
+    """Yield the lines of text describing a distribution"""
+    yield f"Distribution for: {dist_data['question_id']}"
+    yield f"Question: {dist_data['question_text']}"
+    yield "\nOptions:"
+    margin = dist_data.get('margin')
+    if margin is not None:
+        sample = dist_data['sample']
+        yield (f"Estimated from a sample of {sample['size']} of {sample['population']} respondents "
+               f"(± margin at {sample['confidence']:.0%} confidence)")
+    for option, percentage in _sorted_distribution(dist_data, order):
+        if margin is None:
+            yield f"- {option}: {percentage:.2f}%"
+        else:
+            yield f"- {option}: {percentage:.2f}% ± {margin[option]:.2f}"
 
 def format_questions(questions):
     """Format question data for CLI output"""
-    lines = []
-    for _, row in questions.iterrows():
-        lines.append(f"{row['question_id']} ({row['type']}): {row['question_text']}")
-    
-    return "\n".join(lines)
+    return "\n".join(_question_lines(questions))
 
 def format_options(options_data):
     """Format options data for CLI output"""
-    lines = [f"Options for question: {options_data['question_id']}"]
+    return "\n".join(_option_lines(options_data))
+
+def format_distribution(dist_data, order='frequency'):
+    """Format distribution data for CLI output, in one of DISTRIBUTION_ORDERS"""
+    return "\n".join(_distribution_lines(dist_data, order))
+
+def question_records(questions: pd.DataFrame) -> Iterator[Dict]:
+    """Yield one record per question, reading the DataFrame column-wise"""
+    for values in zip(*(questions[column] for column in QUESTION_COLUMNS)):
+        yield dict(zip(QUESTION_COLUMNS, values))
+
+def option_records(options_data: Dict) -> Iterator[Dict]:
+    """Yield one record per option of a question"""
+    frequencies = options_data.get('frequencies', {})
     for option in options_data['options']:
-        lines.append(f"- {option}")
-    
-    return "\n".join(lines)
-
-def format_distribution(dist_data):
-    """Format distribution data for CLI output"""
-    lines = [
-        f"Distribution for: {dist_data['question_id']}",
-        f"Question: {dist_data['question_text']}",
-        "\nOptions:"
-    ]
-    
-    # Sort by percentage (descending)
-    sorted_dist = sorted(
-        dist_data['distribution'].items(), 
-        key=lambda x: x[1], 
-        reverse=True
-    )
-    
-    for option, percentage in sorted_dist:
-        lines.append(f"- {option}: {percentage:.2f}%")
-    
-    return "\n".join(lines)
+        yield {
+            'question_id': options_data['question_id'],
+            'option': option,
+            'frequency': frequencies.get(option)
+        }
 
-def parse_args(args=None):
-    """Parse command-line arguments"""
+def distribution_columns(dist_data: Dict) -> List[str]:
+    """Record columns of a distribution; estimated ones have a margin"""
+    columns = ['question_id', 'option', 'percentage']
+    return columns + ['margin'] if 'margin' in dist_data else columns
+
+def distribution_records(dist_data: Dict, order: str = 'frequency') -> Iterator[Dict]:
+    """Yield one record per option of a distribution, most common first or in natural order"""
+    margin = dist_data.get('margin')
+    for option, percentage in _sorted_distribution(dist_data, order):
+        record = {
+            'question_id': dist_data['question_id'],
+            'option': option,
+            'percentage': percentage
+        }
+        if margin is not None:
+            record['margin'] = margin[option]
+        yield record
+
+def frame_records(frame: pd.DataFrame, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield the rows of a DataFrame as records, converting one chunk at a time"""
+    columns = [str(column) for column in frame.columns]
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for values in zip(*(chunk[column].to_numpy() for column in chunk.columns)):
+            yield dict(zip(columns, values))
+
+class CommandOutput:
+    """Result of a CLI command: structured records plus a text rendering"""
+
+    def __init__(self, columns: List[str], records: Iterable[Dict], text: Callable[[], Iterable[str]]):
+        self.columns = columns
+        self.records = records
+        self.text = text
+
+def _json_default(value):
+    """Convert NumPy scalars and other values json can't serialize"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def write_output(output: CommandOutput, output_format: str = 'table', stream: Optional[TextIO] = None):
+    """
+    Write a command's output, one record or line at a time.
+
+    Args:
+        output: Output of a command
+        output_format: One of 'table', 'json', 'jsonl' or 'csv'
+        stream: Where to write; defaults to sys.stdout
+    """
+    stream = stream or sys.stdout
+
+    if output_format == 'table':
+        for line in output.text():
+            stream.write(f"{line}\n")
+    elif output_format == 'jsonl':
+        for record in output.records:
+            stream.write(json.dumps(record, default=_json_default) + "\n")
+    elif output_format == 'json':
+        stream.write("[")
+        for i, record in enumerate(output.records):
+            stream.write(",\n" if i else "\n")
+            stream.write(json.dumps(record, default=_json_default))
+        stream.write("\n]\n")
+    elif output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=output.columns, lineterminator="\n")
+        writer.writeheader()
+        for record in output.records:
+            writer.writerow(record)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    stream.flush()
+
+def sample_arg(text: str):
+    """Parse --sample: a fraction such as 0.05 or a number of rows such as 5000"""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sample: {text!r} (expected a fraction or a number of rows)")
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser"""
     parser = argparse.ArgumentParser(
         description="Stack Overflow Survey Data Analysis Tool",
         prog="python -m so_lib"
     )
-    
+
+    # Options shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '--data-path',
+        help='Path or URI of the Stack Overflow survey data file (.xlsx, .csv, .parquet, .sqlite)'
+    )
+    common.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='table',
+        help='Output format (default: table)'
+    )
+
+    # Approximate answers from a cached stratified sample
+    sampling = argparse.ArgumentParser(add_help=False)
+    sampling.add_argument(
+        '--sample',
+        type=sample_arg,
+        help='Estimate from a sample: a fraction (e.g. 0.05) or a number of rows (e.g. 5000)'
+    )
+    sampling.add_argument('--seed', type=int, default=0, help='Seed of the sample (default: 0)')
+
     subparsers = parser.add_subparsers(dest='command', help='Commands')
-    
+
     # list-questions command
-    list_parser = subparsers.add_parser(
-        'list-questions', 
+    subparsers.add_parser(
+        'list-questions',
+        parents=[common],
         help='List all survey questions'
     )
-    list_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
-    )
-    
+
     # search-questions command
     search_q_parser = subparsers.add_parser(
-        'search-questions', 
+        'search-questions',
+        parents=[common],
         help='Search for questions by text'
     )
     search_q_parser.add_argument('query', help='Search term')
-    search_q_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
-    )
-    
+
     # search-options command
     search_o_parser = subparsers.add_parser(
-        'search-options', 
+        'search-options',
+        parents=[common],
         help='List options for a specific question'
     )
     search_o_parser.add_argument('question_id', help='Question identifier')
     search_o_parser.add_argument('--query', help='Filter options by search term')
-    search_o_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
-    )
-    
+
     # subset command
     subset_parser = subparsers.add_parser(
-        'subset', 
+        'subset',
+        parents=[common, sampling],
         help='Create a subset of respondents based on an answer'
     )
-    subset_parser.add_argument('question_id', help='Question identifier')
-    subset_parser.add_argument('option', help='Selected option')
+    subset_parser.add_argument('question_id', nargs='?', help='Question identifier')
+    subset_parser.add_argument('option', nargs='?', help='Selected option')
     subset_parser.add_argument(
-        '--output', 
-        help='Output file for the subset data (CSV format)'
+        '--where',
+        help='Filter expression, e.g. \'Q1 == "A" and Q2 has "X"\''
     )
     subset_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
+        '--output',
+        help='Output file for the subset data (CSV format)'
     )
-    
+
     # distribution-sc command
     dist_sc_parser = subparsers.add_parser(
-        'distribution-sc', 
+        'distribution-sc',
+        parents=[common, sampling],
         help='Calculate distribution for a single-choice question'
     )
     dist_sc_parser.add_argument('question_id', help='Question identifier')
     dist_sc_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
+        '--order',
+        choices=DISTRIBUTION_ORDERS,
+        default='frequency',
+        help='Option order (default: frequency; natural orders ranges and scales)'
     )
-    
+
     # distribution-mc command
     dist_mc_parser = subparsers.add_parser(
-        'distribution-mc', 
+        'distribution-mc',
+        parents=[common, sampling],
         help='Calculate distribution for a multiple-choice question'
     )
     dist_mc_parser.add_argument('question_id', help='Question identifier')
     dist_mc_parser.add_argument(
-        '--data-path', 
-        help='Path to the Stack Overflow survey data file'
+        '--order',
+        choices=DISTRIBUTION_ORDERS,
+        default='frequency',
+        help='Option order (default: frequency; natural orders ranges and scales)'
     )
-    
-    return parser.parse_args(args)
+
+    # ordinal command
+    ordinal_parser = subparsers.add_parser(
+        'ordinal',
+        parents=[common],
+        help='Ordered and cumulative distribution of an ordinal question'
+    )
+    ordinal_parser.add_argument('question_id', help='Ordinal question identifier')
+    ordinal_parser.add_argument('--by', help='Break down by the options of another question')
+
+    # cooccurrence command
+    cooc_parser = subparsers.add_parser(
+        'cooccurrence',
+        parents=[common],
+        help='List option pairs of a multiple-choice question picked together'
+    )
+    cooc_parser.add_argument('question_id', help='Question identifier')
+    cooc_parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Number of pairs to list (default: 10)'
+    )
+    cooc_parser.add_argument(
+        '--by',
+        choices=PAIR_METRICS,
+        default='count',
+        help='Ranking metric (default: count)'
+    )
+
+    # search-text command
+    text_parser = subparsers.add_parser(
+        'search-text',
+        parents=[common],
+        help='Search free-text answers (BM25 ranking)'
+    )
+    text_parser.add_argument('query', help='Search terms')
+    text_parser.add_argument(
+        '--question',
+        action='append',
+        dest='question_ids',
+        help='Free-text question to search; repeat for several (default: all)'
+    )
+    text_parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Number of respondents to list (default: 10)'
+    )
+    text_parser.add_argument(
+        '--all-terms',
+        action='store_true',
+        help='Only match answers containing every search term'
+    )
+    text_parser.add_argument(
+        '--stem',
+        action='store_true',
+        help='Match word stems (e.g. "testing" matches "tested")'
+    )
+
+    # compare command
+    compare_parser = subparsers.add_parser(
+        'compare',
+        parents=[common],
+        help='Test which answers differ significantly between two segments'
+    )
+    compare_parser.add_argument(
+        'question_id',
+        nargs='?',
+        help='Question identifier (default: every single- and multiple-choice question)'
+    )
+    compare_parser.add_argument('--a', dest='segment_a', required=True, help='Filter expression of the first segment')
+    compare_parser.add_argument('--b', dest='segment_b', required=True, help='Filter expression of the second segment')
+    compare_parser.add_argument(
+        '--test',
+        choices=TESTS,
+        default='z',
+        help='Two-proportion z-test or 2x2 chi-square test (default: z)'
+    )
+    compare_parser.add_argument(
+        '--correction',
+        choices=CORRECTIONS,
+        default='holm',
+        help='Multiple-comparison correction (default: holm)'
+    )
+    compare_parser.add_argument(
+        '--alpha',
+        type=float,
+        default=0.05,
+        help='Significance level (default: 0.05)'
+    )
+
+    # similar command
+    similar_parser = subparsers.add_parser(
+        'similar',
+        parents=[common],
+        help='Find respondents whose answers are most similar to a respondent'
+    )
+    similar_parser.add_argument('row', type=int, help='Row position of the respondent')
+    similar_parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Number of respondents to list (default: 10)'
+    )
+    similar_parser.add_argument(
+        '--metric',
+        choices=SIMILARITY_METRICS,
+        default='cosine',
+        help='Similarity of the answer sets (default: cosine)'
+    )
+    similar_parser.add_argument(
+        '--question',
+        action='append',
+        dest='question_ids',
+        help='Question to compare on; repeat for several (default: all SC/MC questions)'
+    )
+
+    # cluster command
+    cluster_parser = subparsers.add_parser(
+        'cluster',
+        parents=[common],
+        help='Cluster respondents into personas with mini-batch k-means'
+    )
+    cluster_parser.add_argument(
+        '--k',
+        type=int,
+        default=8,
+        help='Number of clusters (default: 8)'
+    )
+    cluster_parser.add_argument(
+        '--question',
+        action='append',
+        dest='question_ids',
+        help='Question to cluster on; repeat for several (default: all SC/MC questions)'
+    )
+    cluster_parser.add_argument(
+        '--iterations',
+        type=int,
+        default=100,
+        help='Number of mini-batch iterations (default: 100)'
+    )
+    cluster_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1024,
+        help='Respondents per iteration (default: 1024)'
+    )
+    cluster_parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed (default: 0)'
+    )
+    cluster_parser.add_argument(
+        '--output',
+        help='Output file for the cluster of every respondent (CSV format)'
+    )
+
+    # report command
+    report_parser = subparsers.add_parser(
+        'report',
+        parents=[common],
+        help='Write an HTML or Markdown report of distributions and crosstabs'
+    )
+    report_parser.add_argument('output', help='Report file; .md writes Markdown, anything else HTML')
+    report_parser.add_argument(
+        '--question',
+        action='append',
+        dest='question_ids',
+        help='Question to include (repeatable; default: every single- and multiple-choice question)'
+    )
+    report_parser.add_argument(
+        '--crosstab',
+        action='append',
+        default=[],
+        metavar='ROW:COLUMN',
+        help='Crosstab of two questions as row percentages (repeatable)'
+    )
+    report_parser.add_argument('--top', type=int, help='Show only the most common options of each question')
+    report_parser.add_argument('--title', default='Stack Overflow Developer Survey', help='Report title')
+    report_parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Number of worker processes rendering sections (default: number of CPUs)'
+    )
+
+    # convert command
+    convert_parser = subparsers.add_parser(
+        'convert',
+        parents=[common],
+        help='Write the survey data in another format (CSV, Parquet or SQLite)'
+    )
+    convert_parser.add_argument(
+        'target',
+        help='File or URI to write, e.g. survey.sqlite; the format follows the extension'
+    )
+
+    # batch command
+    batch_parser = subparsers.add_parser(
+        'batch',
+        help='Run many commands against one loaded dataset'
+    )
+    batch_parser.add_argument(
+        'commands',
+        nargs='?',
+        default='-',
+        help='File with one command per line (default: read from stdin)'
+    )
+    batch_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of commands to run in parallel (default: 1)'
+    )
+    batch_parser.add_argument(
+        '--data-path',
+        help='Path or URI of the Stack Overflow survey data file (.xlsx, .csv, .parquet, .sqlite)'
+    )
+
+    return parser
+
+def parse_args(args=None):
+    """Parse command-line arguments"""
+    return build_parser().parse_args(args)
+
+def run_command(args) -> CommandOutput:
+    """
+    Execute a parsed command.
+
+    Library functions called by the command read the file given with
+    ``--data-path`` (see core.use_data), so it is parsed once and shared
+    through the dataset cache.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        CommandOutput describing the command's results
+    """
+    with use_data(getattr(args, 'data_path', None)):
+        return _dispatch_command(args)
+
+def _dispatch_command(args) -> CommandOutput:
+    """Call the library functions of a command and describe their results"""
+    if args.command == 'list-questions':
+        questions = list_questions()
+        return CommandOutput(
+            QUESTION_COLUMNS,
+            question_records(questions),
+            lambda: _question_lines(questions)
+        )
+
+    if args.command == 'search-questions':
+        questions = search_questions(args.query)
+
+        def text():
+            if questions.empty:
+                return [f"No questions found matching: {args.query}"]
+            return _question_lines(questions)
+
+        return CommandOutput(QUESTION_COLUMNS, question_records(questions), text)
+
+    if args.command == 'search-options':
+        options = search_options(args.question_id, args.query)
+        return CommandOutput(
+            ['question_id', 'option', 'frequency'],
+            option_records(options),
+            lambda: _option_lines(options)
+        )
+
+    if args.command == 'subset' and args.sample is not None:
+        # Only the number of matching respondents can be estimated from a sample
+        if args.output or not args.where or args.question_id or args.option:
+            raise ValueError("--sample estimates the size of a --where subset and can't be combined with --output")
+        estimate = count_respondents(args.where, sample=args.sample, seed=args.seed)
+        summary = {'respondents': estimate.value, 'margin': estimate.margin}
+        lines = [f"Estimated subset size: {estimate.value:.0f} ± {estimate.margin:.0f} respondents (95% confidence)"]
+        return CommandOutput(list(summary), [summary], lambda: lines)
+
+    if args.command == 'subset':
+        # A view of the matching rows; nothing is copied unless rows are written out
+        if args.where:
+            if args.question_id or args.option:
+                raise ValueError("Use either --where or question_id/option, not both")
+            subset = respondents(args.where)
+        elif args.question_id and args.option:
+            subset = respondents().select(args.question_id, args.option)
+        else:
+            raise ValueError("Specify question_id and option, or --where")
+
+        lines = [f"Created subset with {subset.count()} respondents."]
+        if args.output:
+            # Materialized a chunk at a time, so large subsets stay within SO_MEMORY_LIMIT
+            chunk_size = chunk_rows(frame_row_bytes(subset.raw_data), subset.count())
+            with open(args.output, 'w', newline='') as f:
+                for number, frame in enumerate(subset.iter_frames(chunk_size)):
+                    frame.to_csv(f, index=False, header=number == 0)
+                if subset.count() == 0:
+                    pd.DataFrame(columns=subset.columns).to_csv(f, index=False)
+            lines.append(f"Subset saved to {args.output}")
+            summary = {'respondents': subset.count(), 'output': args.output}
+            return CommandOutput(list(summary), [summary], lambda: lines)
+
+        def records():
+            for frame in subset.iter_frames(STREAM_CHUNK_SIZE):
+                yield from frame_records(frame)
+
+        return CommandOutput(
+            [str(column) for column in subset.columns],
+            records(),
+            lambda: lines
+        )
+
+    if args.command in ('distribution-sc', 'distribution-mc'):
+        if args.command == 'distribution-sc':
+            dist = distribution_sc(args.question_id, sample=args.sample, seed=args.seed)
+        else:
+            dist = distribution_mc(args.question_id, sample=args.sample, seed=args.seed)
+        return CommandOutput(
+            distribution_columns(dist),
+            distribution_records(dist, args.order),
+            lambda: _distribution_lines(dist, args.order)
+        )
+
+    if args.command == 'ordinal' and args.by:
+        result = ordinal_crosstab(args.question_id, args.by)
+        cumulative, median = result['cumulative'], result['median']
+
+        def records():
+            for option, counts in result['table'].iterrows():
+                for level, count in counts.items():
+                    yield {
+                        'option': option,
+                        'level': level,
+                        'count': int(count),
+                        'cumulative': cumulative.at[option, level],
+                        'median': median[option]
+                    }
+
+        def text():
+            yield f"Median {args.question_id} by {args.by}:"
+            for option, level in median.items():
+                yield f"- {option}: {level} (mean {result['mean'][option]:.2f})"
+
+        return CommandOutput(['option', 'level', 'count', 'cumulative', 'median'], records(), text)
+
+    if args.command == 'ordinal':
+        dist = ordinal_distribution(args.question_id)
+
+        def records():
+            for level, value in zip(dist['levels'], dist['values']):
+                yield {
+                    'level': level,
+                    'value': value,
+                    'percentage': dist['distribution'][level],
+                    'cumulative': dist['cumulative'][level]
+                }
+
+        def text():
+            yield f"Ordinal distribution for: {dist['question_id']}"
+            yield f"Question: {dist['question_text']}"
+            yield "\nLevels:"
+            for record in records():
+                yield f"- {record['level']}: {record['percentage']:.2f}% (cumulative {record['cumulative']:.2f}%)"
+            yield f"\nMedian: {dist['median']} (mean value {dist['mean']:.2f})"
+
+        return CommandOutput(['level', 'value', 'percentage', 'cumulative'], records(), text)
+
+    if args.command == 'cooccurrence':
+        pairs = top_pairs(args.question_id, n=args.top, by=args.by)
+
+        def text():
+            yield f"Options picked together for: {args.question_id} (by {args.by})"
+            for record in frame_records(pairs):
+                yield (
+                    f"- {record['option_a']} + {record['option_b']}: {record['count']} respondents "
+                    f"({record['support'] * 100:.2f}%, lift {record['lift']:.2f}, "
+                    f"jaccard {record['jaccard']:.2f})"
+                )
+
+        return CommandOutput(list(pairs.columns), frame_records(pairs), text)
+
+    if args.command == 'search-text':
+        hits = search_text(
+            args.query,
+            question_ids=args.question_ids,
+            top_k=args.top,
+            mode='all' if args.all_terms else 'any',
+            stem=args.stem
+        )
+
+        def text():
+            if hits.empty:
+                yield f"No answers found matching: {args.query}"
+                return
+            yield f"Answers matching: {args.query}"
+            for record in frame_records(hits):
+                yield f"- respondent {record['respondent_id']} (row {record['row']}): score {record['score']:.3f}"
+
+        return CommandOutput(list(hits.columns), frame_records(hits), text)
+
+    if args.command == 'compare':
+        options = {'test': args.test, 'correction': args.correction, 'alpha': args.alpha}
+        if args.question_id:
+            results = compare(args.question_id, args.segment_a, args.segment_b, **options)['results']
+            results = results.reset_index()
+            results.insert(0, 'question_id', args.question_id)
+        else:
+            results = compare_all(args.segment_a, args.segment_b, **options)
+
+        def text():
+            yield f"Segment A: {args.segment_a}"
+            yield f"Segment B: {args.segment_b}"
+            yield f"\nSignificant differences ({args.test} test, {args.correction} correction, alpha {args.alpha}):"
+            significant = results[results['significant']]
+            if significant.empty:
+                yield "None"
+            for record in frame_records(significant):
+                yield (
+                    f"- {record['question_id']}: {record['option']}: {record['pct_a']:.2f}% vs "
+                    f"{record['pct_b']:.2f}% (p = {record['p_adjusted']:.3g})"
+                )
+
+        return CommandOutput(list(results.columns), frame_records(results), text)
+
+    if args.command == 'similar':
+        neighbours = similar_respondents(
+            args.row, n=args.top, metric=args.metric, question_ids=args.question_ids
+        )
+
+        def text():
+            yield f"Respondents most similar to row {args.row} ({args.metric}):"
+            for record in frame_records(neighbours):
+                yield f"- respondent {record['respondent_id']} (row {record['neighbor']}): {record['similarity']:.3f}"
+
+        return CommandOutput(list(neighbours.columns), frame_records(neighbours), text)
+
+    if args.command == 'cluster':
+        result = cluster_respondents(
+            k=args.k,
+            question_ids=args.question_ids,
+            batch_size=args.batch_size,
+            iterations=args.iterations,
+            seed=args.seed
+        )
+        total = int(result['sizes'].sum())
+        records = [
+            {
+                'cluster': cluster,
+                'size': int(size),
+                'share': size / total * 100 if total else 0.0,
+                'features': "; ".join(feature for feature, _, _ in result['profiles'][cluster])
+            }
+            for cluster, size in enumerate(result['sizes'])
+        ]
+
+        lines = [f"{args.k} clusters, inertia {result['inertia']:.1f}"]
+        for record in sorted(records, key=lambda r: -r['size']):
+            lines.append(f"- cluster {record['cluster']}: {record['size']} respondents ({record['share']:.2f}%)")
+            for feature, share, lift in result['profiles'][record['cluster']]:
+                lines.append(f"    {feature}: {share * 100:.1f}% (lift {lift:.2f})")
+
+        if args.output:
+            pd.DataFrame({'row': range(len(result['labels'])), 'cluster': result['labels']}).to_csv(
+                args.output, index=False
+            )
+            lines.append(f"Cluster labels saved to {args.output}")
+
+        return CommandOutput(['cluster', 'size', 'share', 'features'], records, lambda: lines)
+
+    if args.command == 'report':
+        crosstabs = []
+        for spec in args.crosstab:
+            row_question_id, _, column_question_id = spec.partition(':')
+            if not row_question_id or not column_question_id:
+                raise ValueError(f"Crosstab must be ROW:COLUMN, got {spec!r}")
+            crosstabs.append((row_question_id, column_question_id))
+
+        summary = build_report(
+            args.output,
+            question_ids=args.question_ids,
+            crosstabs=crosstabs,
+            top=args.top,
+            title=args.title,
+            jobs=args.jobs
+        )
+        lines = [
+            f"Report saved to {summary['output']}: {summary['sections']} sections "
+            f"({summary['rendered']} rendered, {summary['reused']} unchanged)"
+        ]
+        return CommandOutput(list(summary), [summary], lambda: lines)
+
+    if args.command == 'convert':
+        convert_data(args.target)
+        summary = {'output': args.target}
+        return CommandOutput(list(summary), [summary], lambda: [f"Data saved to {args.target}"])
+
+    raise ValueError(f"Unknown command: {args.command}")
+
+def _run_batch_line(line: str, data_path: Optional[str]) -> Dict:
+    """Run one line of a batch and return its JSON record"""
+    record = {'command': line}
+    try:
+        try:
+            args = build_parser().parse_args(shlex.split(line))
+        except SystemExit:
+            raise ValueError("Invalid command")
+        if not args.command:
+            raise ValueError("Please specify a command")
+        if args.command == 'batch':
+            raise ValueError("Batches cannot be nested")
+        if not args.data_path:
+            args.data_path = data_path
+
+        record['results'] = list(run_command(args).records)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+    return record
+
+def run_batch(args, stream: Optional[TextIO] = None):
+    """
+    Run a batch of commands and write one JSON record per command.
+
+    Each non-empty line that does not start with '#' is a command in the
+    usual syntax, e.g. ``distribution-sc MainBranch``. The dataset is
+    loaded once and shared by every command; with ``--jobs`` greater than
+    one, commands run in parallel threads. Records are written in input
+    order, and messages printed by the library go to stderr so that the
+    output stays valid JSON Lines.
+
+    Args:
+        args: Parsed arguments of the batch command
+        stream: Where to write the records; defaults to sys.stdout
+    """
+    stream = stream or sys.stdout
+
+    if args.commands == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.commands) as f:
+            lines = f.read().splitlines()
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line and not line.startswith('#')]
+
+    with contextlib.redirect_stdout(sys.stderr):
+        load_data(args.data_path)
+
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            records = executor.map(lambda line: _run_batch_line(line, args.data_path), lines)
+            for record in records:
+                stream.write(json.dumps(record, default=_json_default) + "\n")
+                stream.flush()
 
 def main(args=None):
     """Main CLI entry point"""
     args = parse_args(args)
-    
+
     if not args.command:
         print("Error: Please specify a command.")
         print("Run 'python -m so_lib --help' for usage information.")
         sys.exit(1)
-    
+
     try:
-        # Execute the appropriate command
-        if args.command == 'list-questions':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            # Force loading the data with the provided path before calling other functions
-            if data_path:
-                load_data(data_path)
-            questions = list_questions()
-            print(format_questions(questions))
-            
-        elif args.command == 'search-questions':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            if data_path:
-                load_data(data_path)
-            questions = search_questions(args.query)
-            if questions.empty:
-                print(f"No questions found matching: {args.query}")
-            else:
-                print(format_questions(questions))
-            
-        elif args.command == 'search-options':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            if data_path:
-                load_data(data_path)
-            options = search_options(args.question_id, args.query)
-            print(format_options(options))
-            
-        elif args.command == 'subset':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            if data_path:
-                load_data(data_path)
-            subset = subset_respondents(args.question_id, args.option)
-            print(f"Created subset with {len(subset)} respondents.")
-            
-            if args.output:
-                subset.to_csv(args.output, index=False)
-                print(f"Subset saved to {args.output}")
-            
-        elif args.command == 'distribution-sc':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            if data_path:
-                load_data(data_path)
-            dist = distribution_sc(args.question_id)
-            print(format_distribution(dist))
-            
-        elif args.command == 'distribution-mc':
-            data_path = args.data_path if hasattr(args, 'data_path') else None
-            if data_path:
-                load_data(data_path)
-            dist = distribution_mc(args.question_id)
-            print(format_distribution(dist))
-            
+        if args.command == 'batch':
+            run_batch(args)
+        else:
+            write_output(run_command(args), args.format)
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
 
+    sys.exit(0)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,238 @@
+"""
+Co-occurrence analysis for the Stack Overflow Survey Data Analysis Library.
+
+This module provides functions for finding which options of a
+multiple-choice question are picked together. All of them work on the
+sparse respondent x option matrix of the question's cached option index.
+"""
+
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .core import load_data, question_info
+from .index import column, option_index
+
+PAIR_METRICS = ('count', 'support', 'lift', 'jaccard')
+
+
+def _mc_question(question_id: str) -> Tuple[pd.DataFrame, str]:
+    """Load the data and check that question_id is a multiple-choice question."""
+    data = load_data()
+    question = question_info(data, question_id, expected_type='MC')
+    return data['raw data'], question['question_text']
+
+
+def cooccurrence_matrix(question_id: str) -> Dict[str, object]:
+    """
+    Calculate pairwise co-occurrence of the options of a multiple-choice question.
+
+    The full option x option count matrix is computed with one sparse
+    matrix product. Lift and Jaccard similarity are derived from it;
+    supports are relative to the respondents who answered the question.
+
+    Args:
+        question_id: Question identifier
+
+    Returns:
+        Dictionary with question information, the number of respondents who
+        answered, and option x option DataFrames 'counts', 'lift' and 'jaccard'.
+        The diagonal of 'counts' holds the number of respondents per option.
+
+    Raises:
+        ValueError: If question_id is invalid or not a multiple-choice question
+    """
+    try:
+        raw_data, question_text = _mc_question(question_id)
+        index = option_index(raw_data, question_id)
+
+        matrix = index.matrix()
+        counts = (matrix.T @ matrix).toarray().astype(np.int64)
+        respondents = int(column(raw_data, question_id).notna().sum())
+
+        singles = np.diag(counts).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lift = counts * respondents / np.outer(singles, singles)
+            jaccard = counts / (singles[:, None] + singles[None, :] - counts)
+
+        options = list(index.options)
+        return {
+            "question_id": question_id,
+            "question_text": question_text,
+            "respondents": respondents,
+            "counts": pd.DataFrame(counts, index=options, columns=options),
+            "lift": pd.DataFrame(np.nan_to_num(lift), index=options, columns=options),
+            "jaccard": pd.DataFrame(np.nan_to_num(jaccard), index=options, columns=options),
+        }
+    except Exception as e:
+        print(f"Error calculating co-occurrence: {e}")
+        raise
+
+
+def top_pairs(question_id: str, n: int = 10, by: str = 'count', min_count: int = 1) -> pd.DataFrame:
+    """
+    Find the option pairs that are most often picked together.
+
+    Args:
+        question_id: Question identifier
+        n: Number of pairs to return
+        by: Ranking metric, one of 'count', 'support', 'lift' or 'jaccard'
+        min_count: Ignore pairs picked together by fewer respondents
+
+    Returns:
+        DataFrame with columns option_a, option_b, count, support, lift and
+        jaccard, sorted by the ranking metric (descending)
+
+    Raises:
+        ValueError: If question_id or by is invalid
+    """
+    if by not in PAIR_METRICS:
+        raise ValueError(f"Ranking metric must be one of: {', '.join(PAIR_METRICS)}")
+
+    result = cooccurrence_matrix(question_id)
+    counts = result['counts'].to_numpy()
+    options = np.asarray(result['counts'].index, dtype=object)
+
+    a, b = np.triu_indices(len(options), k=1)
+    keep = counts[a, b] >= max(min_count, 1)
+    a, b = a[keep], b[keep]
+
+    pairs = pd.DataFrame({
+        'option_a': options[a],
+        'option_b': options[b],
+        'count': counts[a, b],
+        'support': counts[a, b] / max(result['respondents'], 1),
+        'lift': result['lift'].to_numpy()[a, b],
+        'jaccard': result['jaccard'].to_numpy()[a, b],
+    })
+    pairs = pairs.sort_values([by, 'option_a', 'option_b'], ascending=[False, True, True], kind='mergesort')
+    return pairs.head(n).reset_index(drop=True)
+
+
+def frequent_itemsets(question_id: str, min_support: float = 0.05, max_size: int = 3,
+                      top_k: int = None) -> pd.DataFrame:
+    """
+    Find sets of options picked together by at least min_support of respondents.
+
+    Uses level-wise (Apriori) search: candidate sets of size k are built from
+    frequent sets of size k - 1 whose subsets are all frequent, and their
+    support is counted by intersecting the row positions in the option index.
+
+    Args:
+        question_id: Question identifier
+        min_support: Minimum fraction of respondents who answered the question
+        max_size: Largest itemset size to search for
+        top_k: If given, only return the k itemsets with the highest support
+
+    Returns:
+        DataFrame with columns itemset (tuple of options), size, count and
+        support, sorted by support (descending)
+
+    Raises:
+        ValueError: If question_id, min_support or max_size is invalid
+    """
+    if not 0 < min_support <= 1:
+        raise ValueError("Minimum support must be in (0, 1]")
+    if max_size < 1:
+        raise ValueError("Maximum itemset size must be at least 1")
+
+    try:
+        raw_data, _ = _mc_question(question_id)
+        index = option_index(raw_data, question_id)
+        respondents = int(column(raw_data, question_id).notna().sum())
+        min_count = max(int(np.ceil(min_support * respondents)), 1)
+
+        counts = np.diff(index.offsets)
+        level = {
+            (code,): index.rows[index.offsets[code]:index.offsets[code + 1]]
+            for code in np.flatnonzero(counts >= min_count)
+        }
+        found: List[Tuple[Tuple[int, ...], int]] = [(items, len(rows)) for items, rows in level.items()]
+
+        for size in range(2, max_size + 1):
+            frequent = sorted(level)
+            next_level = {}
+            for i, left in enumerate(frequent):
+                for right in frequent[i + 1:]:
+                    if left[:-1] != right[:-1]:
+                        break
+                    candidate = left + (right[-1],)
+                    if any(subset not in level for subset in combinations(candidate, size - 1)):
+                        continue
+                    rows = np.intersect1d(level[left], level[right], assume_unique=True)
+                    if len(rows) >= min_count:
+                        next_level[candidate] = rows
+            if not next_level:
+                break
+            found.extend((items, len(rows)) for items, rows in next_level.items())
+            level = next_level
+
+        itemsets = pd.DataFrame({
+            'itemset': [tuple(index.options[list(items)]) for items, _ in found],
+            'size': [len(items) for items, _ in found],
+            'count': [count for _, count in found],
+        })
+        itemsets['support'] = itemsets['count'] / max(respondents, 1)
+        itemsets = itemsets.sort_values(['count', 'size'], ascending=[False, True], kind='mergesort')
+        if top_k is not None:
+            itemsets = itemsets.head(top_k)
+        return itemsets.reset_index(drop=True)
+    except Exception as e:
+        print(f"Error finding frequent itemsets: {e}")
+        raise
+
+
+def top_combinations(question_id: str, n: int = 10) -> pd.DataFrame:
+    """
+    Find the most common complete answers (exact sets of selected options).
+
+    Each respondent's option set is hashed with two random 64-bit weights
+    per option, so answers are grouped without sorting or joining strings.
+
+    Args:
+        question_id: Question identifier
+        n: Number of combinations to return
+
+    Returns:
+        DataFrame with columns combination (tuple of options), size, count
+        and share of the respondents who answered, sorted by count (descending)
+
+    Raises:
+        ValueError: If question_id is invalid or not a multiple-choice question
+    """
+    try:
+        raw_data, _ = _mc_question(question_id)
+        index = option_index(raw_data, question_id)
+        respondents = int(column(raw_data, question_id).notna().sum())
+
+        rows, codes = index.codes()
+        order = np.argsort(rows, kind='stable')
+        rows, codes = rows[order], codes[order]
+        if len(rows) == 0:
+            return pd.DataFrame(columns=['combination', 'size', 'count', 'share'])
+
+        weights = np.random.default_rng(0).integers(
+            0, np.iinfo(np.uint64).max, size=(2, len(index.options)), dtype=np.uint64, endpoint=True
+        )
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        keys = np.stack([np.add.reduceat(weights[i][codes], starts) for i in range(2)], axis=1)
+
+        _, first, key_counts = np.unique(keys, axis=0, return_index=True, return_counts=True)
+        top = np.argsort(-key_counts, kind='stable')[:n]
+
+        # Read each combination back from one respondent who gave it
+        ends = np.r_[starts[1:], len(codes)]
+        result = pd.DataFrame({
+            'combination': [
+                tuple(index.options[np.sort(codes[starts[first[k]]:ends[first[k]]])]) for k in top
+            ],
+            'count': key_counts[top],
+        })
+        result.insert(1, 'size', result['combination'].map(len))
+        result['share'] = result['count'] / max(respondents, 1)
+        return result
+    except Exception as e:
+        print(f"Error finding top combinations: {e}")
+        raise
@@ -4,10 +4,15 @@ Core functionality for the Stack Overflow Survey Data Analysis Library.
 This module provides functions for loading and exploring the survey data.
 """
 
+import hashlib
 import os
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 try:
     import pandas as pd
@@ -15,37 +20,217 @@ except ImportError:
     print("Error: pandas is required. Install it using 'pip install pandas openpyxl'")
     sys.exit(1)
 
+from .backends import Backend, data_location, open_backend, save_data
+from .index import DERIVED_COLUMNS, answer_counts, cached, extend_frame_cache, has_column, option_index, option_vocabulary
+from .memory import memory_limit, memory_usage
+from .validation import VALIDATION_SUFFIX, ValidationReport, check_dataset
+
 # Use a default path that can work relatively to the script location
 DEFAULT_DATA_PATH = str(Path(__file__).parent.parent / "so_2024_raw.xlsx")
 
-def load_data(file_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+# Data file used by calls that don't name one, set by use_data()
+_CURRENT_DATA_PATH: ContextVar[Optional[str]] = ContextVar('so_lib_data_path', default=None)
+
+# Loaded datasets keyed by absolute path: (file signature, sheets)
+_DATA_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, pd.DataFrame]]] = {}
+
+# Loads in progress keyed by absolute path, so concurrent callers of the
+# same file share one parse (single-flight); guarded by _LOAD_LOCK
+_LOADS: Dict[str, Future] = {}
+_LOAD_LOCK = threading.Lock()
+
+# Serializes append_responses, which replaces cached datasets
+_APPEND_LOCK = threading.Lock()
+
+# Background loads started by preload(), keyed by absolute path
+_PRELOADS: Dict[str, Future] = {}
+_PRELOAD_LOCK = threading.Lock()
+_PRELOAD_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+def file_signature(path: str) -> Tuple[int, int]:
+    """Modification time and size of a data file, used to detect changes."""
+    stat = os.stat(data_location(path))
+    return (stat.st_mtime_ns, stat.st_size)
+
+def resolve_data_path(file_path: Optional[str] = None) -> str:
+    """
+    Data file a function should read.
+
+    In order of precedence: ``file_path``, the file set by use_data(), the
+    SO_DATA_PATH environment variable and DEFAULT_DATA_PATH. Every function
+    that reads the survey data without being given a path goes through
+    this, so all of them read the same file.
+
+    Args:
+        file_path: Path or URI of the data file, if the caller named one
+    """
+    return file_path or _CURRENT_DATA_PATH.get() or os.environ.get('SO_DATA_PATH') or DEFAULT_DATA_PATH
+
+@contextmanager
+def use_data(file_path: Optional[str]) -> Iterator[str]:
     """
-    Load the Stack Overflow survey data from an Excel file.
+    Read a data file in every call made in a block that doesn't name one.
+
+    The setting is local to the current thread or asyncio task, so
+    concurrent callers can use different files::
+
+        with use_data('so_2023.sqlite'):
+            distribution_sc('MainBranch')
 
     Args:
-        file_path: Path to the Excel file. If None, uses default path.
+        file_path: Path or URI of the data file. If None, the setting is
+            left unchanged.
+
+    Yields:
+        The data file in effect inside the block
+    """
+    if not file_path:
+        yield resolve_data_path()
+        return
+
+    token = _CURRENT_DATA_PATH.set(file_path)
+    try:
+        yield file_path
+    finally:
+        _CURRENT_DATA_PATH.reset(token)
+
+def cache_dir() -> Path:
+    """
+    Directory for cache files derived from data files.
+
+    Uses the SO_CACHE_DIR environment variable if it is set, otherwise
+    so_lib under the user cache directory ($XDG_CACHE_HOME or ~/.cache).
+    """
+    directory = os.environ.get('SO_CACHE_DIR')
+    if directory:
+        return Path(directory)
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'so_lib'
+
+def cache_path(file_path: Optional[str], suffix: str) -> Path:
+    """
+    Path of a cache file derived from a data file.
+
+    Cache files live in cache_dir(), which is created if needed. Their
+    names include a digest of the data file's absolute path, so data files
+    with the same name in different directories don't share cache files.
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+        suffix: Suffix identifying the kind of cache, e.g. 'cube.pkl'
 
     Returns:
-        Dictionary of DataFrames, one per sheet in the Excel file
+        Path of the cache file, e.g. so_2024_raw.xlsx.1a2b3c4d.cube.pkl
+    """
+    path = Path(data_location(resolve_data_path(file_path)))
+    digest = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:8]
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{path.name}.{digest}.{suffix}"
+
+def _cache_key(path: str) -> str:
+    """Key of a data file in the caches: its absolute path, without any URI scheme."""
+    return os.path.abspath(data_location(path))
+
+def _is_cached(path: str) -> bool:
+    """Whether the cache holds an up-to-date copy of the file at ``path``."""
+    cached = _DATA_CACHE.get(_cache_key(path))
+    try:
+        return cached is not None and cached[0] == file_signature(path)
+    except OSError:
+        return False
+
+def is_loaded(file_path: Optional[str] = None) -> bool:
+    """
+    Whether a data file is loaded in this process and unchanged on disk.
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+    """
+    return _is_cached(resolve_data_path(file_path))
+
+def loaded_dataset(raw_data: pd.DataFrame) -> Optional[Tuple[str, Tuple[int, int], Dict[str, pd.DataFrame]]]:
+    """
+    The loaded dataset whose responses are ``raw_data``.
+
+    Returns:
+        Tuple of the data file path, its signature and the dataset, or None
+        if ``raw_data`` was not loaded from a file
+    """
+    for key, (signature, data) in list(_DATA_CACHE.items()):
+        if data['raw data'] is raw_data:
+            return key, signature, data
+    return None
+
+def load_data(file_path: Optional[str] = None, reload: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    Load the Stack Overflow survey data.
+
+    The file format is chosen by extension or URI scheme (see
+    so_lib.backends): Excel workbooks, CSV or Parquet responses with a
+    sibling schema file, and SQLite databases. Parsed datasets are cached per path and reused until the file changes
+    on disk. Safe to call from many threads: if the same file is already
+    being loaded (by another caller or a preload()), this waits for that
+    load instead of parsing the file a second time. The returned DataFrames
+    are shared with the cache and every other caller, and must not be
+    modified in place.
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+        reload: Parse the file again even if a cached copy is available
+
+    Returns:
+        Dictionary of DataFrames with at least 'schema' and 'raw data'
+        (one per sheet for Excel files)
     
     Raises:
         FileNotFoundError: If the file doesn't exist
         Exception: For other errors during file loading
     """
-    # Use the provided path or the default path
-    path = file_path or DEFAULT_DATA_PATH
-    
+    # Use the provided path, the one set by use_data() or SO_DATA_PATH
+    path = resolve_data_path(file_path)
+
+    pending = _PRELOADS.get(_cache_key(path))
+    if pending is not None and not reload:
+        wait([pending])
+
+    return _load_dataset(path, reload)
+
+def _load_dataset(path: str, reload: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    Read a data file, or return the cached copy if the file is unchanged.
+
+    The first caller for a file reads it; concurrent callers wait for the
+    same read and share its result (or its exception).
+    """
     try:
-        # Get the Excel file sheet names
-        xlsx = pd.ExcelFile(path)
-        sheet_names = xlsx.sheet_names
+        key = _cache_key(path)
+        signature = file_signature(path)
+
+        cached = _DATA_CACHE.get(key)
+        if cached is not None and cached[0] == signature and not reload:
+            return dict(cached[1])
+
+        with _LOAD_LOCK:
+            cached = _DATA_CACHE.get(key)
+            if cached is not None and cached[0] == signature and not reload:
+                return dict(cached[1])
+            pending = _LOADS.get(key)
+            if pending is None:
+                future = _LOADS[key] = Future()
 
-        # Load each sheet into a dictionary of dataframes
-        dataframes = {}
-        for sheet in sheet_names:
-            dataframes[sheet] = pd.read_excel(path, sheet_name=sheet)
+        if pending is not None:
+            return dict(pending.result())
 
-        return dataframes
+        try:
+            dataframes = _read_dataset(path, key, signature)
+            future.set_result(dataframes)
+            return dict(dataframes)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _LOAD_LOCK:
+                _LOADS.pop(key, None)
     except FileNotFoundError:
         print(f"Error: File not found at {path}")
         raise
@@ -53,6 +238,274 @@ def load_data(file_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
         print(f"Error loading data: {e}")
         raise
 
+def _validation_path(file_path: Optional[str]) -> Optional[Path]:
+    """Where the validation report of a data file is stored, or None if the cache directory can't be created."""
+    try:
+        return cache_path(file_path, VALIDATION_SUFFIX)
+    except OSError:
+        # The cache is an optimization; validate without saving the report
+        return None
+
+def _read_dataset(path: str, key: str, signature: Tuple[int, int]) -> Dict[str, pd.DataFrame]:
+    """Parse and validate a data file and store it in the cache."""
+    dataframes = open_backend(path).read()
+
+    # Validate once per dataset; unchanged datasets only compare fingerprints
+    report = check_dataset(dataframes, _validation_path(path), signature)
+    if report.errors or report.warnings:
+        print(
+            f"Warning: {len(report.errors)} errors and {len(report.warnings)} warnings in {path}; "
+            "see so_lib.validation_report()",
+            file=sys.stderr
+        )
+
+    limit = memory_limit()
+    if limit is not None and memory_usage() > limit:
+        print(
+            f"Warning: memory usage after loading {path} exceeds SO_MEMORY_LIMIT "
+            f"({memory_usage() / 2**20:.0f} MB > {limit / 2**20:.0f} MB)",
+            file=sys.stderr
+        )
+
+    _DATA_CACHE[key] = (signature, dataframes)
+    return dataframes
+
+def _load_and_index(path: str) -> Dict[str, pd.DataFrame]:
+    """Load a data file and build the indexes used by the analysis functions."""
+    data = _load_dataset(path)
+    raw_data = data['raw data']
+    schema = data['schema']
+
+    for question_id, question_type in zip(schema['column'], schema['type']):
+        if question_id not in raw_data.columns:
+            continue
+        if question_type == 'MC':
+            option_index(raw_data, question_id)
+        else:
+            answer_counts(raw_data, question_id)
+
+    return data
+
+def preload(file_path: Optional[str] = None) -> Future:
+    """
+    Start loading and indexing the survey data on a background thread.
+
+    Functions that need the data wait for the load to finish; anything
+    else can run in the meantime. Calling preload() again for the same
+    file returns the same future while it is pending or while its result
+    is still current; a failed or outdated load is started again.
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+
+    Returns:
+        concurrent.futures.Future resolving to the dictionary returned by
+        load_data(). Wrap it with asyncio.wrap_future() to await it.
+    """
+    global _PRELOAD_EXECUTOR
+
+    path = resolve_data_path(file_path)
+    key = _cache_key(path)
+
+    with _PRELOAD_LOCK:
+        future = _PRELOADS.get(key)
+        if future is None or (future.done() and not _is_cached(path)):
+            if _PRELOAD_EXECUTOR is None:
+                _PRELOAD_EXECUTOR = ThreadPoolExecutor(thread_name_prefix='so_lib-preload')
+            future = _PRELOAD_EXECUTOR.submit(_load_and_index, path)
+            _PRELOADS[key] = future
+
+    return future
+
+def _read_responses(source: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    """Read a batch of responses from a DataFrame, CSV file or JSON Lines file."""
+    if isinstance(source, pd.DataFrame):
+        return source
+
+    suffix = Path(source).suffix.lower()
+    if suffix == '.csv':
+        return pd.read_csv(source)
+    if suffix in ('.jsonl', '.ndjson', '.json'):
+        return pd.read_json(source, lines=True)
+
+    raise ValueError(f"Unsupported response file format: {source} (expected .csv or .jsonl)")
+
+def append_responses(source: Union[str, pd.DataFrame], file_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Append new respondents to the cached dataset without re-reading the data file.
+
+    Cached option indexes and answer counts are extended with the new rows
+    instead of being rebuilt, so answers are not split or counted again.
+    Each call still copies the responses once to add the batch (and each
+    cached multiple-choice index copies its row positions), so its cost
+    grows with the size of the dataset: append large batches rather than
+    many small ones. The data file is not modified; the appended rows are
+    dropped if the file changes and is reloaded.
+
+    Args:
+        source: New responses as a DataFrame or a path to a .csv or .jsonl file
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+
+    Returns:
+        Dictionary of DataFrames including the appended respondents
+
+    Raises:
+        ValueError: If the batch contains question IDs missing from the dataset
+    """
+    path = resolve_data_path(file_path)
+
+    try:
+        batch = _read_responses(source)
+        with _APPEND_LOCK:
+            return _append_batch(path, batch)
+    except Exception as e:
+        print(f"Error appending responses: {e}")
+        raise
+
+def _append_batch(path: str, batch: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Append a batch to the cached dataset, swapping in the extended copy."""
+    data = load_data(path)
+    raw_data = data['raw data']
+
+    unknown = [str(column) for column in batch.columns if column not in raw_data.columns]
+    if unknown:
+        raise ValueError(f"Question IDs not found in the dataset: {', '.join(unknown)}")
+
+    batch = batch.reindex(columns=raw_data.columns)
+    batch.index = pd.RangeIndex(len(raw_data), len(raw_data) + len(batch))
+    extended = pd.concat([raw_data, batch])
+
+    # Readers holding the previous frame keep a consistent view of it
+    extend_frame_cache(raw_data, extended, batch)
+    data['raw data'] = extended
+
+    key = _cache_key(path)
+    if key in _DATA_CACHE:
+        _DATA_CACHE[key] = (_DATA_CACHE[key][0], data)
+
+    return dict(data)
+
+def validation_report(file_path: Optional[str] = None) -> ValidationReport:
+    """
+    Get the validation report of the survey data.
+
+    The dataset is validated when it is first parsed; this returns the
+    stored report, validating again only if the dataset changed (e.g.
+    after append_responses).
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+
+    Returns:
+        ValidationReport listing schema and answer issues
+    """
+    path = resolve_data_path(file_path)
+
+    try:
+        data = load_data(file_path)
+        try:
+            signature = file_signature(path)
+        except OSError:
+            signature = None
+        return check_dataset(data, _validation_path(file_path), signature)
+    except Exception as e:
+        print(f"Error validating data: {e}")
+        raise
+
+def query_backend(file_path: Optional[str] = None) -> Optional[Backend]:
+    """
+    Backend that can answer queries on a data file without loading it.
+
+    Analysis functions use it to push work down to the database. Returns
+    None, meaning the data should be loaded, when the file's format can't
+    run queries or when the dataset is already loaded or being preloaded:
+    loaded data may include appended responses and has its own indexes.
+
+    Args:
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+    """
+    path = resolve_data_path(file_path)
+
+    try:
+        backend = open_backend(path)
+    except ValueError:
+        return None
+    if not backend.supports_queries or _cache_key(path) in _PRELOADS or _is_cached(path):
+        return None
+    return backend
+
+def convert_data(target: str, file_path: Optional[str] = None) -> None:
+    """
+    Write the survey data in another format.
+
+    Converting the workbook to SQLite once lets later sessions answer
+    single-choice distributions and filters with indexed queries instead
+    of parsing the workbook.
+
+    Args:
+        target: Path or URI of the file to write; its format is chosen as in load_data
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+    """
+    try:
+        save_data(load_data(file_path), target)
+    except Exception as e:
+        print(f"Error converting data: {e}")
+        raise
+
+def question_info(data: Dict[str, pd.DataFrame], question_id: str, expected_type: Optional[str] = None) -> Dict[str, str]:
+    """
+    Look up a question and check that it can be analysed.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        question_id: Question identifier
+        expected_type: If given, the question must have this type ('SC' or 'MC')
+
+    Returns:
+        Dictionary with question_id, question_text and type. Derived columns
+        (see so_lib.derived) are described by their definition; other
+        questions missing from the schema are treated as single-choice.
+
+    Raises:
+        ValueError: If question_id is empty, not in the responses or of the wrong type
+    """
+    if not question_id or not isinstance(question_id, str):
+        raise ValueError("Question ID must be a non-empty string")
+
+    # Check if the question exists
+    if not has_column(data['raw data'], question_id):
+        raise ValueError(f"Question ID '{question_id}' not found in the dataset")
+
+    lookup = _schema_lookup(data['schema'])
+    if question_id in lookup:
+        question_text, question_type = lookup[question_id]
+    elif question_id in DERIVED_COLUMNS and question_id not in data['raw data'].columns:
+        derived = DERIVED_COLUMNS[question_id]
+        question_text, question_type = derived.question_text, derived.question_type
+    else:
+        # Questions missing from the schema are treated as single-choice
+        question_text, question_type = '', 'SC'
+
+    if expected_type is not None and question_type != expected_type:
+        kind = 'multiple-choice' if expected_type == 'MC' else 'single-choice'
+        raise ValueError(f"Question '{question_id}' is not a {kind} question")
+
+    return {
+        "question_id": question_id,
+        "question_text": question_text,
+        "type": question_type
+    }
+
+def _schema_lookup(schema: pd.DataFrame) -> Dict[str, Tuple[str, str]]:
+    """Cached mapping of each schema question to its (text, type); the first row wins."""
+    def build():
+        lookup = {}
+        for column, text, question_type in zip(schema['column'], schema['question_text'], schema['type']):
+            lookup.setdefault(column, (text, question_type))
+        return lookup
+
+    return cached(schema, ('schema_lookup',), build)
+
 def list_questions() -> pd.DataFrame:
     """
     List all questions in the survey with their IDs and text.
@@ -100,49 +553,41 @@ def search_questions(query: str) -> pd.DataFrame:
         print(f"Error searching questions: {e}")
         raise
 
-def search_options(question_id: str, query: str = None) -> Dict[str, List[str]]:
+def search_options(question_id: str, query: str = None) -> Dict[str, Union[str, List[str], Dict[str, int]]]:
     """
     Get options for a specific question, optionally filtered by a search term.
     
+    Multiple-choice questions (type 'MC' in the schema) are split into their
+    individual options. Options are ordered by descending frequency, then
+    alphabetically.
+    
     Args:
         question_id: Question identifier
         query: Optional search string to filter options
         
     Returns:
-        Dictionary with question_id and a list of available options
+        Dictionary with question_id, a list of available options and the
+        number of respondents who chose each option
     """
     if not question_id or not isinstance(question_id, str):
         raise ValueError("Question ID must be a non-empty string")
     
     try:
         data = load_data()
-        raw_data = data['raw data']
+        question = question_info(data, question_id)
         
-        # Check if the question exists
-        if question_id not in raw_data.columns:
-            raise ValueError(f"Question ID '{question_id}' not found in the dataset")
-        
-        # Get all unique options for this question
-        options = raw_data[question_id].dropna().unique().tolist()
-        
-        # For multiple-choice questions, split by semicolon and get unique values
-        if ';' in str(options):
-            all_options = []
-            for opt in options:
-                if isinstance(opt, str) and ';' in opt:
-                    all_options.extend(opt.split(';'))
-                else:
-                    all_options.append(opt)
-            options = list(set(all_options))
+        vocabulary = option_vocabulary(data['raw data'], question_id, question['type'])
         
         # If a query is provided, filter the options
         if query:
-            options = [opt for opt in options if query.lower() in str(opt).lower()]
+            matches = vocabulary.index.astype(str).str.lower().str.contains(query.lower(), regex=False)
+            vocabulary = vocabulary[matches]
         
         return {
             "question_id": question_id,
-            "options": options
+            "options": vocabulary.index.tolist(),
+            "frequencies": {option: int(count) for option, count in vocabulary.items()}
         }
     except Exception as e:
         print(f"Error searching options: {e}")
-        raise
\ No newline at end of file
+        raise
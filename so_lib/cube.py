@@ -0,0 +1,299 @@
+"""
+Precomputed aggregate cube for the Stack Overflow Survey Data Analysis Library.
+
+An aggregate cube stores the number of respondents for every observed
+combination of answers to a chosen set of single-choice questions (the
+dimensions), plus optional sums of numeric measures. Filtered
+distributions over the dimensions are then answered from the cube, whose
+size is bounded by the number of distinct answer combinations, without
+touching the raw responses. Queries the cube cannot answer fall back to
+the raw data.
+
+Example::
+
+    cube = build_cube(['Country', 'Age', 'MainBranch', 'RemoteWork'])
+    cube_distribution('RemoteWork', 'Country == "Germany" and Age == "25-34 years old"', cube)
+"""
+
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .backends import data_location
+from .core import cache_path, file_signature, is_loaded, load_data, question_info, resolve_data_path
+from .index import column, option_index
+from .query import parse_query
+
+CUBE_FORMAT_VERSION = 1
+CUBE_SUFFIX = 'cube.pkl'
+
+# Rows aggregated per task when building a cube in parallel
+BUILD_CHUNK_SIZE = 50000
+
+
+class AggregateCube:
+    """Respondent counts (and measure sums) per combination of dimension answers."""
+
+    def __init__(self, dimensions: List[str], measures: List[str], cells: pd.DataFrame,
+                 question_texts: Dict[str, str], n_rows: int, source_signature=None):
+        self.dimensions = dimensions
+        self.measures = measures
+        self.cells = cells
+        self.question_texts = question_texts
+        self.n_rows = n_rows
+        self.source_signature = source_signature
+
+    def __repr__(self):
+        return f"AggregateCube(dimensions={self.dimensions!r}, cells={len(self.cells)})"
+
+    def can_answer(self, question_id: str, where: Optional[str] = None) -> bool:
+        """Whether the question and every question in ``where`` are cube dimensions or measures."""
+        filter_columns = parse_query(where).columns if where else []
+        return (question_id in self.dimensions or question_id in self.measures) and all(
+            column in self.dimensions for column in filter_columns
+        )
+
+    def _cells(self, where: Optional[str]) -> pd.DataFrame:
+        """Cells matching a filter expression."""
+        if not where:
+            return self.cells
+        return self.cells[parse_query(where).mask(self.cells)]
+
+    def distribution(self, question_id: str, where: Optional[str] = None) -> Dict[str, object]:
+        """
+        Distribution of answers to a dimension among respondents matching ``where``.
+
+        Percentages are relative to the matching respondents who answered
+        the question, as in distribution_sc.
+        """
+        if question_id not in self.dimensions or not self.can_answer(question_id, where):
+            raise ValueError(f"The cube cannot answer a distribution of '{question_id}' for this filter")
+
+        counts = self._cells(where).groupby(question_id)['count'].sum()
+        counts = counts[counts > 0].sort_values(ascending=False, kind='mergesort')
+        total = counts.sum()
+
+        return {
+            "question_id": question_id,
+            "question_text": self.question_texts.get(question_id, ''),
+            "distribution": {option: count / total * 100 for option, count in counts.items()},
+            "respondents": int(total),
+            "source": "cube"
+        }
+
+    def mean(self, measure: str, where: Optional[str] = None) -> Optional[float]:
+        """Mean of a numeric measure among respondents matching ``where``."""
+        if measure not in self.measures or not self.can_answer(measure, where):
+            raise ValueError(f"The cube cannot answer the mean of '{measure}' for this filter")
+
+        cells = self._cells(where)
+        count = cells[f"{measure}__count"].sum()
+        return float(cells[f"{measure}__sum"].sum() / count) if count else None
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the cube to a file."""
+        state = {
+            'version': CUBE_FORMAT_VERSION,
+            'dimensions': self.dimensions,
+            'measures': self.measures,
+            'cells': self.cells,
+            'question_texts': self.question_texts,
+            'n_rows': self.n_rows,
+            'source_signature': self.source_signature,
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> 'AggregateCube':
+        """Read a cube written by save()."""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('version') != CUBE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cube format in {path}")
+        state.pop('version')
+        return cls(**state)
+
+
+def _aggregate(frame: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+    """Sum the value columns of ``frame`` per combination of dimension values."""
+    return frame.groupby(dimensions, dropna=False, sort=False).sum()
+
+
+def build_cube(
+    dimensions: Sequence[str],
+    measures: Sequence[str] = (),
+    file_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    save: bool = True
+) -> AggregateCube:
+    """
+    Build an aggregate cube from the raw responses.
+
+    Row chunks are aggregated in parallel threads and then merged.
+
+    Args:
+        dimensions: Single-choice questions to slice by
+        measures: Numeric questions whose sums and counts are stored, so
+            that means can be answered from the cube
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+        max_workers: Maximum number of threads used for the build
+        save: Write the cube to its default cache path (see load_cube)
+
+    Returns:
+        The AggregateCube
+
+    Raises:
+        ValueError: If a dimension or measure is invalid
+    """
+    dimensions = list(dimensions)
+    measures = list(measures)
+    if not dimensions:
+        raise ValueError("At least one dimension is required")
+
+    try:
+        data = load_data(file_path)
+        raw_data = data['raw data']
+        schema = data['schema']
+        types = dict(zip(schema['column'], schema['type']))
+
+        for question_id in dimensions + measures:
+            if question_id not in raw_data.columns:
+                raise ValueError(f"Question ID '{question_id}' not found in the dataset")
+        for question_id in dimensions:
+            if types.get(question_id) == 'MC':
+                raise ValueError(f"Dimension '{question_id}' is a multiple-choice question")
+
+        frame = raw_data[dimensions].copy()
+        frame['count'] = 1
+        for measure in measures:
+            values = pd.to_numeric(raw_data[measure], errors='coerce')
+            frame[f"{measure}__sum"] = values.fillna(0).to_numpy(dtype=float)
+            frame[f"{measure}__count"] = values.notna().to_numpy(dtype=np.int64)
+
+        chunks = [frame.iloc[start:start + BUILD_CHUNK_SIZE] for start in range(0, len(frame), BUILD_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            partials = list(executor.map(lambda chunk: _aggregate(chunk, dimensions), chunks))
+
+        cells = _aggregate(pd.concat(partials).reset_index(), dimensions) if len(partials) > 1 else partials[0]
+        cells = cells.reset_index()
+
+        texts = dict(zip(schema['column'], schema['question_text']))
+        path = resolve_data_path(file_path)
+        cube = AggregateCube(
+            dimensions=dimensions,
+            measures=measures,
+            cells=cells,
+            question_texts={q: texts.get(q, '') for q in dimensions + measures},
+            n_rows=len(raw_data),
+            source_signature=file_signature(path) if os.path.exists(data_location(path)) else None
+        )
+
+        if save:
+            cube.save(cache_path(file_path, CUBE_SUFFIX))
+
+        return cube
+    except Exception as e:
+        print(f"Error building cube: {e}")
+        raise
+
+
+def load_cube(path: Optional[str] = None, file_path: Optional[str] = None) -> AggregateCube:
+    """
+    Load a cube saved by build_cube.
+
+    Args:
+        path: Path of the cube file. If None, uses the default cache path of
+            the data file.
+        file_path: Path or URI of the data file the cube was built from. If
+            None, uses resolve_data_path().
+
+    Returns:
+        The AggregateCube
+
+    Raises:
+        FileNotFoundError: If there is no cube file
+        ValueError: If the data file changed since the cube was built, or
+            responses were appended to the loaded data since
+    """
+    cube = AggregateCube.load(path or cache_path(file_path, CUBE_SUFFIX))
+
+    data_path = resolve_data_path(file_path)
+    if cube.source_signature is not None and os.path.exists(data_location(data_path)):
+        if tuple(cube.source_signature) != file_signature(data_path):
+            raise ValueError("The data file changed since the cube was built; rebuild it")
+    if _is_stale(cube, file_path):
+        raise ValueError("Responses were appended since the cube was built; rebuild it")
+
+    return cube
+
+
+def _is_stale(cube: AggregateCube, file_path: Optional[str] = None) -> bool:
+    """Whether the loaded responses no longer match the cube, e.g. after append_responses."""
+    # Responses are only ever appended to loaded data; data that isn't loaded matches its file
+    if not is_loaded(file_path):
+        return False
+    return cube.n_rows != len(load_data(file_path)['raw data'])
+
+
+def _raw_distribution(question_id: str, where: Optional[str]) -> Dict[str, object]:
+    """Filtered distribution computed from the raw responses."""
+    data = load_data()
+    raw_data = data['raw data']
+    question = question_info(data, question_id)
+
+    mask = parse_query(where).mask(raw_data) if where else np.ones(len(raw_data), dtype=bool)
+
+    if question['type'] == 'MC':
+        # Percentages of all matching respondents, as in distribution_mc
+        index = option_index(raw_data, question_id)
+        rows, codes = index.codes()
+        counts = pd.Series(np.bincount(codes[mask[rows]], minlength=len(index.options)), index=index.options)
+        counts = counts[counts > 0].sort_values(ascending=False, kind='mergesort')
+        total = int(mask.sum())
+    else:
+        counts = column(raw_data, question_id)[mask].value_counts()
+        total = int(counts.sum())
+
+    return {
+        "question_id": question_id,
+        "question_text": question['question_text'],
+        "distribution": {option: count / total * 100 for option, count in counts.items()} if total else {},
+        "respondents": total,
+        "source": "raw"
+    }
+
+
+def cube_distribution(question_id: str, where: Optional[str] = None,
+                      cube: Optional[AggregateCube] = None) -> Dict[str, object]:
+    """
+    Distribution of a question among respondents matching a filter expression.
+
+    Answered from the cube when the question and every question in the
+    filter are cube dimensions and the cube covers every loaded respondent;
+    otherwise computed from the raw data.
+
+    Args:
+        question_id: Question identifier
+        where: Optional filter expression (see so_lib.query)
+        cube: Cube to answer from, if any
+
+    Returns:
+        Dictionary with question information, the distribution of answers,
+        the number of matching respondents and the source ('cube' or 'raw')
+    """
+    if not question_id or not isinstance(question_id, str):
+        raise ValueError("Question ID must be a non-empty string")
+
+    try:
+        if cube is not None and question_id in cube.dimensions and cube.can_answer(question_id, where) \
+                and not _is_stale(cube):
+            return cube.distribution(question_id, where)
+        return _raw_distribution(question_id, where)
+    except Exception as e:
+        print(f"Error calculating distribution: {e}")
+        raise
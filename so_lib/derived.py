@@ -0,0 +1,314 @@
+"""
+Derived columns for the Stack Overflow Survey Data Analysis Library.
+
+A derived column is a respondent-level feature computed from the
+responses, such as a band of years of experience or whether a respondent
+uses AI tools. Register it once by name and use the name anywhere a
+question_id is accepted: distributions, crosstabs, subsets, filter
+expressions and ordinal analyses.
+
+Derived columns are computed by a vectorized function of the whole
+responses DataFrame, lazily on first use, and cached with the dataset
+like its option indexes. For a dataset loaded from a file, the computed
+column is also saved in the cache directory under the dataset fingerprint
+(see validation.dataset_fingerprint) and a digest of the definition, so
+later scripts load it instead of deriving it again. Changing the data file
+or the definition makes the saved copy stale.
+
+Example::
+
+    register_derived('ExperienceBand', bucket('YearsCodePro', [0, 5, 10, 20]),
+                     question_text='Years of professional coding, banded')
+    register_derived('UsesAI', matches('AISelect == "Yes"'))
+    distribution_sc('ExperienceBand')
+    crosstab('ExperienceBand', 'UsesAI')
+    subset_where('UsesAI == "Yes" and ExperienceBand == "20+"')
+"""
+
+import hashlib
+import inspect
+import re
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import cache_path, loaded_dataset
+from .index import DERIVED_COLUMNS, column, forget_column, has_column, option_index
+from .ordinal import _numeric_level
+from .query import parse_query
+from .validation import QUESTION_TYPES, dataset_fingerprint
+
+DerivedFunction = Callable[[pd.DataFrame], Union[pd.Series, np.ndarray]]
+
+_UNSAFE_CHARACTERS = re.compile(r'[^\w.-]')
+
+
+class DerivedColumn:
+    """Definition of a derived column."""
+
+    def __init__(self, name: str, function: DerivedFunction, question_type: str = 'SC',
+                 question_text: str = '', columns: Sequence[str] = (), persist: bool = True):
+        """
+        Args:
+            name: Name the column is used by, like a question_id
+            function: Vectorized function computing the column from the
+                responses, returning one value per respondent
+            question_type: How the values are analysed: 'SC', 'MC' for
+                ``;``-delimited options, or 'TE'
+            question_text: Description shown in place of a question's text
+            columns: Questions the function reads, checked before it runs
+            persist: Whether to save computed values in the cache directory
+        """
+        self.name = name
+        self.function = function
+        self.question_type = question_type
+        self.question_text = question_text
+        self.columns = tuple(columns)
+        self.persist = persist
+        self.token = _definition_token(self)
+
+    def __repr__(self):
+        return f"DerivedColumn({self.name!r}, type={self.question_type!r})"
+
+    def compute(self, raw_data: pd.DataFrame) -> pd.Series:
+        """
+        Compute the column for every respondent.
+
+        Args:
+            raw_data: Survey responses
+
+        Returns:
+            Series aligned with ``raw_data``
+
+        Raises:
+            ValueError: If a source question is missing or the function
+                doesn't return one value per respondent
+        """
+        missing = [question_id for question_id in self.columns if not has_column(raw_data, question_id)]
+        if missing:
+            raise ValueError(f"Derived column '{self.name}' needs questions not in the dataset: {', '.join(missing)}")
+
+        values = self.function(raw_data)
+        if not isinstance(values, pd.Series):
+            values = pd.Series(np.asarray(values) if np.ndim(values) else values)
+        if values.ndim != 1 or len(values) != len(raw_data):
+            raise ValueError(f"Derived column '{self.name}' must have one value per respondent")
+        return values.set_axis(raw_data.index).rename(self.name)
+
+    def materialize(self, raw_data: pd.DataFrame) -> pd.Series:
+        """Load the saved column if it is current for the dataset, otherwise compute and save it."""
+        saved = _saved_location(self, raw_data) if self.persist else None
+        if saved is not None:
+            path, fingerprint = saved
+            if path.exists():
+                try:
+                    state = pd.read_pickle(path)
+                    if state['fingerprint'] == fingerprint and len(state['values']) == len(raw_data):
+                        return state['values'].set_axis(raw_data.index)
+                except (OSError, ValueError, KeyError, TypeError):
+                    pass
+
+        values = self.compute(raw_data)
+        if saved is not None:
+            try:
+                pd.to_pickle({'fingerprint': saved[1], 'values': values}, saved[0])
+            except OSError:
+                # The cache is an optimization; a read-only directory is not an error
+                pass
+        return values
+
+
+def _definition_token(definition: DerivedColumn) -> str:
+    """Digest of a definition: its type, sources and the code and parameters of its function."""
+    function = definition.function
+    try:
+        code = inspect.getsource(function)
+    except (OSError, TypeError):
+        code = getattr(function, '__code__', function)
+        code = repr((getattr(code, 'co_code', code), getattr(code, 'co_consts', None)))
+    cells = tuple(cell.cell_contents for cell in (getattr(function, '__closure__', None) or ()))
+
+    digest = hashlib.sha1()
+    for part in (definition.question_type, definition.columns, code, cells, getattr(function, '__defaults__', None)):
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def _saved_location(definition: DerivedColumn, raw_data: pd.DataFrame):
+    """Cache file and dataset fingerprint for a derived column of a loaded dataset, or None."""
+    loaded = loaded_dataset(raw_data)
+    if loaded is None:
+        return None
+    path, signature, data = loaded
+    name = _UNSAFE_CHARACTERS.sub('_', definition.name)
+    try:
+        location = cache_path(path, f"derived.{name}.{definition.token}.pkl")
+    except OSError:
+        return None
+    return location, dataset_fingerprint(data, signature)
+
+
+def register_derived(
+    name: str,
+    function: Optional[DerivedFunction],
+    question_type: str = 'SC',
+    question_text: str = '',
+    columns: Optional[Sequence[str]] = None,
+    persist: bool = True
+) -> Optional[DerivedColumn]:
+    """
+    Register a derived column.
+
+    Columns of the responses take precedence over derived columns of the
+    same name. Registering a name again replaces its definition and drops
+    everything cached for it.
+
+    Args:
+        name: Name to use the column by, like a question_id
+        function: Vectorized function of the responses DataFrame returning
+            one value per respondent (a Series or array); None removes the
+            registration. Functions built by bucket(), matches() and
+            option_count() name their source questions themselves.
+        question_type: 'SC' (default), 'MC' for ``;``-delimited options, or 'TE'
+        question_text: Description shown in place of a question's text
+        columns: Questions the function reads (default: those named by the
+            function, if any)
+        persist: Whether to save computed values in the cache directory
+
+    Returns:
+        The definition, or None if it was removed
+
+    Raises:
+        ValueError: If the name, function or type is invalid
+    """
+    if not name or not isinstance(name, str):
+        raise ValueError("Derived column name must be a non-empty string")
+
+    if function is None:
+        DERIVED_COLUMNS.pop(name, None)
+        forget_column(name)
+        return None
+
+    if not callable(function):
+        raise ValueError("Derived column function must be callable")
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f"Question type must be one of: {', '.join(QUESTION_TYPES)}")
+
+    if columns is None:
+        columns = getattr(function, 'columns', ())
+    definition = DerivedColumn(name, function, question_type, question_text, columns, persist)
+    DERIVED_COLUMNS[name] = definition
+    forget_column(name)
+    return definition
+
+
+def derived_columns() -> pd.DataFrame:
+    """
+    List the registered derived columns.
+
+    Returns:
+        DataFrame with question_id, question_text and type, like list_questions()
+    """
+    return pd.DataFrame(
+        [(name, definition.question_text, definition.question_type) for name, definition in DERIVED_COLUMNS.items()],
+        columns=['question_id', 'question_text', 'type']
+    )
+
+
+def _named(function: DerivedFunction, columns: Sequence[str]) -> DerivedFunction:
+    """Record the questions a derivation reads on its function."""
+    function.columns = tuple(columns)
+    return function
+
+
+def numeric_values(values: pd.Series) -> np.ndarray:
+    """
+    Numeric value of each answer, as a float array.
+
+    Numbers are taken as they are; labels naming a number or a range, such
+    as ``Less than 1 year`` or ``25-34 years old``, are valued as in ordinal
+    scales. Each distinct label is parsed once. Other answers are NaN.
+    """
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, copy=True)
+    text = np.isnan(numbers) & values.notna().to_numpy()
+    if text.any():
+        codes, labels = pd.factorize(values[text].astype(str))
+        parsed = np.array([(_numeric_level(label) or (None, np.nan))[1] for label in labels], dtype=float)
+        numbers[text] = parsed[codes]
+    return numbers
+
+
+def bucket(question_id: str, edges: Sequence[float], labels: Optional[Sequence[str]] = None) -> DerivedFunction:
+    """
+    Derivation banding the numeric answers to a question.
+
+    Args:
+        question_id: Question with numeric answers (see numeric_values())
+        edges: Increasing lower bounds of the bands; the last band is open-ended
+        labels: Band labels (default: ``0-4``, ``5-9``, ..., ``20+``, which
+            assume integer answers)
+
+    Returns:
+        Function for register_derived(); answers below the first edge or
+        without a number are missing
+
+    Raises:
+        ValueError: If edges or labels are invalid
+    """
+    edges = [float(edge) for edge in edges]
+    if not edges or any(b <= a for a, b in zip(edges, edges[1:])):
+        raise ValueError("Band edges must be a non-empty increasing sequence")
+    if labels is None:
+        labels = [f"{a:g}-{b - 1:g}" for a, b in zip(edges, edges[1:])] + [f"{edges[-1]:g}+"]
+    labels = list(labels)
+    if len(labels) != len(edges):
+        raise ValueError("There must be one label per band edge")
+
+    def derive(raw_data: pd.DataFrame) -> np.ndarray:
+        numbers = numeric_values(column(raw_data, question_id))
+        bands = np.searchsorted(edges, numbers, side='right') - 1
+        return np.where((bands >= 0) & ~np.isnan(numbers), np.array(labels, dtype=object)[np.maximum(bands, 0)], None)
+
+    return _named(derive, [question_id])
+
+
+def matches(expression: str, true: str = 'Yes', false: str = 'No') -> DerivedFunction:
+    """
+    Derivation flagging the respondents who match a filter expression.
+
+    Args:
+        expression: Filter expression (see so_lib.query)
+        true: Value for matching respondents
+        false: Value for everyone else
+
+    Returns:
+        Function for register_derived()
+
+    Raises:
+        ValueError: If the expression is invalid
+    """
+    query = parse_query(expression)
+
+    def derive(raw_data: pd.DataFrame) -> np.ndarray:
+        return np.where(query.mask(raw_data), true, false).astype(object)
+
+    return _named(derive, query.columns)
+
+
+def option_count(question_id: str) -> DerivedFunction:
+    """
+    Derivation counting the options each respondent selected in a multiple-choice question.
+
+    Counted from the cached option index; respondents who didn't answer
+    have 0.
+
+    Returns:
+        Function for register_derived()
+    """
+    def derive(raw_data: pd.DataFrame) -> np.ndarray:
+        rows, _ = option_index(raw_data, question_id).codes()
+        return np.bincount(rows, minlength=len(raw_data))
+
+    return _named(derive, [question_id])
@@ -0,0 +1,494 @@
+"""
+Indexes for the Stack Overflow Survey Data Analysis Library.
+
+This module provides inverted indexes over multiple-choice answers. A
+multiple-choice answer is stored as a ``;``-delimited string; the index
+splits every answer once and records, for each option, the positions of
+the rows that selected it. Indexes and answer counts are cached per
+DataFrame and question, dropped when the DataFrame is garbage collected,
+and carried over incrementally when respondents are appended.
+
+Cached values are built lazily, once: concurrent threads asking for the
+same value wait for the first one to build it (see cached()), while
+values for other questions are built in parallel. Cached arrays are
+read-only, so queries can share them without copies or locks.
+
+Derived columns (see so_lib.derived) are read through column() like the
+response columns, so every index can be built on them too.
+"""
+
+import threading
+import weakref
+from typing import Callable, Dict, Hashable, List, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .memory import chunk_rows, spill_array
+
+MC_SEPARATOR = ';'
+
+# Estimated memory per option when answers are split into a Series of strings
+SPLIT_BYTES_PER_OPTION = 120
+
+# Per-DataFrame caches, keyed by id() and evicted by a weakref finalizer
+_FRAME_CACHES: Dict[int, Dict[Hashable, object]] = {}
+
+# Locks serializing the build of one cached value, keyed by (id(raw_data), key)
+# and held only while that value is being built
+_FRAME_CACHES_LOCK = threading.Lock()
+_BUILD_LOCKS: Dict[Tuple[int, Hashable], threading.Lock] = {}
+
+_MISSING = object()
+
+T = TypeVar('T')
+
+# Functions that update a cached value for appended rows, keyed by the
+# first element of the cache key: extender(cached_value, batch_column)
+_EXTENDERS: Dict[str, Callable[[object, pd.Series], object]] = {}
+
+# Derived columns by name, registered by so_lib.derived. Each definition has
+# a ``token`` identifying it and computes its values with materialize(raw_data).
+DERIVED_COLUMNS: Dict[str, object] = {}
+
+
+def frame_cache(raw_data: pd.DataFrame) -> Dict[Hashable, object]:
+    """
+    Get the cache dictionary associated with a DataFrame.
+
+    The cache lives as long as the DataFrame itself. Callers must treat
+    cached DataFrames as read-only, since in-place edits are not detected.
+
+    Args:
+        raw_data: DataFrame the cached values are derived from
+
+    Returns:
+        Dictionary for storing values derived from ``raw_data``
+    """
+    key = id(raw_data)
+    cache = _FRAME_CACHES.get(key)
+    if cache is None:
+        with _FRAME_CACHES_LOCK:
+            cache = _FRAME_CACHES.get(key)
+            if cache is None:
+                cache = {}
+                _FRAME_CACHES[key] = cache
+                weakref.finalize(raw_data, _FRAME_CACHES.pop, key, None)
+    return cache
+
+
+def cached(raw_data: pd.DataFrame, key: Hashable, build: Callable[[], T]) -> T:
+    """
+    Get a value from the cache of a DataFrame, building it on first use.
+
+    Thread-safe and single-flight: if several threads ask for a missing
+    value at once, one builds it and the others wait for it. Each key has
+    its own lock, so different values are built concurrently.
+
+    Args:
+        raw_data: DataFrame the value is derived from
+        key: Cache key
+        build: Function computing the value
+
+    Returns:
+        The cached value
+    """
+    cache = frame_cache(raw_data)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = (id(raw_data), key)
+    with _FRAME_CACHES_LOCK:
+        lock = _BUILD_LOCKS.setdefault(lock_key, threading.Lock())
+    with lock:
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            try:
+                value = build()
+                cache[key] = value
+            finally:
+                with _FRAME_CACHES_LOCK:
+                    _BUILD_LOCKS.pop(lock_key, None)
+    return value
+
+
+def read_only(array: np.ndarray) -> np.ndarray:
+    """Mark an array read-only (in place) and return it."""
+    array.flags.writeable = False
+    return array
+
+
+def has_column(raw_data: pd.DataFrame, question_id: str) -> bool:
+    """Whether a question is a response column or a registered derived column."""
+    return question_id in raw_data.columns or question_id in DERIVED_COLUMNS
+
+
+def column(raw_data: pd.DataFrame, question_id: str) -> pd.Series:
+    """
+    Get the answers to a question, computing derived columns on first use.
+
+    Response columns take precedence over derived columns of the same name.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier or derived column name
+
+    Returns:
+        Series aligned with ``raw_data``
+
+    Raises:
+        KeyError: If the question is neither a column nor a derived column
+    """
+    if question_id in raw_data.columns:
+        return raw_data[question_id]
+    definition = DERIVED_COLUMNS.get(question_id)
+    if definition is None:
+        raise KeyError(question_id)
+    return cached(raw_data, ('derived', question_id, definition.token), lambda: definition.materialize(raw_data))
+
+
+def forget_column(question_id: str) -> None:
+    """Drop the values cached for a question from every DataFrame's cache."""
+    with _FRAME_CACHES_LOCK:
+        caches = list(_FRAME_CACHES.values())
+    for cache in caches:
+        for key in list(cache):
+            if isinstance(key, tuple) and len(key) > 1 and (
+                key[1] == question_id or (isinstance(key[1], tuple) and question_id in key[1])
+            ):
+                cache.pop(key, None)
+
+
+class OptionIndex:
+    """
+    Inverted index from the options of a multiple-choice question to rows.
+
+    Row positions are stored CSR-style: the rows that selected option ``i``
+    are ``rows[offsets[i]:offsets[i + 1]]``, sorted ascending. Options are
+    kept in order of first appearance.
+    """
+
+    def __init__(self, options: np.ndarray, offsets: np.ndarray, rows: np.ndarray, n_rows: int):
+        self.options = read_only(options)
+        self.offsets = read_only(offsets)
+        self.rows = read_only(rows)
+        self.n_rows = n_rows
+        self._codes = {option: code for code, option in enumerate(options)}
+
+    def __contains__(self, option: str) -> bool:
+        return option in self._codes
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def positions(self, option: str) -> np.ndarray:
+        """Row positions of respondents who selected ``option``."""
+        code = self._codes.get(option)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    def mask(self, option: str) -> np.ndarray:
+        """Boolean array marking respondents who selected ``option``."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.positions(option)] = True
+        return mask
+
+    def counts(self) -> pd.Series:
+        """Number of respondents who selected each option."""
+        return pd.Series(np.diff(self.offsets), index=self.options, dtype=np.int64)
+
+    def matrix(self) -> sparse.csc_matrix:
+        """
+        Get the index as a sparse respondent x option indicator matrix.
+
+        The matrix shares its arrays with the index; entry (r, i) is 1 if
+        the respondent at position r selected option i.
+        """
+        data = np.ones(len(self.rows), dtype=np.int32)
+        return sparse.csc_matrix((data, self.rows, self.offsets), shape=(self.n_rows, len(self.options)))
+
+    def extend(self, values: pd.Series) -> 'OptionIndex':
+        """
+        Build the index for this question with ``values`` appended as new rows.
+
+        Runs in time linear in the batch plus one copy of the existing row
+        positions; existing answers are not split again.
+
+        Args:
+            values: Multiple-choice answers of the appended respondents
+
+        Returns:
+            New OptionIndex covering the existing and appended rows
+        """
+        batch = build_option_index(values)
+
+        # Combined vocabulary: existing options first, then unseen batch options
+        new_options = [option for option in batch.options if option not in self._codes]
+        options = np.concatenate([self.options, np.asarray(new_options, dtype=object)])
+        codes = dict(self._codes)
+        codes.update((option, len(self.options) + i) for i, option in enumerate(new_options))
+        batch_to_combined = np.array([codes[option] for option in batch.options], dtype=np.int64)
+
+        old_counts = np.zeros(len(options), dtype=np.int64)
+        old_counts[:len(self.options)] = np.diff(self.offsets)
+        batch_counts = np.zeros(len(options), dtype=np.int64)
+        batch_counts[batch_to_combined] = np.diff(batch.offsets)
+        offsets = np.concatenate([[0], np.cumsum(old_counts + batch_counts)])
+
+        # Each option keeps its existing rows, followed by its appended rows
+        rows = np.empty(offsets[-1], dtype=np.int64)
+        old_rows, old_codes = self.codes()
+        old_rank = np.arange(len(old_rows)) - self.offsets[old_codes]
+        rows[offsets[old_codes] + old_rank] = old_rows
+
+        batch_rows, batch_codes = batch.codes()
+        batch_rank = np.arange(len(batch_rows)) - batch.offsets[batch_codes]
+        batch_codes = batch_to_combined[batch_codes]
+        rows[offsets[batch_codes] + old_counts[batch_codes] + batch_rank] = batch_rows + self.n_rows
+
+        return OptionIndex(options, offsets, rows, self.n_rows + batch.n_rows)
+
+    def codes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the index as (row position, option code) pairs.
+
+        Returns:
+            Tuple of (rows, codes) arrays of equal length
+        """
+        codes = np.repeat(np.arange(len(self.options)), np.diff(self.offsets))
+        return self.rows, codes
+
+
+def split_options(values: pd.Series) -> pd.Series:
+    """
+    Split ``;``-delimited answers into one row per selected option.
+
+    Args:
+        values: Multiple-choice answers with a default RangeIndex
+
+    Returns:
+        Series of options whose index is the position of the source row
+    """
+    tokens = values.dropna().astype(str).str.split(MC_SEPARATOR).explode()
+    return tokens[tokens.notna() & (tokens != '')]
+
+
+def _split_bytes_per_row(values: pd.Series, sample_size: int = 1000) -> float:
+    """Estimated memory per answer of splitting ``values`` into options."""
+    sample = values.iloc[:sample_size].dropna().astype(str)
+    if len(sample) == 0:
+        return 0.0
+    options_per_answer = sample.str.count(MC_SEPARATOR).mean() + 1
+    return options_per_answer * SPLIT_BYTES_PER_OPTION + sample.str.len().mean()
+
+
+def _split_codes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split answers into (row, option code) pairs and the options.
+
+    With a memory budget (see so_lib.memory) answers are split a chunk of
+    rows at a time, so only one chunk's split strings are held at once.
+    """
+    values = values.reset_index(drop=True)
+    chunk = chunk_rows(_split_bytes_per_row(values), len(values))
+
+    if chunk >= len(values):
+        tokens = split_options(values)
+        codes, options = pd.factorize(tokens.to_numpy(dtype=object))
+        return tokens.index.to_numpy(dtype=np.int64), codes.astype(np.int64), np.asarray(options, dtype=object)
+
+    # Options keep their order of first appearance across chunks
+    known: Dict[str, int] = {}
+    all_rows, all_codes = [], []
+    for start in range(0, len(values), chunk):
+        tokens = split_options(values.iloc[start:start + chunk])
+        local_codes, local_options = pd.factorize(tokens.to_numpy(dtype=object))
+        mapping = np.array([known.setdefault(option, len(known)) for option in local_options], dtype=np.int64)
+        all_rows.append(tokens.index.to_numpy(dtype=np.int64))
+        all_codes.append(mapping[local_codes])
+
+    options = np.empty(len(known), dtype=object)
+    options[:] = list(known)
+    return np.concatenate(all_rows), np.concatenate(all_codes), options
+
+
+def build_option_index(values: pd.Series) -> OptionIndex:
+    """
+    Build an OptionIndex from a column of multiple-choice answers.
+
+    Args:
+        values: Multiple-choice answers, one per respondent
+
+    Returns:
+        OptionIndex over ``values``
+    """
+    rows, codes, options = _split_codes(values)
+
+    # Group rows by option and drop options repeated within one answer
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order]
+    unique = np.ones(len(codes), dtype=bool)
+    unique[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, rows = codes[unique], rows[unique]
+
+    offsets = np.searchsorted(codes, np.arange(len(options) + 1))
+    return OptionIndex(options, offsets, spill_array(rows), len(values))
+
+
+def option_index(raw_data: pd.DataFrame, question_id: str) -> OptionIndex:
+    """
+    Get the cached OptionIndex for a multiple-choice question.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier
+
+    Returns:
+        OptionIndex for the question, built on first use
+    """
+    return cached(raw_data, ('option_index', question_id), lambda: build_option_index(column(raw_data, question_id)))
+
+
+def answer_counts(raw_data: pd.DataFrame, question_id: str) -> pd.Series:
+    """
+    Get the cached counts of each answer to a question.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier
+
+    Returns:
+        Series mapping each non-missing answer to its count, most common first
+    """
+    return cached(raw_data, ('answer_counts', question_id), lambda: column(raw_data, question_id).value_counts())
+
+
+def option_vocabulary(raw_data: pd.DataFrame, question_id: str, question_type: str) -> pd.Series:
+    """
+    Get the cached vocabulary of options for a question with their frequencies.
+
+    Options are ordered by descending frequency, with ties broken by the
+    option text, so the order is deterministic.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier
+        question_type: 'MC' to count individual ``;``-delimited options,
+            anything else to count whole answers
+
+    Returns:
+        Series mapping each option to the number of respondents who chose it
+    """
+    def build():
+        if question_type == 'MC':
+            counts = option_index(raw_data, question_id).counts()
+        else:
+            counts = answer_counts(raw_data, question_id)
+
+        order = pd.DataFrame({
+            'count': counts.to_numpy(),
+            'text': counts.index.astype(str),
+        }).sort_values(['count', 'text'], ascending=[False, True], kind='mergesort').index
+        return counts.iloc[order]
+
+    return cached(raw_data, ('option_vocabulary', question_id, question_type), build)
+
+
+def indicator_matrix(raw_data: pd.DataFrame, question_id: str, question_type: str) -> Tuple[sparse.csc_matrix, List[object]]:
+    """
+    Get a cached respondent x option indicator matrix of a question.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier
+        question_type: 'MC' for one column per ``;``-delimited option,
+            anything else for one column per distinct answer
+
+    Returns:
+        Tuple of the CSC matrix (entry (r, i) is 1 if the respondent at
+        position r gave option i) and the options, in column order
+    """
+    def build():
+        if question_type == 'MC':
+            index = option_index(raw_data, question_id)
+            return (index.matrix(), list(index.options))
+
+        codes, options = pd.factorize(column(raw_data, question_id))
+        rows = np.flatnonzero(codes >= 0)
+        data = np.ones(len(rows), dtype=np.int32)
+        matrix = sparse.csc_matrix((data, (rows, codes[rows])), shape=(len(raw_data), len(options)))
+        return (matrix, list(options))
+
+    return cached(raw_data, ('indicator_matrix', question_id, question_type), build)
+
+
+def ordinal_codes(raw_data: pd.DataFrame, question_id: str, levels: Tuple[str, ...]) -> np.ndarray:
+    """
+    Get the cached integer codes of an ordinal question's answers.
+
+    Answers are compared as text, so numeric answers such as ``7`` match
+    the level ``'7'``.
+
+    Args:
+        raw_data: Survey responses
+        question_id: Question identifier
+        levels: Answers of the scale, lowest first
+
+    Returns:
+        Read-only array with the position in ``levels`` of each respondent's
+        answer, or -1 for missing answers and answers off the scale
+    """
+    categorical = cached(
+        raw_data,
+        ('ordinal_codes', question_id, tuple(levels)),
+        lambda: _encode_ordinal(column(raw_data, question_id), pd.CategoricalDtype(list(levels), ordered=True))
+    )
+    return read_only(np.asarray(categorical.codes))
+
+
+def _encode_ordinal(values: pd.Series, dtype: pd.CategoricalDtype) -> pd.Categorical:
+    """Encode answers as an ordered Categorical of their text; other answers become missing."""
+    codes = dtype.categories.get_indexer(values.astype(str))
+    return pd.Categorical.from_codes(codes, dtype=dtype)
+
+
+def _extend_ordinal_codes(categorical: pd.Categorical, values: pd.Series) -> pd.Categorical:
+    """Add the answers of appended respondents to cached ordinal codes."""
+    batch = _encode_ordinal(values, categorical.dtype)
+    return pd.Categorical.from_codes(np.concatenate([categorical.codes, batch.codes]), dtype=categorical.dtype)
+
+
+def _extend_answer_counts(counts: pd.Series, values: pd.Series) -> pd.Series:
+    """Add the answers of appended respondents to cached answer counts."""
+    combined = counts.add(values.value_counts(), fill_value=0).astype(np.int64)
+    return combined.sort_values(ascending=False, kind='stable')
+
+
+_EXTENDERS['option_index'] = lambda index, values: index.extend(values)
+_EXTENDERS['answer_counts'] = _extend_answer_counts
+_EXTENDERS['ordinal_codes'] = _extend_ordinal_codes
+
+
+def extend_frame_cache(raw_data: pd.DataFrame, extended: pd.DataFrame, batch: pd.DataFrame) -> None:
+    """
+    Carry cached values over to a DataFrame with appended rows.
+
+    Cached values that know how to absorb new rows are updated from
+    ``batch`` alone; anything else is rebuilt lazily on next use.
+
+    Args:
+        raw_data: DataFrame the existing cache belongs to
+        extended: ``raw_data`` with ``batch`` appended
+        batch: The appended rows, with the same columns as ``raw_data``
+    """
+    cache = _FRAME_CACHES.get(id(raw_data))
+    if not cache:
+        return
+
+    extended_cache = frame_cache(extended)
+    for key, value in list(cache.items()):
+        if isinstance(key, tuple) and key[0] in _EXTENDERS and key[1] in batch.columns:
+            extended_cache[key] = _EXTENDERS[key[0]](value, batch[key[1]])
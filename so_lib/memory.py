@@ -0,0 +1,179 @@
+"""
+Memory budget for the Stack Overflow Survey Data Analysis Library.
+
+Set the SO_MEMORY_LIMIT environment variable (e.g. ``4G``, ``512M`` or a
+number of bytes) to bound the memory of the process. The analysis engine
+then sizes its work to what is left of the budget:
+
+- multiple-choice answers are split into (row, option) pairs a chunk of
+  respondents at a time when an option index is built,
+- similarity queries compare fewer respondents per block,
+- subsets written to files are materialized a chunk of rows at a time, and
+- large intermediate arrays are spilled to temporary ``.npy`` files and
+  memory-mapped back (spill_array), so the operating system can page them
+  out instead of the process running out of memory.
+
+Without a budget nothing is chunked or spilled.
+"""
+
+import atexit
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Smallest chunk worth processing, however tight the budget
+MIN_CHUNK_ROWS = 1024
+
+# Share of the remaining budget a single intermediate may use
+CHUNK_BUDGET_FRACTION = 0.25
+
+_SIZE_PATTERN = re.compile(r'^\s*(?P<number>\d+(?:\.\d+)?)\s*(?P<unit>[kmgt]?)(?:i?b)?\s*$', re.IGNORECASE)
+_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+_SPILL_LOCK = threading.Lock()
+_SPILL_DIR: Optional[Path] = None
+_SPILLED = {'files': 0, 'bytes': 0}
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as ``512M``, ``1.5GiB`` or ``1000000`` into bytes.
+
+    Units are powers of 1024.
+
+    Raises:
+        ValueError: If the size is not valid
+    """
+    match = _SIZE_PATTERN.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid size: {text!r} (expected e.g. 512M, 4G or a number of bytes)")
+    return int(float(match.group('number')) * _UNITS[match.group('unit').lower()])
+
+
+def memory_limit() -> Optional[int]:
+    """The memory budget in bytes from SO_MEMORY_LIMIT, or None if unset."""
+    limit = os.environ.get('SO_MEMORY_LIMIT')
+    return parse_size(limit) if limit else None
+
+
+def memory_usage() -> int:
+    """Resident memory of this process in bytes (0 if it can't be measured)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Peak rather than current usage: kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def memory_available() -> Optional[int]:
+    """Bytes left in the budget, or None if there is no budget."""
+    limit = memory_limit()
+    if limit is None:
+        return None
+    return max(0, limit - memory_usage())
+
+
+def chunk_rows(bytes_per_row: float, n_rows: int, minimum: int = MIN_CHUNK_ROWS) -> int:
+    """
+    Number of rows to process at a time within the budget.
+
+    Args:
+        bytes_per_row: Estimated memory needed per row processed
+        n_rows: Total number of rows
+        minimum: Smallest chunk to return, however tight the budget
+
+    Returns:
+        ``n_rows`` without a budget, otherwise as many rows as fit in a
+        share of the remaining budget
+    """
+    available = memory_available()
+    if available is None or bytes_per_row <= 0:
+        return max(1, n_rows)
+    rows = int(available * CHUNK_BUDGET_FRACTION / bytes_per_row)
+    return max(1, min(n_rows, max(minimum, rows)))
+
+
+def frame_row_bytes(frame: pd.DataFrame, sample_size: int = 1000) -> float:
+    """Estimated memory per row of a DataFrame, from the deep size of a sample."""
+    if len(frame) == 0:
+        return 0.0
+    sample = frame.iloc[:sample_size]
+    return float(sample.memory_usage(deep=True, index=False).sum()) / len(sample)
+
+
+def spill_dir() -> Path:
+    """
+    Directory for spilled arrays.
+
+    Uses SO_SPILL_DIR if it is set, otherwise a new temporary directory;
+    its spill files are removed when the process exits.
+    """
+    global _SPILL_DIR
+
+    with _SPILL_LOCK:
+        if _SPILL_DIR is None:
+            base = os.environ.get('SO_SPILL_DIR')
+            if base:
+                Path(base).mkdir(parents=True, exist_ok=True)
+            _SPILL_DIR = Path(tempfile.mkdtemp(prefix='so_lib-spill-', dir=base or None))
+            atexit.register(shutil.rmtree, _SPILL_DIR, True)
+        return _SPILL_DIR
+
+
+def spill_array(array: np.ndarray) -> np.ndarray:
+    """
+    Move an array to disk if it doesn't fit in the remaining budget.
+
+    Args:
+        array: Array of a numeric dtype
+
+    Returns:
+        ``array`` itself if there is no budget or it fits, otherwise a
+        read-only memory-mapped copy backed by a temporary ``.npy`` file.
+        The caller should drop its references to ``array``.
+    """
+    available = memory_available()
+    if available is None or array.dtype.hasobject or array.nbytes <= available * CHUNK_BUDGET_FRACTION:
+        return array
+
+    directory = spill_dir()
+    with _SPILL_LOCK:
+        _SPILLED['files'] += 1
+        _SPILLED['bytes'] += array.nbytes
+        path = directory / f"{_SPILLED['files']}.npy"
+    np.save(path, array, allow_pickle=False)
+    return np.load(path, mmap_mode='r')
+
+
+def memory_report() -> Dict[str, Optional[int]]:
+    """
+    Live memory usage against the budget.
+
+    Returns:
+        Dictionary with limit, usage and available bytes (limit and
+        available are None without a budget) and the number and size of
+        arrays spilled to disk
+    """
+    return {
+        'limit': memory_limit(),
+        'usage': memory_usage(),
+        'available': memory_available(),
+        'spilled_files': _SPILLED['files'],
+        'spilled_bytes': _SPILLED['bytes'],
+    }
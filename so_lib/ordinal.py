@@ -0,0 +1,361 @@
+"""
+Ordinal questions for the Stack Overflow Survey Data Analysis Library.
+
+Questions such as ``Age``, ``OrgSize``, ``YearsCode`` and the satisfaction
+scales have ordered answers. Each ordinal question gets an OrdinalScale:
+its answers in order plus a numeric value per answer. Scales come from,
+in order of precedence:
+
+- register_ordinal(), for questions configured in code,
+- an ``order`` column in the schema holding the ``;``-separated answers,
+  lowest first, or
+- inference from the answers: known agreement / satisfaction / trust
+  scales, or labels with numbers such as ``25-34 years old``,
+  ``Less than 1 year`` or ``10,000 or more employees``.
+
+Answers are encoded once per question into cached integer codes (see
+index.ordinal_codes), from which cumulative distributions, medians and
+ordinal crosstabs are computed vectorized.
+
+Example::
+
+    ordinal_distribution('Age')['median']
+    ordinal_crosstab('YearsCode', 'RemoteWork')['median']
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .core import load_data, question_info
+from .index import answer_counts, cached, indicator_matrix, option_vocabulary, ordinal_codes
+
+# Answers that are not on any scale, such as "Prefer not to say"
+NON_ANSWER_PATTERN = re.compile(
+    r"prefer not|don['’]?t know|do not know|not sure|not applicable|^n/?a$|^other\b",
+    re.IGNORECASE
+)
+
+# Common survey scales, lowest first
+LIKERT_SCALES = (
+    ('Strongly disagree', 'Disagree', 'Neither agree nor disagree', 'Agree', 'Strongly agree'),
+    ('Very dissatisfied', 'Slightly dissatisfied', 'Neither satisfied nor dissatisfied',
+     'Slightly satisfied', 'Very satisfied'),
+    ('Very unfavorable', 'Unfavorable', 'Indifferent', 'Favorable', 'Very favorable'),
+    ('Highly distrust', 'Somewhat distrust', 'Neither trust nor distrust', 'Somewhat trust', 'Highly trust'),
+    ('Never', 'Rarely', 'Sometimes', 'Often', 'Always'),
+)
+
+_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_RANGE = re.compile(r'\d\s*(?:-|–|to|and)\s*\d')
+_BELOW = re.compile(r'\b(?:under|less than|fewer than|younger than|below)\b')
+_ABOVE = re.compile(r'\b(?:or more|or older|or over|more than|over|older than|and above|or greater)\b|\+')
+
+# Labels without digits that still name a number
+_WORD_NUMBERS = {'just me': 1.0}
+
+_ORDINAL_SCALES: Dict[str, 'OrdinalScale'] = {}
+
+
+class OrdinalScale:
+    """
+    The ordered answers of an ordinal question and their numeric values.
+
+    Attributes:
+        levels: Answers, lowest first
+        values: Numeric value of each level, non-decreasing
+        source: Where the scale came from: 'registered', 'schema' or 'inferred'
+    """
+
+    def __init__(self, levels: Sequence[str], values: Optional[Sequence[float]] = None, source: str = 'registered'):
+        self.levels = tuple(str(level) for level in levels)
+        if len(set(self.levels)) != len(self.levels):
+            raise ValueError("Ordinal levels must be distinct")
+        if values is None:
+            values = np.arange(1, len(self.levels) + 1)
+        self.values = np.asarray(values, dtype=np.float64)
+        if len(self.values) != len(self.levels):
+            raise ValueError("Ordinal values must have one value per level")
+        self.values.flags.writeable = False
+        self.source = source
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __repr__(self):
+        return f"OrdinalScale({list(self.levels)}, source={self.source!r})"
+
+    def position(self, level: str) -> int:
+        """Position of a level on the scale."""
+        try:
+            return self.levels.index(str(level))
+        except ValueError:
+            raise ValueError(f"'{level}' is not a level of the scale") from None
+
+
+def register_ordinal(question_id: str, levels: Optional[Sequence[str]], values: Optional[Sequence[float]] = None) -> None:
+    """
+    Configure the scale of an ordinal question.
+
+    Registered scales take precedence over the schema and inference.
+
+    Args:
+        question_id: Question identifier
+        levels: Answers, lowest first; None removes the registration
+        values: Numeric value of each level (default: 1, 2, ...)
+    """
+    if levels is None:
+        _ORDINAL_SCALES.pop(question_id, None)
+    else:
+        _ORDINAL_SCALES[question_id] = OrdinalScale(levels, values)
+
+
+def _numeric_level(label: str) -> Optional[Tuple[Tuple[float, int], float]]:
+    """
+    Sort key and value of a label that names a number or a range.
+
+    Closed ranges are valued at their midpoint; open-ended labels such as
+    ``Under 18`` or ``More than 50`` just beyond their bound.
+    """
+    text = label.lower().strip()
+    for words, value in _WORD_NUMBERS.items():
+        if text.startswith(words):
+            return (value, 0), value
+
+    numbers = [float(number.replace(',', '')) for number in _NUMBER.findall(text)]
+    if not numbers:
+        return None
+    if len(numbers) >= 2 and _RANGE.search(text):
+        return (numbers[0], 0), (numbers[0] + numbers[1]) / 2
+    if _BELOW.search(text):
+        return (numbers[0], -1), numbers[0] - 0.5
+    if _ABOVE.search(text):
+        return (numbers[0], 1), numbers[0] + 0.5
+    return (numbers[0], 0), numbers[0]
+
+
+def infer_scale(labels: Iterable[object]) -> Optional[OrdinalScale]:
+    """
+    Infer an ordinal scale from the distinct answers of a question.
+
+    Args:
+        labels: Distinct answers; missing answers and non-answers such as
+            "Prefer not to say" are left off the scale
+
+    Returns:
+        OrdinalScale, or None if the answers don't form a known scale or
+        don't all name numbers
+    """
+    labels = [str(label) for label in labels if not pd.isna(label)]
+    labels = [label for label in labels if not NON_ANSWER_PATTERN.search(label)]
+    if len(labels) < 2:
+        return None
+
+    present = {label.lower(): label for label in labels}
+    for scale in LIKERT_SCALES:
+        positions = {level.lower(): i for i, level in enumerate(scale)}
+        if set(present) <= set(positions):
+            ordered = sorted(present, key=positions.get)
+            return OrdinalScale(
+                [present[level] for level in ordered],
+                [positions[level] + 1 for level in ordered],
+                source='inferred'
+            )
+
+    parsed = [_numeric_level(label) for label in labels]
+    if any(level is None for level in parsed):
+        return None
+    order = sorted(range(len(labels)), key=lambda i: parsed[i][0])
+    return OrdinalScale([labels[i] for i in order], [parsed[i][1] for i in order], source='inferred')
+
+
+def ordinal_scale(data: Dict[str, pd.DataFrame], question_id: str) -> OrdinalScale:
+    """
+    Get the scale of an ordinal question.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        question_id: Question identifier
+
+    Returns:
+        The registered scale, the scale in the schema's ``order`` column, or
+        the scale inferred from the answers
+
+    Raises:
+        ValueError: If the question is unknown, multiple-choice or not ordinal
+    """
+    question_info(data, question_id, expected_type='SC')
+    if question_id in _ORDINAL_SCALES:
+        return _ORDINAL_SCALES[question_id]
+
+    schema = data['schema']
+    if 'order' in schema.columns:
+        order = schema.loc[schema['column'] == question_id, 'order']
+        if len(order) and isinstance(order.iloc[0], str) and order.iloc[0].strip():
+            return OrdinalScale([level.strip() for level in order.iloc[0].split(';')], source='schema')
+
+    raw_data = data['raw data']
+    scale = cached(raw_data, ('ordinal_scale', question_id),
+                   lambda: infer_scale(answer_counts(raw_data, question_id).index))
+    if scale is None:
+        raise ValueError(
+            f"Question '{question_id}' is not ordinal; configure its order with register_ordinal()"
+        )
+    return scale
+
+
+def natural_order(labels: Sequence[object]) -> List[object]:
+    """
+    Order answers naturally for display.
+
+    Answers on an inferred scale come first in scale order, followed by
+    the rest (such as "Prefer not to say") in their given order. Other
+    answers are sorted as text, comparing runs of digits as numbers.
+
+    Args:
+        labels: Answers
+
+    Returns:
+        The answers in natural order
+    """
+    scale = infer_scale(labels)
+    if scale is not None:
+        rank = {level: i for i, level in enumerate(scale.levels)}
+        return sorted(labels, key=lambda label: rank.get(str(label), len(rank)))
+
+    def key(label):
+        return [(0, float(part), '') if part.isdigit() else (1, 0.0, part.lower())
+                for part in re.split(r'(\d+)', str(label)) if part]
+    return sorted(labels, key=key)
+
+
+def _ordinal_question(question_id: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str], OrdinalScale, np.ndarray]:
+    """Load the data and encode an ordinal question."""
+    data = load_data()
+    question = question_info(data, question_id, expected_type='SC')
+    scale = ordinal_scale(data, question_id)
+    return data, question, scale, ordinal_codes(data['raw data'], question_id, scale.levels)
+
+
+def _medians(cumulative: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Position of the median level for each row of cumulative counts (-1 if empty)."""
+    medians = np.argmax(cumulative >= totals[:, None] / 2, axis=1)
+    return np.where(totals > 0, medians, -1)
+
+
+def ordinal_distribution(question_id: str) -> Dict[str, object]:
+    """
+    Calculate the ordered and cumulative distribution of an ordinal question.
+
+    Percentages are relative to the respondents with an answer on the
+    scale; missing answers and non-answers are left out.
+
+    Args:
+        question_id: Question identifier
+
+    Returns:
+        Dictionary with question information, the 'levels' and their
+        'values', the 'distribution' and 'cumulative' percentages by level
+        in scale order, the 'median' level, and the 'median_value' and
+        'mean' of the numeric values
+
+    Raises:
+        ValueError: If question_id is invalid or the question is not ordinal
+    """
+    try:
+        data, question, scale, codes = _ordinal_question(question_id)
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(scale)).astype(np.int64)
+        total = counts.sum()
+        cumulative = np.cumsum(counts)
+        median = _medians(cumulative[None, :], np.array([total]))[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentages = counts / total * 100
+            cumulative_percentages = cumulative / total * 100
+            mean = float(counts @ scale.values / total) if total else float('nan')
+
+        return {
+            "question_id": question_id,
+            "question_text": question['question_text'],
+            "levels": list(scale.levels),
+            "values": scale.values.tolist(),
+            "respondents": int(total),
+            "distribution": dict(zip(scale.levels, percentages.tolist())),
+            "cumulative": dict(zip(scale.levels, cumulative_percentages.tolist())),
+            "median": scale.levels[median] if median >= 0 else None,
+            "median_value": float(scale.values[median]) if median >= 0 else float('nan'),
+            "mean": mean
+        }
+    except Exception as e:
+        print(f"Error calculating ordinal distribution: {e}")
+        raise
+
+
+def ordinal_crosstab(ordinal_question_id: str, by_question_id: str) -> Dict[str, Union[str, List[str], pd.DataFrame, pd.Series]]:
+    """
+    Cross-tabulate an ordinal question against the options of another question.
+
+    The counts of every (option, level) pair come from one sparse product
+    of the grouping question's indicator matrix and the one-hot ordinal
+    codes; cumulative percentages, medians and means follow from the
+    counts. Respondents count toward every option they selected in a
+    multiple-choice grouping question.
+
+    Args:
+        ordinal_question_id: Ordinal question for the columns
+        by_question_id: Single- or multiple-choice question for the rows
+
+    Returns:
+        Dictionary with both question IDs and texts, the 'levels', and
+        'table' (respondent counts) and 'cumulative' (row percentages)
+        DataFrames with one row per option of the grouping question (by
+        frequency) and one column per level (in scale order), plus the
+        'median' level and 'mean' value of each option
+
+    Raises:
+        ValueError: If a question ID is invalid or the question is not ordinal
+    """
+    try:
+        data, question, scale, codes = _ordinal_question(ordinal_question_id)
+        raw_data = data['raw data']
+        by_question = question_info(data, by_question_id)
+
+        groups, options = indicator_matrix(raw_data, by_question_id, by_question['type'])
+        answered = np.flatnonzero(codes >= 0)
+        levels = sparse.csr_matrix(
+            (np.ones(len(answered)), (answered, codes[answered])),
+            shape=(len(raw_data), len(scale))
+        )
+        counts = (groups.T @ levels).toarray().astype(np.int64)
+
+        totals = counts.sum(axis=1)
+        cumulative = np.cumsum(counts, axis=1)
+        medians = _medians(cumulative, totals)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cumulative_percentages = cumulative / totals[:, None] * 100
+            means = counts @ scale.values / totals
+
+        index = pd.Index(options, name=by_question_id)
+        columns = pd.Index(scale.levels, name=ordinal_question_id)
+        order = pd.Index(option_vocabulary(raw_data, by_question_id, by_question['type']).index, name=by_question_id)
+
+        return {
+            "ordinal_question_id": ordinal_question_id,
+            "ordinal_question_text": question['question_text'],
+            "by_question_id": by_question_id,
+            "by_question_text": by_question['question_text'],
+            "levels": list(scale.levels),
+            "table": pd.DataFrame(counts, index=index, columns=columns).reindex(order),
+            "cumulative": pd.DataFrame(cumulative_percentages, index=index, columns=columns).reindex(order),
+            "median": pd.Series(
+                [scale.levels[m] if m >= 0 else None for m in medians], index=index, name='median', dtype=object
+            ).reindex(order),
+            "mean": pd.Series(means, index=index, name='mean').reindex(order)
+        }
+    except Exception as e:
+        print(f"Error calculating ordinal crosstab: {e}")
+        raise
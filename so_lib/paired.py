@@ -0,0 +1,168 @@
+"""
+Paired-question analysis for the Stack Overflow Survey Data Analysis Library.
+
+The survey asks several multiple-choice questions in pairs, e.g.
+``LanguageHaveWorkedWith`` / ``LanguageWantToWorkWith``. This module finds
+those pairs in the schema and computes the per-option "admired" and
+"desired" metrics from the joint answers of each pair.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .core import load_data
+from .index import option_index
+
+HAVE_SUFFIX = 'HaveWorkedWith'
+WANT_SUFFIX = 'WantToWorkWith'
+
+
+def _find_pairs(schema: pd.DataFrame, raw_data: pd.DataFrame) -> List[Dict[str, str]]:
+    """Pairs of MC questions named <prefix>HaveWorkedWith / <prefix>WantToWorkWith."""
+    mc_questions = set(schema.loc[schema['type'] == 'MC', 'column']) & set(raw_data.columns)
+
+    pairs = []
+    for question_id in schema['column']:
+        if question_id not in mc_questions or not question_id.endswith(HAVE_SUFFIX):
+            continue
+        prefix = question_id[:-len(HAVE_SUFFIX)]
+        if prefix + WANT_SUFFIX in mc_questions:
+            pairs.append({
+                "prefix": prefix,
+                "have_question_id": question_id,
+                "want_question_id": prefix + WANT_SUFFIX
+            })
+    return pairs
+
+
+def paired_questions() -> List[Dict[str, str]]:
+    """
+    List the HaveWorkedWith / WantToWorkWith question pairs in the schema.
+
+    Returns:
+        List of dictionaries with the pair prefix (e.g. 'Language') and the
+        identifiers of both questions, in schema order
+    """
+    try:
+        data = load_data()
+        return _find_pairs(data['schema'], data['raw data'])
+    except Exception as e:
+        print(f"Error listing paired questions: {e}")
+        raise
+
+
+def _aligned_matrix(raw_data: pd.DataFrame, question_id: str, codes: Dict[str, int]) -> sparse.csr_matrix:
+    """Respondent x option matrix of a question with columns in the order of ``codes``."""
+    index = option_index(raw_data, question_id)
+    rows, option_codes = index.codes()
+    columns = np.array([codes[option] for option in index.options], dtype=np.int64)[option_codes]
+    data = np.ones(len(rows), dtype=np.int32)
+    return sparse.csr_matrix((data, (rows, columns)), shape=(index.n_rows, len(codes)))
+
+
+def _pair_metrics(raw_data: pd.DataFrame, pair: Dict[str, str]) -> Dict[str, object]:
+    """Compute the metrics of one pair from the cached option indexes."""
+    have_id, want_id = pair['have_question_id'], pair['want_question_id']
+
+    # One column per option named in either question
+    options = list(dict.fromkeys(
+        list(option_index(raw_data, have_id).options) + list(option_index(raw_data, want_id).options)
+    ))
+    codes = {option: code for code, option in enumerate(options)}
+
+    have = _aligned_matrix(raw_data, have_id, codes)
+    want = _aligned_matrix(raw_data, want_id, codes)
+
+    have_counts = np.asarray(have.sum(axis=0)).ravel()
+    want_counts = np.asarray(want.sum(axis=0)).ravel()
+    both_counts = np.asarray(have.multiply(want).sum(axis=0)).ravel()
+    respondents = int((raw_data[have_id].notna() | raw_data[want_id].notna()).sum())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        admired = np.where(have_counts > 0, both_counts / have_counts * 100, np.nan)
+    denominator = max(respondents, 1)
+
+    metrics = pd.DataFrame({
+        'have': have_counts,
+        'want': want_counts,
+        'both': both_counts,
+        'have_only': have_counts - both_counts,
+        'want_only': want_counts - both_counts,
+        'have_pct': have_counts / denominator * 100,
+        'desired': want_counts / denominator * 100,
+        'admired': admired,
+    }, index=pd.Index(options, name='option'))
+    metrics = metrics.sort_values('have', ascending=False, kind='mergesort')
+
+    return dict(pair, respondents=respondents, metrics=metrics)
+
+
+def paired_metrics(prefix: str) -> Dict[str, object]:
+    """
+    Calculate admired/desired metrics for one HaveWorkedWith / WantToWorkWith pair.
+
+    Both questions are aligned on the union of their options and the joint
+    counts of every option are computed in one sparse elementwise product.
+
+    Metrics per option:
+        have, want, both, have_only, want_only: respondent counts
+        have_pct: % of respondents who worked with the option
+        desired: % of respondents who want to work with the option
+        admired: % of those who worked with the option who want to keep
+            working with it (also known as retention); NaN if nobody did
+
+    Percentages are relative to the respondents who answered either question.
+
+    Args:
+        prefix: Pair prefix such as 'Language', or either question identifier
+
+    Returns:
+        Dictionary with the pair's question identifiers, the number of
+        respondents, and a 'metrics' DataFrame indexed by option
+
+    Raises:
+        ValueError: If no pair matches prefix
+    """
+    if not prefix or not isinstance(prefix, str):
+        raise ValueError("Prefix must be a non-empty string")
+
+    try:
+        data = load_data()
+        raw_data = data['raw data']
+
+        for pair in _find_pairs(data['schema'], raw_data):
+            if prefix in pair.values():
+                return _pair_metrics(raw_data, pair)
+
+        raise ValueError(f"No {HAVE_SUFFIX}/{WANT_SUFFIX} question pair found for '{prefix}'")
+    except Exception as e:
+        print(f"Error calculating paired metrics: {e}")
+        raise
+
+
+def all_paired_metrics(max_workers: Optional[int] = None) -> Dict[str, Dict[str, object]]:
+    """
+    Calculate admired/desired metrics for every question pair in parallel.
+
+    Args:
+        max_workers: Maximum number of threads (default: one per pair, up to
+            the ThreadPoolExecutor default)
+
+    Returns:
+        Dictionary mapping each pair prefix to the result of paired_metrics
+    """
+    try:
+        data = load_data()
+        raw_data = data['raw data']
+        pairs = _find_pairs(data['schema'], raw_data)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda pair: _pair_metrics(raw_data, pair), pairs)
+            return {pair['prefix']: result for pair, result in zip(pairs, results)}
+    except Exception as e:
+        print(f"Error calculating paired metrics: {e}")
+        raise
@@ -0,0 +1,394 @@
+"""
+Filter expressions for the Stack Overflow Survey Data Analysis Library.
+
+This module provides a small query language for describing respondent
+segments, for example::
+
+    MainBranch == "I am a developer by profession" and LanguageHaveWorkedWith has "Rust"
+
+Supported predicates:
+
+- ``Q == "value"`` / ``Q != "value"``: exact answer match (``!=`` only
+  matches respondents who answered the question)
+- ``Q has "value"``: the ``;``-delimited answer contains ``value`` as a
+  whole option (looked up in the cached option index)
+- ``Q in ("a", "b")``: exact answer match against any of the listed values;
+  numbers match numerically, like ``==``
+- ``Q < 10``, ``Q <= 10``, ``Q > 10``, ``Q >= 10``: numeric comparison
+
+Predicates can be combined with ``and``, ``or``, ``not`` and parentheses.
+Question identifiers that are not plain words can be quoted with backticks.
+
+Expressions are parsed once into a tree of nodes that evaluate to boolean
+NumPy masks. Conjunctions evaluate their most selective predicate first and
+only test the remaining predicates on the rows that are still candidates;
+disjunctions do the reverse.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .index import column, has_column, option_index
+
+# Number of rows sampled to estimate the selectivity of a predicate
+SELECTIVITY_SAMPLE_SIZE = 1024
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>==|!=|<=|>=|<|>|\(|\)|,)
+      | (?P<quoted>`[^`]+`)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'has', 'in'}
+_COMPARISONS = {'==', '!=', '<', '<=', '>', '>='}
+
+Value = Union[str, float]
+
+
+def _tokenize(expression: str) -> List[Tuple[str, object, int]]:
+    """Split an expression into (kind, value, position) tokens."""
+    tokens = []
+    pos = 0
+    length = len(expression)
+    while pos < length:
+        if expression[pos:].strip() == '':
+            break
+        match = _TOKEN_PATTERN.match(expression, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid syntax at position {pos}: {expression[pos:]!r}")
+        start = match.start(match.lastgroup)
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'string':
+            tokens.append(('value', re.sub(r'\\(.)', r'\1', text[1:-1]), start))
+        elif kind == 'number':
+            tokens.append(('value', float(text), start))
+        elif kind == 'quoted':
+            tokens.append(('ident', text[1:-1], start))
+        elif kind == 'word' and text.lower() in _KEYWORDS:
+            tokens.append(('keyword', text.lower(), start))
+        elif kind == 'word':
+            tokens.append(('ident', text, start))
+        else:
+            tokens.append(('op', text, start))
+        pos = match.end()
+    tokens.append(('end', None, length))
+    return tokens
+
+
+def _sample_positions(n_rows: int) -> np.ndarray:
+    """Evenly spaced row positions used for selectivity estimates."""
+    if n_rows <= SELECTIVITY_SAMPLE_SIZE:
+        return np.arange(n_rows)
+    return np.linspace(0, n_rows - 1, SELECTIVITY_SAMPLE_SIZE).astype(np.int64)
+
+
+class Node:
+    """Base class for compiled filter expression nodes."""
+
+    def columns(self) -> List[str]:
+        """Question identifiers referenced by this node."""
+        raise NotImplementedError
+
+    def evaluate(self, raw_data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the node for the given row positions.
+
+        Args:
+            raw_data: Survey responses
+            rows: Positions of the rows to test
+
+        Returns:
+            Boolean array aligned with ``rows``
+        """
+        raise NotImplementedError
+
+    def selectivity(self, raw_data: pd.DataFrame) -> float:
+        """Estimated fraction of rows matched by this node."""
+        raise NotImplementedError
+
+
+class Predicate(Node):
+    """A single comparison between a question and a value."""
+
+    def __init__(self, column: str, op: str, value: Union[Value, Tuple[Value, ...]]):
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        return f"Predicate({self.column!r}, {self.op!r}, {self.value!r})"
+
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def evaluate(self, raw_data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        if self.op == 'has':
+            return option_index(raw_data, self.column).mask(self.value)[rows]
+
+        values = pd.Series(column(raw_data, self.column).to_numpy()[rows])
+        answered = values.notna().to_numpy()
+
+        if self.op == 'in':
+            # Numbers match by value, like ==, so text-stored numbers are found
+            numbers = [value for value in self.value if isinstance(value, float)]
+            matched = values.isin([value for value in self.value if not isinstance(value, float)]).to_numpy()
+            if numbers:
+                matched = matched | np.isin(pd.to_numeric(values, errors='coerce').to_numpy(dtype=float), numbers)
+        elif isinstance(self.value, float):
+            numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+            with np.errstate(invalid='ignore'):
+                matched = {
+                    '==': np.equal, '!=': np.not_equal,
+                    '<': np.less, '<=': np.less_equal,
+                    '>': np.greater, '>=': np.greater_equal,
+                }[self.op](numbers, self.value)
+            answered = ~np.isnan(numbers)
+        elif self.op == '==':
+            matched = (values == self.value).to_numpy()
+        elif self.op == '!=':
+            matched = (values != self.value).to_numpy()
+        else:
+            raise ValueError(f"Operator '{self.op}' requires a numeric value")
+
+        return np.asarray(matched, dtype=bool) & answered
+
+    def selectivity(self, raw_data: pd.DataFrame) -> float:
+        if self.op == 'has' and len(raw_data):
+            # Exact, from the option index the predicate uses anyway
+            index = option_index(raw_data, self.column)
+            return len(index.positions(self.value)) / len(raw_data)
+
+        sample = _sample_positions(len(raw_data))
+        if len(sample) == 0:
+            return 0.0
+        return float(self.evaluate(raw_data, sample).mean())
+
+
+class And(Node):
+    """Conjunction; evaluates the most selective child first."""
+
+    def __init__(self, children: Sequence[Node]):
+        self.children = list(children)
+
+    def __repr__(self):
+        return f"And({self.children!r})"
+
+    def columns(self) -> List[str]:
+        return [c for child in self.children for c in child.columns()]
+
+    def evaluate(self, raw_data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        ordered = sorted(self.children, key=lambda child: child.selectivity(raw_data))
+        candidates = np.arange(len(rows))
+        for child in ordered:
+            if len(candidates) == 0:
+                break
+            candidates = candidates[child.evaluate(raw_data, rows[candidates])]
+
+        result = np.zeros(len(rows), dtype=bool)
+        result[candidates] = True
+        return result
+
+    def selectivity(self, raw_data: pd.DataFrame) -> float:
+        return float(np.prod([child.selectivity(raw_data) for child in self.children]))
+
+
+class Or(Node):
+    """Disjunction; evaluates the least selective child first."""
+
+    def __init__(self, children: Sequence[Node]):
+        self.children = list(children)
+
+    def __repr__(self):
+        return f"Or({self.children!r})"
+
+    def columns(self) -> List[str]:
+        return [c for child in self.children for c in child.columns()]
+
+    def evaluate(self, raw_data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        ordered = sorted(self.children, key=lambda child: child.selectivity(raw_data), reverse=True)
+        result = np.zeros(len(rows), dtype=bool)
+        pending = np.arange(len(rows))
+        for child in ordered:
+            if len(pending) == 0:
+                break
+            matched = child.evaluate(raw_data, rows[pending])
+            result[pending[matched]] = True
+            pending = pending[~matched]
+        return result
+
+    def selectivity(self, raw_data: pd.DataFrame) -> float:
+        misses = np.prod([1.0 - child.selectivity(raw_data) for child in self.children])
+        return float(1.0 - misses)
+
+
+class Not(Node):
+    """Negation of a node."""
+
+    def __init__(self, child: Node):
+        self.child = child
+
+    def __repr__(self):
+        return f"Not({self.child!r})"
+
+    def columns(self) -> List[str]:
+        return self.child.columns()
+
+    def evaluate(self, raw_data: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        return ~self.child.evaluate(raw_data, rows)
+
+    def selectivity(self, raw_data: pd.DataFrame) -> float:
+        return 1.0 - self.child.selectivity(raw_data)
+
+
+class _Parser:
+    """Recursive-descent parser producing a tree of Nodes."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def advance(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def error(self, message: str):
+        _, _, position = self.peek()
+        raise ValueError(f"{message} at position {position} in query: {self.expression!r}")
+
+    def accept(self, kind: str, value: Optional[str] = None) -> bool:
+        token_kind, token_value, _ = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Optional[str] = None, message: str = None):
+        if not self.accept(kind, value):
+            self.error(message or f"Expected {value or kind}")
+        return self.tokens[self.pos - 1][1]
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek()[0] != 'end':
+            self.error("Unexpected token")
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.accept('keyword', 'or'):
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self) -> Node:
+        children = [self.parse_not()]
+        while self.accept('keyword', 'and'):
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self) -> Node:
+        if self.accept('keyword', 'not'):
+            return Not(self.parse_not())
+        if self.accept('op', '('):
+            node = self.parse_or()
+            self.expect('op', ')')
+            return node
+        return self.parse_predicate()
+
+    def parse_predicate(self) -> Node:
+        column = self.expect('ident', message="Expected a question identifier")
+        kind, op, _ = self.peek()
+
+        if kind == 'op' and op in _COMPARISONS:
+            self.advance()
+            value = self.expect('value', message=f"Expected a value after '{op}'")
+            if isinstance(value, str) and op not in ('==', '!='):
+                self.error(f"Operator '{op}' requires a numeric value")
+            return Predicate(column, op, value)
+
+        if kind == 'keyword' and op == 'has':
+            self.advance()
+            value = self.expect('value', message="Expected a value after 'has'")
+            return Predicate(column, 'has', str(value))
+
+        if kind == 'keyword' and op == 'in':
+            self.advance()
+            self.expect('op', '(')
+            values = [self.expect('value')]
+            while self.accept('op', ','):
+                values.append(self.expect('value'))
+            self.expect('op', ')')
+            return Predicate(column, 'in', tuple(values))
+
+        self.error("Expected an operator (==, !=, <, <=, >, >=, has, in)")
+
+
+class Query:
+    """A parsed filter expression that can be applied to survey responses."""
+
+    def __init__(self, expression: str, root: Node):
+        self.expression = expression
+        self.root = root
+
+    def __repr__(self):
+        return f"Query({self.expression!r})"
+
+    @property
+    def columns(self) -> List[str]:
+        """Question identifiers referenced by the query, in order of appearance."""
+        return list(dict.fromkeys(self.root.columns()))
+
+    def mask(self, raw_data: pd.DataFrame, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Evaluate the query against a DataFrame of responses.
+
+        Args:
+            raw_data: Survey responses, one row per respondent
+            rows: Positions of the rows to test (default: all of them)
+
+        Returns:
+            Boolean NumPy array with one entry per tested row
+
+        Raises:
+            ValueError: If the query references an unknown question
+        """
+        for column in self.columns:
+            if not has_column(raw_data, column):
+                raise ValueError(f"Question ID '{column}' not found in the dataset")
+
+        return self.root.evaluate(raw_data, np.arange(len(raw_data)) if rows is None else rows)
+
+
+@lru_cache(maxsize=256)
+def parse_query(expression: str) -> Query:
+    """
+    Parse a filter expression.
+
+    Parsed queries are cached, so repeated calls with the same expression
+    return the same Query object.
+
+    Args:
+        expression: Filter expression, e.g. ``Q1 == "A" and Q2 has "X"``
+
+    Returns:
+        Parsed Query
+
+    Raises:
+        ValueError: If the expression is empty or not valid syntax
+    """
+    if not expression or not isinstance(expression, str) or not expression.strip():
+        raise ValueError("Query must be a non-empty string")
+
+    return Query(expression, _Parser(expression).parse())
@@ -0,0 +1,371 @@
+"""
+Static reports for the Stack Overflow Survey Data Analysis Library.
+
+build_report() renders the distribution of every single- and
+multiple-choice question, and any requested crosstabs, into one HTML page
+with SVG bar charts or one Markdown document::
+
+    build_report('report.html', crosstabs=[('RemoteWork', 'OrgSize')])
+
+Results are computed in this process from the loaded dataset; rendering
+them fans out over worker processes. The rendered fragment of each section
+is stored in the cache directory with a digest of the section's results,
+so rebuilding a report only renders the sections whose results changed
+since the last run.
+"""
+
+import hashlib
+import html
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .analysis import crosstab, distribution_mc, distribution_sc
+from .core import cache_path, load_data
+
+REPORT_FORMATS = ('html', 'markdown')
+
+# Bump when rendering changes, so stored fragments are rendered again
+REPORT_FORMAT_VERSION = 1
+REPORT_SUFFIX = 'report.json'
+
+# SVG bar chart geometry, in pixels
+CHART_WIDTH = 720
+LABEL_WIDTH = 280
+BAR_HEIGHT = 20
+MAX_LABEL_LENGTH = 45
+
+# Width of the text bars in Markdown tables, in characters
+MARKDOWN_BAR_WIDTH = 20
+
+_HTML_STYLE = """
+body { font-family: sans-serif; max-width: 960px; margin: 2em auto; color: #222; }
+section { margin-bottom: 2.5em; }
+.question { color: #555; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border: 1px solid #ddd; padding: 0.25em 0.5em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+"""
+
+
+def _finite(value: float) -> Optional[float]:
+    """A float that JSON can hold: None for NaN."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def report_sections(
+    question_ids: Optional[Sequence[str]] = None,
+    crosstabs: Sequence[Tuple[str, str]] = (),
+    top: Optional[int] = None
+) -> List[Dict[str, object]]:
+    """
+    Compute the results shown in a report.
+
+    Args:
+        question_ids: Questions whose distributions are shown (default:
+            every single- and multiple-choice question in the schema)
+        crosstabs: (row question, column question) pairs, shown as row
+            percentages
+        top: Show only this many of the most common options per question
+
+    Returns:
+        One dictionary of plain values per section, with keys id, kind,
+        title, question_text and the section's results
+    """
+    data = load_data()
+    raw_data = data['raw data']
+    schema = data['schema']
+
+    if question_ids is None:
+        question_ids = [
+            q for q in schema.loc[schema['type'].isin(['SC', 'MC']), 'column'] if q in raw_data.columns
+        ]
+
+    types = dict(zip(schema['column'], schema['type']))
+    sections = []
+    for question_id in question_ids:
+        if types.get(question_id, 'SC') == 'MC':
+            dist = distribution_mc(question_id)
+        else:
+            dist = distribution_sc(question_id)
+        items = sorted(dist['distribution'].items(), key=lambda item: item[1], reverse=True)[:top]
+        sections.append({
+            'id': f"distribution:{question_id}",
+            'kind': 'distribution',
+            'title': question_id,
+            'question_text': str(dist['question_text']),
+            'rows': [[str(option), _finite(percentage)] for option, percentage in items]
+        })
+
+    for row_question_id, column_question_id in crosstabs:
+        result = crosstab(row_question_id, column_question_id, normalize='index')
+        table = result['table']
+        if top is not None:
+            table = table.iloc[:top, :top]
+        sections.append({
+            'id': f"crosstab:{row_question_id}:{column_question_id}",
+            'kind': 'crosstab',
+            'title': f"{row_question_id} by {column_question_id}",
+            'question_text': f"{result['row_question_text']} / {result['column_question_text']}",
+            'columns': [str(column) for column in table.columns],
+            'rows': [
+                [str(option), [_finite(value) for value in values]]
+                for option, values in zip(table.index, table.to_numpy(dtype=float))
+            ]
+        })
+
+    return sections
+
+
+def section_digest(section: Dict[str, object], report_format: str) -> str:
+    """Digest of a section's results and the way it is rendered."""
+    payload = json.dumps([REPORT_FORMAT_VERSION, report_format, section], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _label(text: str) -> str:
+    """Shorten a label for a chart axis."""
+    return text if len(text) <= MAX_LABEL_LENGTH else text[:MAX_LABEL_LENGTH - 1] + "\u2026"
+
+
+def svg_bar_chart(items: Sequence[Tuple[str, Optional[float]]]) -> str:
+    """
+    Horizontal SVG bar chart of percentages.
+
+    Args:
+        items: (label, percentage) pairs, drawn top to bottom
+
+    Returns:
+        An ``<svg>`` element; full labels are in each bar's tooltip
+    """
+    largest = max([value for _, value in items if value] or [1.0])
+    bar_space = CHART_WIDTH - LABEL_WIDTH - 60
+    height = BAR_HEIGHT * len(items) + 4
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{height}" '
+        f'viewBox="0 0 {CHART_WIDTH} {height}" font-size="12" role="img">'
+    ]
+    for position, (label, value) in enumerate(items):
+        value = value or 0.0
+        y = position * BAR_HEIGHT + 2
+        width = bar_space * value / largest
+        text_y = y + BAR_HEIGHT * 0.7
+        parts.append(
+            f'<g><title>{html.escape(label)}: {value:.2f}%</title>'
+            f'<text x="{LABEL_WIDTH - 6}" y="{text_y:.1f}" text-anchor="end">{html.escape(_label(label))}</text>'
+            f'<rect x="{LABEL_WIDTH}" y="{y}" width="{width:.1f}" height="{BAR_HEIGHT - 4}" fill="#1f77b4"/>'
+            f'<text x="{LABEL_WIDTH + width + 4:.1f}" y="{text_y:.1f}">{value:.1f}%</text></g>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _percent(value: Optional[float]) -> str:
+    """Format a percentage for a table cell."""
+    return '' if value is None else f"{value:.1f}%"
+
+
+def _render_html(section: Dict[str, object]) -> str:
+    """HTML fragment of one section."""
+    parts = [
+        f'<section id="{html.escape(section["id"], quote=True)}">',
+        f'<h2>{html.escape(section["title"])}</h2>',
+        f'<p class="question">{html.escape(section["question_text"])}</p>'
+    ]
+
+    if section['kind'] == 'distribution':
+        parts.append(svg_bar_chart(section['rows']) if section['rows'] else '<p>No answers.</p>')
+    else:
+        header = ''.join(f'<th>{html.escape(column)}</th>' for column in section['columns'])
+        parts.append(f'<table><tr><th></th>{header}</tr>')
+        for option, values in section['rows']:
+            cells = ''.join(
+                f'<td style="background: rgba(31, 119, 180, {(value or 0) / 100 * 0.6:.2f})">{_percent(value)}</td>'
+                for value in values
+            )
+            parts.append(f'<tr><th>{html.escape(option)}</th>{cells}</tr>')
+        parts.append('</table>')
+
+    parts.append('</section>')
+    return "\n".join(parts)
+
+
+def _markdown_cell(text: str) -> str:
+    """Escape text for a Markdown table cell."""
+    return str(text).replace('|', '\\|').replace('\n', ' ')
+
+
+def _render_markdown(section: Dict[str, object]) -> str:
+    """Markdown fragment of one section."""
+    lines = [f"## {section['title']}", "", f"_{_markdown_cell(section['question_text'])}_", ""]
+
+    if section['kind'] == 'distribution':
+        if not section['rows']:
+            return "\n".join(lines + ["No answers."])
+        largest = max([value for _, value in section['rows'] if value] or [1.0])
+        lines += ["| Option | Share | |", "|---|---:|---|"]
+        for option, value in section['rows']:
+            bar = "\u2588" * int(round((value or 0) / largest * MARKDOWN_BAR_WIDTH))
+            lines.append(f"| {_markdown_cell(option)} | {_percent(value)} | {bar} |")
+    else:
+        lines.append("| | " + " | ".join(_markdown_cell(column) for column in section['columns']) + " |")
+        lines.append("|---|" + "---:|" * len(section['columns']))
+        for option, values in section['rows']:
+            lines.append(f"| {_markdown_cell(option)} | " + " | ".join(_percent(value) for value in values) + " |")
+
+    return "\n".join(lines)
+
+
+def render_section(section: Dict[str, object], report_format: str = 'html') -> str:
+    """
+    Render one section of a report.
+
+    Args:
+        section: Section returned by report_sections
+        report_format: 'html' or 'markdown'
+
+    Returns:
+        HTML or Markdown fragment
+    """
+    if report_format == 'html':
+        return _render_html(section)
+    return _render_markdown(section)
+
+
+def _render_job(job: Tuple[Dict[str, object], str]) -> str:
+    """Render a (section, format) pair; the unit of work sent to worker processes."""
+    return render_section(*job)
+
+
+def _document(fragments: List[str], sections: List[Dict[str, object]], title: str, report_format: str) -> str:
+    """Assemble rendered sections into a complete document."""
+    if report_format == 'markdown':
+        return f"# {title}\n\n" + "\n\n".join(fragments) + "\n"
+
+    contents = ''.join(
+        f'<li><a href="#{html.escape(section["id"], quote=True)}">{html.escape(section["title"])}</a></li>'
+        for section in sections
+    )
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(title)}</title>\n<style>{_HTML_STYLE}</style>\n</head>\n<body>\n'
+        f'<h1>{html.escape(title)}</h1>\n<nav><ul>{contents}</ul></nav>\n'
+        + "\n".join(fragments)
+        + '\n</body>\n</html>\n'
+    )
+
+
+def _load_manifest(path: Path, report_format: str) -> Dict[str, Dict[str, str]]:
+    """Fragments stored by the previous build of a report, keyed by section id."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == REPORT_FORMAT_VERSION and state.get('format') == report_format:
+            return state['sections']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def build_report(
+    output: str,
+    question_ids: Optional[Sequence[str]] = None,
+    crosstabs: Sequence[Tuple[str, str]] = (),
+    report_format: Optional[str] = None,
+    top: Optional[int] = None,
+    title: str = "Stack Overflow Developer Survey",
+    jobs: Optional[int] = None
+) -> Dict[str, object]:
+    """
+    Write a report of question distributions and crosstabs.
+
+    Args:
+        output: Path of the report file
+        question_ids: Questions whose distributions are shown (default:
+            every single- and multiple-choice question in the schema)
+        crosstabs: (row question, column question) pairs
+        report_format: 'html' or 'markdown' (default: 'markdown' for .md
+            files, 'html' otherwise)
+        top: Show only this many of the most common options per question
+        title: Title of the report
+        jobs: Number of worker processes rendering sections (default: the
+            number of CPUs; 1 renders in this process)
+
+    Returns:
+        Dictionary with the output path, the number of sections and how
+        many were rendered or reused from the previous build
+
+    Raises:
+        ValueError: If a question ID or the report format is invalid
+    """
+    if report_format is None:
+        report_format = 'markdown' if Path(output).suffix.lower() in ('.md', '.markdown') else 'html'
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Report format must be one of: {', '.join(REPORT_FORMATS)}")
+
+    try:
+        sections = report_sections(question_ids, crosstabs, top=top)
+        digests = [section_digest(section, report_format) for section in sections]
+
+        try:
+            manifest_path = cache_path(output, REPORT_SUFFIX)
+        except OSError:
+            # No cache directory: render every section and don't save a manifest
+            manifest_path = None
+        if manifest_path is not None and os.path.exists(output):
+            previous = _load_manifest(manifest_path, report_format)
+        else:
+            previous = {}
+
+        fragments: List[Optional[str]] = [None] * len(sections)
+        pending = []
+        for position, (section, digest) in enumerate(zip(sections, digests)):
+            stored = previous.get(section['id'])
+            if stored is not None and stored.get('digest') == digest:
+                fragments[position] = stored['fragment']
+            else:
+                pending.append(position)
+
+        jobs = jobs or os.cpu_count() or 1
+        work = [(sections[position], report_format) for position in pending]
+        if jobs > 1 and len(work) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as executor:
+                chunk_size = max(1, len(work) // (jobs * 4))
+                rendered = list(executor.map(_render_job, work, chunksize=chunk_size))
+        else:
+            rendered = [_render_job(job) for job in work]
+        for position, fragment in zip(pending, rendered):
+            fragments[position] = fragment
+
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(_document(fragments, sections, title, report_format))
+
+        if manifest_path is not None:
+            try:
+                with open(manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'version': REPORT_FORMAT_VERSION,
+                        'format': report_format,
+                        'sections': {
+                            section['id']: {'digest': digest, 'fragment': fragment}
+                            for section, digest, fragment in zip(sections, digests, fragments)
+                        }
+                    }, f)
+            except OSError:
+                # The manifest only speeds up the next build
+                pass
+
+        return {
+            'output': str(output),
+            'sections': len(sections),
+            'rendered': len(pending),
+            'reused': len(sections) - len(pending)
+        }
+    except Exception as e:
+        print(f"Error building report: {e}")
+        raise
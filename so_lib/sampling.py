@@ -0,0 +1,263 @@
+"""
+Deterministic sampling for the Stack Overflow Survey Data Analysis Library.
+
+Functions that accept ``sample=`` answer from a stratified random sample
+of the respondents instead of all of them and return estimates with
+margins of error. A sample is drawn once per dataset, size and seed,
+materialized as its own (small) DataFrame and cached, so its option
+indexes and answer counts are built once and later previews are
+near-instant.
+
+Respondents are stratified by the survey year when the data has a year
+column (see STRATA_COLUMNS), so each year of a combined multi-year
+dataset is represented in proportion to its size.
+
+Example::
+
+    distribution_mc('LanguageHaveWorkedWith', sample=0.05)
+    count_respondents('RemoteWork == "Remote"', sample=5000, seed=1)
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+from .index import cached, read_only
+
+# Columns that identify the survey of a respondent in combined datasets,
+# used as strata when present
+STRATA_COLUMNS = ('SurveyYear', 'Year')
+
+DEFAULT_CONFIDENCE = 0.95
+
+SampleSize = Union[int, float]
+
+
+class Estimate(NamedTuple):
+    """An estimated value and the half-width of its confidence interval."""
+
+    value: float
+    margin: float
+
+
+class Sample:
+    """
+    A stratified random sample of the respondents of a dataset.
+
+    Attributes:
+        frame: The sampled responses, in their original order, with a
+            default RangeIndex
+        rows: Row positions of the sampled respondents in the full data
+        strata: Stratum code of each sampled respondent
+        population: Number of respondents in each stratum of the full data
+        sizes: Number of sampled respondents in each stratum
+    """
+
+    def __init__(self, frame: pd.DataFrame, rows: np.ndarray, strata: np.ndarray,
+                 population: np.ndarray, sizes: np.ndarray, seed: int):
+        self.frame = frame
+        self.rows = rows
+        self.strata = strata
+        self.population = population
+        self.sizes = sizes
+        self.seed = seed
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"Sample({len(self)} of {self.population_size} respondents, {len(self.sizes)} strata)"
+
+    @property
+    def population_size(self) -> int:
+        """Number of respondents in the full data."""
+        return int(self.population.sum())
+
+    def info(self, confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, Union[int, float]]:
+        """Description of the sample for results that were estimated from it."""
+        return {
+            'size': len(self),
+            'population': self.population_size,
+            'strata': len(self.sizes),
+            'seed': self.seed,
+            'confidence': confidence,
+        }
+
+    def estimate_ratios(
+        self,
+        y: sparse.spmatrix,
+        x: Optional[np.ndarray] = None,
+        confidence: float = DEFAULT_CONFIDENCE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate population ratios sum(y) / sum(x) with margins of error.
+
+        Uses the stratified combined ratio estimator; its variance is
+        estimated by linearization, with the finite population correction.
+        All columns of ``y`` are estimated at once.
+
+        Args:
+            y: Sampled respondent x k matrix of values to total
+            x: Sampled values of the denominator; None for one per
+                respondent, which estimates the population means of ``y``
+            confidence: Confidence level of the margins
+
+        Returns:
+            Tuple of the k estimated ratios and the half-widths of their
+            confidence intervals
+        """
+        y = sparse.csr_matrix(y, dtype=np.float64)
+        x = np.ones(len(self), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+        # Stratum x respondent membership, to sum within strata by products
+        members = sparse.csr_matrix(
+            (np.ones(len(self)), (self.strata, np.arange(len(self)))),
+            shape=(len(self.sizes), len(self))
+        )
+        sum_y = np.asarray((members @ y).todense())
+        sum_yy = np.asarray((members @ y.multiply(y)).todense())
+        sum_xy = np.asarray((members @ y.multiply(x[:, None])).todense())
+        sum_x = members @ x
+        sum_xx = members @ (x * x)
+
+        n = self.sizes.astype(np.float64)
+        weights = self.population / self.population.sum()
+        total_x = weights @ (sum_x / n)
+        if total_x == 0:
+            return np.full(y.shape[1], np.nan), np.full(y.shape[1], np.nan)
+        ratios = weights @ (sum_y / n[:, None]) / total_x
+
+        # Within-stratum variance of the linearized values y - ratio * x
+        sum_z = sum_y - ratios * sum_x[:, None]
+        sum_zz = sum_yy - 2 * ratios * sum_xy + ratios ** 2 * sum_xx[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance_z = np.where(
+                n[:, None] > 1,
+                (sum_zz - sum_z ** 2 / n[:, None]) / (n[:, None] - 1),
+                0.0
+            )
+        scale = weights ** 2 * (1 - n / self.population) / n
+        variance = np.maximum(scale @ variance_z, 0) / total_x ** 2
+
+        z = stats.norm.ppf(0.5 + confidence / 2)
+        return ratios, z * np.sqrt(variance)
+
+
+def sample_size(sample: SampleSize, n_rows: int) -> int:
+    """
+    Number of rows to sample.
+
+    Args:
+        sample: Fraction of the respondents (a float in (0, 1]) or a number
+            of respondents (an int of at least 1)
+        n_rows: Number of respondents in the data
+
+    Returns:
+        Number of respondents to sample, at most ``n_rows``
+
+    Raises:
+        ValueError: If ``sample`` is not a valid fraction or row count
+    """
+    if isinstance(sample, bool) or not isinstance(sample, (int, float, np.integer, np.floating)):
+        raise ValueError("Sample must be a fraction in (0, 1] or a number of rows")
+    if isinstance(sample, (float, np.floating)):
+        if not 0 < sample <= 1:
+            raise ValueError("Sample fraction must be in (0, 1]")
+        return max(1, min(n_rows, int(round(sample * n_rows))))
+    if sample < 1:
+        raise ValueError("Sample row count must be at least 1")
+    return min(n_rows, int(sample))
+
+
+def strata_column(raw_data: pd.DataFrame) -> Optional[str]:
+    """The column respondents are stratified by, or None for a simple random sample."""
+    for column in STRATA_COLUMNS:
+        if column in raw_data.columns:
+            return column
+    return None
+
+
+def _allocate(population: np.ndarray, size: int) -> np.ndarray:
+    """Proportional allocation of ``size`` rows to strata, by largest remainder."""
+    quotas = population * size / population.sum()
+    sizes = np.floor(quotas).astype(np.int64)
+    remainder = size - sizes.sum()
+    if remainder > 0:
+        sizes[np.argsort(sizes - quotas, kind='stable')[:remainder]] += 1
+
+    # At least two rows per stratum (where it has them), to estimate its variance
+    return np.minimum(population, np.maximum(sizes, 2))
+
+
+def draw_sample(raw_data: pd.DataFrame, sample: SampleSize, seed: int = 0) -> Sample:
+    """
+    Get the cached stratified sample of a dataset.
+
+    The same data, size and seed always give the same sample. Within each
+    stratum, respondents are ordered once by a seeded random key and the
+    first rows are taken.
+
+    Args:
+        raw_data: Survey responses
+        sample: Fraction or number of respondents, as in sample_size()
+        seed: Seed of the random order
+
+    Returns:
+        Sample of ``raw_data``, drawn on first use
+    """
+    size = sample_size(sample, len(raw_data))
+    column = strata_column(raw_data)
+
+    def build_order():
+        if column is None:
+            codes = np.zeros(len(raw_data), dtype=np.int64)
+        else:
+            codes, _ = pd.factorize(raw_data[column])
+            # Respondents without a year form a stratum of their own
+            codes = np.where(codes < 0, codes.max(initial=-1) + 1, codes)
+        keys = np.random.default_rng(seed).random(len(raw_data))
+        order = np.lexsort((keys, codes))
+        population = np.bincount(codes, minlength=codes.max() + 1 if len(codes) else 0)
+        return read_only(order), read_only(codes), read_only(population)
+
+    def build():
+        order, codes, population = cached(raw_data, ('sample_order', seed, column), build_order)
+        sizes = _allocate(population, size)
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        taken = np.concatenate([order[start:start + count] for start, count in zip(starts, sizes)] or [np.empty(0, dtype=np.int64)])
+        rows = read_only(np.sort(taken))
+
+        frame = raw_data.iloc[rows].reset_index(drop=True)
+        return Sample(frame, rows, read_only(codes[rows]), population, read_only(sizes), seed)
+
+    return cached(raw_data, ('sample', size, seed, column), build)
+
+
+def estimate_distribution(
+    drawn: Sample,
+    y: sparse.spmatrix,
+    options: List[object],
+    x: Optional[np.ndarray] = None,
+    confidence: float = DEFAULT_CONFIDENCE
+) -> Tuple[Dict[object, float], Dict[object, float]]:
+    """
+    Estimate percentages of options from a sample.
+
+    Args:
+        drawn: The sample
+        y: Sampled respondent x option indicator matrix
+        options: Options, in column order of ``y``
+        x: Indicator of the respondents in the denominator; None for all
+        confidence: Confidence level of the margins
+
+    Returns:
+        Tuple of the estimated percentages and their margins of error,
+        keyed by option, most common first
+    """
+    ratios, margins = drawn.estimate_ratios(y, x, confidence)
+    order = np.argsort(-ratios, kind='stable')
+    distribution = {options[i]: float(ratios[i] * 100) for i in order}
+    margin = {options[i]: float(margins[i] * 100) for i in order}
+    return distribution, margin
@@ -0,0 +1,250 @@
+"""
+Significance testing between respondent segments for the Stack Overflow Survey Data Analysis Library.
+
+compare() tests, for every option of a question at once, whether the
+share of respondents picking it differs between two segments. Shares are
+computed as in distribution_sc and distribution_mc, the tests run as
+NumPy array operations over all options, and p-values are corrected for
+multiple comparisons. compare_all() does the same for every question::
+
+    compare('RemoteWork', 'MainBranch == "I am a developer by profession"',
+            'MainBranch == "I am learning to code"')
+"""
+
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from .analysis import respondents
+from .subset import Subset
+
+TESTS = ('z', 'chi2')
+CORRECTIONS = ('holm', 'bonferroni', 'fdr_bh', 'none')
+
+RESULT_COLUMNS = ['count_a', 'pct_a', 'count_b', 'pct_b', 'diff', 'statistic', 'p_value', 'p_adjusted', 'significant']
+
+Segment = Union[str, Subset]
+
+
+def adjust_p_values(p_values: np.ndarray, method: str = 'holm') -> np.ndarray:
+    """
+    Correct p-values for multiple comparisons.
+
+    Args:
+        p_values: Unadjusted p-values
+        method: 'holm' (Holm-Bonferroni step-down), 'bonferroni', 'fdr_bh'
+            (Benjamini-Hochberg false discovery rate) or 'none'
+
+    Returns:
+        Adjusted p-values, in the order of the input
+    """
+    if method not in CORRECTIONS:
+        raise ValueError(f"Correction must be one of: {', '.join(CORRECTIONS)}")
+
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if method == 'none' or m == 0:
+        return p_values.copy()
+    if method == 'bonferroni':
+        return np.minimum(p_values * m, 1.0)
+
+    order = np.argsort(p_values, kind='stable')
+    ranked = p_values[order]
+    if method == 'holm':
+        adjusted = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        adjusted = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+
+    result = np.empty(m, dtype=float)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def _test(count_a: np.ndarray, n_a: np.ndarray, count_b: np.ndarray, n_b: np.ndarray, test: str):
+    """Per-option statistics and two-sided p-values for arrays of counts."""
+    count_a, n_a, count_b, n_b = (np.asarray(x, dtype=float) for x in (count_a, n_a, count_b, n_b))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if test == 'z':
+            # Two-proportion z-test with pooled variance
+            pooled = (count_a + count_b) / (n_a + n_b)
+            se = np.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+            statistic = (count_a / n_a - count_b / n_b) / se
+            p_values = 2 * stats.norm.sf(np.abs(statistic))
+        else:
+            # 2x2 chi-square test (picked / did not pick x segment) with Yates' correction
+            a, b = count_a, n_a - count_a
+            c, d = count_b, n_b - count_b
+            n = n_a + n_b
+            numerator = n * np.maximum(np.abs(a * d - b * c) - n / 2, 0) ** 2
+            statistic = numerator / ((a + b) * (c + d) * (a + c) * (b + d))
+            p_values = stats.chi2.sf(statistic, df=1)
+
+    # Options nobody (or everybody) picked can't differ
+    undefined = ~np.isfinite(statistic)
+    statistic = np.where(undefined, 0.0, statistic)
+    p_values = np.where(undefined, 1.0, p_values)
+    return statistic, p_values
+
+
+def _segment(segment: Segment) -> Subset:
+    """Resolve a filter expression or Subset to a Subset."""
+    if isinstance(segment, Subset):
+        return segment
+    if not segment or not isinstance(segment, str):
+        raise ValueError("Segment must be a filter expression or a Subset")
+    return respondents(segment)
+
+
+def _counts_table(view_a: Subset, view_b: Subset, question_id: str) -> pd.DataFrame:
+    """Counts and denominators of every option of a question in both segments."""
+    counts_a, n_a = view_a.option_counts(question_id)
+    counts_b, n_b = view_b.option_counts(question_id)
+
+    options = list(dict.fromkeys(list(counts_a.index) + list(counts_b.index)))
+    table = pd.DataFrame({
+        'count_a': counts_a.reindex(options, fill_value=0).to_numpy(dtype=np.int64),
+        'n_a': n_a,
+        'count_b': counts_b.reindex(options, fill_value=0).to_numpy(dtype=np.int64),
+        'n_b': n_b,
+    }, index=pd.Index(options, name='option'))
+    return table
+
+
+def _finish(table: pd.DataFrame, test: str, correction: str, alpha: float) -> pd.DataFrame:
+    """Add shares, test statistics and corrected p-values to a counts table."""
+    statistic, p_values = _test(table['count_a'], table['n_a'], table['count_b'], table['n_b'], test)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['pct_a'] = np.where(table['n_a'] > 0, table['count_a'] / table['n_a'] * 100, np.nan)
+        table['pct_b'] = np.where(table['n_b'] > 0, table['count_b'] / table['n_b'] * 100, np.nan)
+    table['diff'] = table['pct_a'] - table['pct_b']
+    table['statistic'] = statistic
+    table['p_value'] = p_values
+    table['p_adjusted'] = adjust_p_values(p_values, correction)
+    table['significant'] = table['p_adjusted'] < alpha
+    return table
+
+
+def _check_options(test: str, correction: str, alpha: float) -> None:
+    """Validate the test options shared by compare and compare_all."""
+    if test not in TESTS:
+        raise ValueError(f"Test must be one of: {', '.join(TESTS)}")
+    if correction not in CORRECTIONS:
+        raise ValueError(f"Correction must be one of: {', '.join(CORRECTIONS)}")
+    if not 0 < alpha < 1:
+        raise ValueError("Significance level must be in (0, 1)")
+
+
+def compare(
+    question_id: str,
+    segment_a: Segment,
+    segment_b: Segment,
+    test: str = 'z',
+    correction: str = 'holm',
+    alpha: float = 0.05
+) -> Dict[str, object]:
+    """
+    Test which answers to a question differ significantly between two segments.
+
+    Shares are relative to the segment's respondents who answered for
+    single-choice questions and to all of the segment's respondents for
+    multiple-choice questions, as in distribution_sc and distribution_mc.
+
+    Args:
+        question_id: Question identifier
+        segment_a: Filter expression or Subset of the first segment
+        segment_b: Filter expression or Subset of the second segment
+        test: 'z' (two-proportion z-test) or 'chi2' (2x2 chi-square test
+            with Yates' continuity correction)
+        correction: Multiple-comparison correction over the question's
+            options: 'holm', 'bonferroni', 'fdr_bh' or 'none'
+        alpha: Significance level applied to the adjusted p-values
+
+    Returns:
+        Dictionary with question information, the size of both segments and
+        a 'results' DataFrame indexed by option with columns count_a,
+        pct_a, count_b, pct_b, diff (percentage points), statistic,
+        p_value, p_adjusted and significant, sorted by p_adjusted
+
+    Raises:
+        ValueError: If the question, a segment or an option is invalid
+    """
+    _check_options(test, correction, alpha)
+
+    try:
+        view_a, view_b = _segment(segment_a), _segment(segment_b)
+        table = _finish(_counts_table(view_a, view_b, question_id), test, correction, alpha)
+
+        schema = view_a.schema
+        question_text = schema.loc[schema['column'] == question_id, 'question_text']
+
+        return {
+            "question_id": question_id,
+            "question_text": question_text.iloc[0] if len(question_text) else '',
+            "respondents_a": view_a.count(),
+            "respondents_b": view_b.count(),
+            "test": test,
+            "correction": correction,
+            "results": table.sort_values('p_adjusted', kind='mergesort')[RESULT_COLUMNS]
+        }
+    except Exception as e:
+        print(f"Error comparing segments: {e}")
+        raise
+
+
+def compare_all(
+    segment_a: Segment,
+    segment_b: Segment,
+    question_ids: Optional[Sequence[str]] = None,
+    test: str = 'z',
+    correction: str = 'holm',
+    alpha: float = 0.05
+) -> pd.DataFrame:
+    """
+    Compare two segments on every option of many questions at once.
+
+    All options of all questions are tested in one vectorized pass, and the
+    multiple-comparison correction covers every test in the batch.
+
+    Args:
+        segment_a: Filter expression or Subset of the first segment
+        segment_b: Filter expression or Subset of the second segment
+        question_ids: Questions to compare (default: every single- and
+            multiple-choice question in the schema)
+        test: 'z' or 'chi2', as in compare
+        correction: 'holm', 'bonferroni', 'fdr_bh' or 'none'
+        alpha: Significance level applied to the adjusted p-values
+
+    Returns:
+        DataFrame with columns question_id, option and those of compare,
+        sorted by p_adjusted
+    """
+    _check_options(test, correction, alpha)
+
+    try:
+        view_a, view_b = _segment(segment_a), _segment(segment_b)
+        if question_ids is None:
+            schema = view_a.schema
+            question_ids = [
+                q for q in schema.loc[schema['type'].isin(['SC', 'MC']), 'column']
+                if q in view_a.raw_data.columns
+            ]
+
+        tables: List[pd.DataFrame] = []
+        for question_id in question_ids:
+            table = _counts_table(view_a, view_b, question_id).reset_index()
+            table.insert(0, 'question_id', question_id)
+            tables.append(table)
+
+        if not tables:
+            return pd.DataFrame(columns=['question_id', 'option'] + RESULT_COLUMNS)
+
+        table = _finish(pd.concat(tables, ignore_index=True), test, correction, alpha)
+        table = table.sort_values('p_adjusted', kind='mergesort').reset_index(drop=True)
+        return table[['question_id', 'option'] + RESULT_COLUMNS]
+    except Exception as e:
+        print(f"Error comparing segments: {e}")
+        raise
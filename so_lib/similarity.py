@@ -0,0 +1,322 @@
+"""
+Respondent similarity and clustering for the Stack Overflow Survey Data Analysis Library.
+
+Answers to single- and multiple-choice questions are encoded as a sparse
+binary respondent x feature matrix, one feature per (question, option).
+On that matrix:
+
+- similar_respondents() finds the respondents most like given ones by
+  cosine or Jaccard similarity of their answer sets, and
+- cluster_respondents() groups all respondents into personas with
+  mini-batch k-means.
+
+Both work on sparse matrix products over all respondents at once, so they
+run in seconds on the full survey.
+"""
+
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .core import load_data, question_info
+from .index import cached, indicator_matrix
+from .memory import chunk_rows
+from .text import RESPONDENT_ID_COLUMN
+
+SIMILARITY_METRICS = ('cosine', 'jaccard')
+
+# Respondents assigned to clusters per sparse matrix product
+BATCH_SIZE = 4096
+
+# Upper bound on the similarities held in memory at once (query rows x respondents)
+SIMILARITY_BLOCK = 1 << 24
+
+
+class FeatureMatrix:
+    """Sparse binary encoding of answers, one column per (question, option)."""
+
+    def __init__(self, matrix: sparse.csr_matrix, features: pd.DataFrame):
+        """
+        Args:
+            matrix: Respondent x feature CSR matrix of 0/1 values
+            features: One row per column of ``matrix`` with the question_id
+                and option it stands for
+        """
+        self.matrix = matrix
+        self.features = features
+        # Number of features per respondent: the popcount of its bit vector
+        self.sizes = np.diff(matrix.indptr)
+
+    def __repr__(self):
+        return f"FeatureMatrix(respondents={self.matrix.shape[0]}, features={self.matrix.shape[1]})"
+
+    @property
+    def labels(self) -> List[str]:
+        """Feature names as 'question_id: option'."""
+        return [f"{q}: {o}" for q, o in zip(self.features['question_id'], self.features['option'])]
+
+
+def encode_respondents(question_ids: Optional[Sequence[str]] = None) -> FeatureMatrix:
+    """
+    Encode answers as a sparse binary respondent x feature matrix.
+
+    The encoding is cached for the loaded dataset.
+
+    Args:
+        question_ids: Single- and multiple-choice questions to encode
+            (default: all of them in the schema)
+
+    Returns:
+        FeatureMatrix with one row per respondent
+
+    Raises:
+        ValueError: If a question is not found
+    """
+    try:
+        data = load_data()
+        raw_data = data['raw data']
+        schema = data['schema']
+
+        if question_ids is None:
+            question_ids = [
+                q for q in schema.loc[schema['type'].isin(['SC', 'MC']), 'column'] if q in raw_data.columns
+            ]
+        question_ids = list(question_ids)
+        if not question_ids:
+            raise ValueError("No questions to encode")
+
+        def build():
+            blocks, rows = [], []
+            for question_id in question_ids:
+                question = question_info(data, question_id)
+                block, options = indicator_matrix(raw_data, question_id, question['type'])
+                blocks.append(block)
+                rows.extend((question_id, str(option)) for option in options)
+
+            matrix = sparse.hstack(blocks, format='csr', dtype=np.float32)
+            matrix.sort_indices()
+            return FeatureMatrix(matrix, pd.DataFrame(rows, columns=['question_id', 'option']))
+
+        return cached(raw_data, ('features', tuple(question_ids)), build)
+    except Exception as e:
+        print(f"Error encoding respondents: {e}")
+        raise
+
+
+def _similarities(features: FeatureMatrix, rows: np.ndarray, metric: str) -> np.ndarray:
+    """Similarity of the given rows (one per line) to every respondent."""
+    matrix = features.matrix
+    # Shared features of every pair: the popcount of the bitwise AND
+    shared = (matrix[rows] @ matrix.T).toarray()
+    left = features.sizes[rows][:, None].astype(float)
+    right = features.sizes[None, :].astype(float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if metric == 'cosine':
+            similarity = shared / np.sqrt(left * right)
+        else:
+            similarity = shared / (left + right - shared)
+    return np.nan_to_num(similarity)
+
+
+def similar_respondents(
+    rows: Union[int, Sequence[int]],
+    n: int = 10,
+    metric: str = 'cosine',
+    question_ids: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Find the respondents whose answers are most similar to given respondents.
+
+    Args:
+        rows: Row position, or positions, of the respondents to match
+        n: Number of neighbours per respondent
+        metric: 'cosine' or 'jaccard' similarity of the answer sets
+        question_ids: Questions to compare on (default: all SC/MC questions)
+
+    Returns:
+        DataFrame with columns row (the query), neighbor, respondent_id (of
+        the neighbour) and similarity, best match first for each query.
+        Respondents are never their own neighbours.
+
+    Raises:
+        ValueError: If a row, n or metric is invalid
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Similarity metric must be one of: {', '.join(SIMILARITY_METRICS)}")
+    if n < 1:
+        raise ValueError("Number of neighbours must be at least 1")
+
+    queries = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+    features = encode_respondents(question_ids)
+    n_rows = features.matrix.shape[0]
+    if len(queries) and (queries.min() < 0 or queries.max() >= n_rows):
+        raise ValueError(f"Row positions must be between 0 and {n_rows - 1}")
+
+    try:
+        raw_data = load_data()['raw data']
+        ids = raw_data[RESPONDENT_ID_COLUMN].to_numpy() if RESPONDENT_ID_COLUMN in raw_data.columns else None
+        k = min(n, n_rows - 1)
+
+        parts = []
+        if k < 1:
+            queries = queries[:0]
+        # Each query row holds a few float arrays with one entry per respondent
+        step = min(max(1, SIMILARITY_BLOCK // n_rows), chunk_rows(3 * 8 * n_rows, len(queries), minimum=1))
+        for start in range(0, len(queries), step):
+            batch = queries[start:start + step]
+            similarity = _similarities(features, batch, metric)
+            similarity[np.arange(len(batch)), batch] = -np.inf
+
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarity, top, axis=1)
+            order = np.lexsort((top, -top_scores), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+
+            neighbors = top.ravel()
+            parts.append(pd.DataFrame({
+                'row': np.repeat(batch, top.shape[1]),
+                'neighbor': neighbors,
+                'respondent_id': ids[neighbors] if ids is not None else neighbors,
+                'similarity': np.take_along_axis(similarity, top, axis=1).ravel(),
+            }))
+
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            columns=['row', 'neighbor', 'respondent_id', 'similarity']
+        )
+    except Exception as e:
+        print(f"Error finding similar respondents: {e}")
+        raise
+
+
+def _squared_distances(batch: sparse.csr_matrix, batch_sizes: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distances between binary rows and dense centers."""
+    # |x|^2 is the number of features of a binary row
+    return batch_sizes[:, None] - 2 * (batch @ centers.T) + (centers ** 2).sum(axis=1)[None, :]
+
+
+def _assign(features: FeatureMatrix, centers: np.ndarray):
+    """Nearest center and squared distance of every respondent."""
+    n_rows = features.matrix.shape[0]
+    labels = np.empty(n_rows, dtype=np.int64)
+    distances = np.empty(n_rows, dtype=float)
+    for start in range(0, n_rows, BATCH_SIZE):
+        end = min(start + BATCH_SIZE, n_rows)
+        d = _squared_distances(features.matrix[start:end], features.sizes[start:end], centers)
+        labels[start:end] = d.argmin(axis=1)
+        distances[start:end] = d[np.arange(end - start), labels[start:end]]
+    return labels, np.maximum(distances, 0)
+
+
+def _init_centers(features: FeatureMatrix, k: int, rng: np.random.Generator, sample_size: int) -> np.ndarray:
+    """k-means++ seeding on a random sample of respondents."""
+    n_rows = features.matrix.shape[0]
+    sample = rng.choice(n_rows, size=min(sample_size, n_rows), replace=False)
+    points = features.matrix[sample]
+    sizes = features.sizes[sample]
+
+    centers = [points[rng.integers(len(sample))].toarray().ravel()]
+    closest = _squared_distances(points, sizes, np.asarray(centers)).ravel()
+    for _ in range(1, k):
+        weights = np.maximum(closest, 0)
+        total = weights.sum()
+        choice = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+        centers.append(points[choice].toarray().ravel())
+        closest = np.minimum(closest, _squared_distances(points, sizes, np.asarray(centers[-1:])).ravel())
+    return np.asarray(centers, dtype=float)
+
+
+def cluster_respondents(
+    k: int = 8,
+    question_ids: Optional[Sequence[str]] = None,
+    batch_size: int = 1024,
+    iterations: int = 100,
+    top_features: int = 5,
+    seed: Optional[int] = 0
+) -> Dict[str, object]:
+    """
+    Cluster respondents into personas with mini-batch k-means.
+
+    Each iteration assigns a random batch of respondents to their nearest
+    center and moves the centers towards them with per-center learning
+    rates; finally every respondent is assigned to its nearest center.
+    Centers hold the share of their respondents having each feature.
+
+    Args:
+        k: Number of clusters
+        question_ids: Questions to cluster on (default: all SC/MC questions)
+        batch_size: Respondents per iteration
+        iterations: Number of mini-batch iterations
+        top_features: Number of defining features listed per cluster
+        seed: Random seed, for reproducible clusters
+
+    Returns:
+        Dictionary with 'labels' (cluster of every respondent, by row
+        position), 'sizes', 'inertia' (sum of squared distances), 'centers'
+        (cluster x feature DataFrame of shares) and 'profiles' (for each
+        cluster, the features most over-represented relative to all
+        respondents, as (feature, share, lift) tuples)
+
+    Raises:
+        ValueError: If k, batch_size or iterations is invalid
+    """
+    if k < 1:
+        raise ValueError("Number of clusters must be at least 1")
+    if batch_size < 1 or iterations < 0:
+        raise ValueError("Batch size must be positive and iterations non-negative")
+
+    features = encode_respondents(question_ids)
+    n_rows = features.matrix.shape[0]
+    if k > n_rows:
+        raise ValueError(f"Number of clusters must be at most the number of respondents ({n_rows})")
+
+    try:
+        rng = np.random.default_rng(seed)
+        centers = _init_centers(features, k, rng, sample_size=max(10 * k, batch_size))
+        counts = np.zeros(k)
+
+        for _ in range(iterations):
+            batch_rows = rng.choice(n_rows, size=min(batch_size, n_rows), replace=False)
+            batch = features.matrix[batch_rows]
+            labels = _squared_distances(batch, features.sizes[batch_rows], centers).argmin(axis=1)
+
+            # Per-center learning rate 1 / (number of points seen so far)
+            members = np.bincount(labels, minlength=k)
+            sums = (sparse.csr_matrix(
+                (np.ones(len(labels)), (labels, np.arange(len(labels)))), shape=(k, len(labels))
+            ) @ batch).toarray()
+            counts += members
+            moved = members > 0
+            centers[moved] += (sums[moved] - members[moved, None] * centers[moved]) / counts[moved, None]
+
+        labels, distances = _assign(features, centers)
+        sizes = np.bincount(labels, minlength=k)
+
+        # Centers as shares of each cluster's respondents
+        membership = sparse.csr_matrix((np.ones(n_rows), (labels, np.arange(n_rows))), shape=(k, n_rows))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.nan_to_num((membership @ features.matrix).toarray() / sizes[:, None])
+        overall = np.asarray(features.matrix.mean(axis=0)).ravel()
+
+        names = features.labels
+        profiles = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lift = np.nan_to_num(shares / overall[None, :])
+        for cluster in range(k):
+            # Rank by lift, among features at least a fifth of the cluster has
+            candidates = np.flatnonzero(shares[cluster] >= 0.2)
+            best = candidates[np.argsort(-lift[cluster, candidates], kind='stable')[:top_features]]
+            profiles[cluster] = [(names[f], float(shares[cluster, f]), float(lift[cluster, f])) for f in best]
+
+        return {
+            "labels": labels,
+            "sizes": sizes,
+            "inertia": float(distances.sum()),
+            "centers": pd.DataFrame(shares, columns=names),
+            "profiles": profiles
+        }
+    except Exception as e:
+        print(f"Error clustering respondents: {e}")
+        raise
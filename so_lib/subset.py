@@ -0,0 +1,223 @@
+"""
+Subset views for the Stack Overflow Survey Data Analysis Library.
+
+A Subset holds the sorted row positions of the respondents it contains
+and a reference to the full responses, not a copy of them. Counting,
+reading single columns, computing distributions and further filtering
+all work on those positions; a DataFrame is only built by to_frame().
+
+Example::
+
+    developers = respondents().select('MainBranch', 'I am a developer by profession')
+    rust = developers.where('LanguageHaveWorkedWith has "Rust"')
+    rust.count()
+    rust.distribution('RemoteWork')
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import question_info
+from .index import column, has_column, option_index
+from .query import parse_query
+
+MC_MATCH_MODES = ('token', 'contains')
+
+
+class Subset:
+    """A view of some of the respondents of a loaded dataset."""
+
+    def __init__(self, raw_data: pd.DataFrame, schema: pd.DataFrame, rows: Optional[np.ndarray] = None):
+        """
+        Args:
+            raw_data: The full responses
+            schema: The schema of the responses
+            rows: Sorted row positions of the respondents in the subset. If
+                None, the subset contains every respondent.
+        """
+        self.raw_data = raw_data
+        self.schema = schema
+        if rows is None:
+            rows = np.arange(len(raw_data), dtype=np.int64)
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._rows.flags.writeable = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"Subset({len(self)} of {len(self.raw_data)} respondents)"
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Sorted row positions of the respondents in the subset (read-only)."""
+        return self._rows
+
+    def count(self) -> int:
+        """Number of respondents in the subset."""
+        return len(self._rows)
+
+    def _check_question(self, question_id: str) -> str:
+        """Validate question_id and return its type ('SC' if not in the schema)."""
+        return question_info({'raw data': self.raw_data, 'schema': self.schema}, question_id)['type']
+
+    def _narrow(self, mask: np.ndarray) -> 'Subset':
+        """Respondents of this subset for which a full-length mask is True."""
+        return Subset(self.raw_data, self.schema, self._rows[np.asarray(mask, dtype=bool)[self._rows]])
+
+    def select(self, question_id: str, option: str, match: str = 'token') -> 'Subset':
+        """
+        Respondents of this subset who gave a specific answer.
+
+        Args:
+            question_id: Question identifier
+            option: Selected option value
+            match: How options of multiple-choice questions are matched, as in
+                subset_respondents ('token' or 'contains')
+
+        Returns:
+            A new Subset
+
+        Raises:
+            ValueError: If question_id, option or match is invalid
+        """
+        if not option or not isinstance(option, str):
+            raise ValueError("Option must be a non-empty string")
+        if match not in MC_MATCH_MODES:
+            raise ValueError(f"Match mode must be one of: {', '.join(MC_MATCH_MODES)}")
+
+        question_type = self._check_question(question_id)
+        answers = column(self.raw_data, question_id)
+
+        if question_type == 'SC':
+            # For single-choice questions, do an exact match
+            mask = (answers == option).to_numpy(dtype=bool, na_value=False)
+        elif match == 'token':
+            # For multiple-choice questions, look the option up in the cached index
+            positions = option_index(self.raw_data, question_id).positions(option)
+            return Subset(self.raw_data, self.schema, np.intersect1d(self._rows, positions, assume_unique=True))
+        else:
+            # Literal substring match, kept for free-form lookups
+            mask = answers.str.contains(option, regex=False, na=False).to_numpy(dtype=bool)
+
+        return self._narrow(mask)
+
+    def where(self, expression: str) -> 'Subset':
+        """
+        Respondents of this subset matching a filter expression.
+
+        Args:
+            expression: Filter expression (see so_lib.query)
+
+        Returns:
+            A new Subset
+
+        Raises:
+            ValueError: If the expression is invalid or references an unknown question
+        """
+        # Only this subset's rows are tested; 'has' predicates still use the per-DataFrame indexes
+        matched = parse_query(expression).mask(self.raw_data, self._rows)
+        return Subset(self.raw_data, self.schema, self._rows[matched])
+
+    def within(self, rows: Sequence[int]) -> 'Subset':
+        """
+        Respondents of this subset whose row positions are in ``rows``.
+
+        Joins the subset with row positions found elsewhere, such as
+        full-text search hits.
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        return Subset(self.raw_data, self.schema, np.intersect1d(self._rows, rows, assume_unique=True))
+
+    def column(self, question_id: str) -> pd.Series:
+        """
+        Answers of the respondents in the subset to one question.
+
+        Only this column is copied.
+        """
+        self._check_question(question_id)
+        return column(self.raw_data, question_id).iloc[self._rows]
+
+    def option_counts(self, question_id: str) -> Tuple[pd.Series, int]:
+        """
+        Number of respondents in the subset who picked each answer to a question.
+
+        Args:
+            question_id: Question identifier
+
+        Returns:
+            Tuple of the counts (most common first) and the number of
+            respondents they are relative to: those who answered for
+            single-choice questions, everyone in the subset for
+            multiple-choice questions
+        """
+        question_type = self._check_question(question_id)
+
+        if question_type == 'MC':
+            index = option_index(self.raw_data, question_id)
+            rows, codes = index.codes()
+            inside = np.zeros(len(self.raw_data), dtype=bool)
+            inside[self._rows] = True
+            counts = pd.Series(np.bincount(codes[inside[rows]], minlength=len(index.options)), index=index.options)
+            counts = counts[counts > 0].sort_values(ascending=False, kind='mergesort')
+            return counts, len(self)
+
+        counts = self.column(question_id).value_counts()
+        return counts, int(counts.sum())
+
+    def distribution(self, question_id: str) -> Dict[str, Union[str, Dict[str, float]]]:
+        """
+        Distribution of the subset's answers to a question.
+
+        Percentages follow distribution_sc and distribution_mc: relative to
+        the respondents who answered for single-choice questions and to all
+        respondents in the subset for multiple-choice questions.
+
+        Args:
+            question_id: Question identifier
+
+        Returns:
+            Dictionary with question information and distribution of answers
+        """
+        counts, total = self.option_counts(question_id)
+        question_text = self.schema.loc[self.schema['column'] == question_id, 'question_text']
+
+        return {
+            "question_id": question_id,
+            "question_text": question_text.iloc[0] if len(question_text) else '',
+            "distribution": {option: count / total * 100 for option, count in counts.items()} if total else {}
+        }
+
+    def _frame(self, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        """The full responses, or the given columns of them, derived columns included."""
+        if columns is None:
+            return self.raw_data
+        columns = list(columns)
+        if all(question_id in self.raw_data.columns for question_id in columns):
+            return self.raw_data[columns]
+        for question_id in columns:
+            if not has_column(self.raw_data, question_id):
+                raise KeyError(question_id)
+        return pd.DataFrame({question_id: column(self.raw_data, question_id) for question_id in columns})
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Materialize the subset as a DataFrame.
+
+        Args:
+            columns: Columns to include (default: all)
+        """
+        return self._frame(columns).iloc[self._rows]
+
+    def iter_frames(self, chunk_size: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """Materialize the subset a chunk of rows at a time."""
+        frame = self._frame(columns)
+        for start in range(0, len(self._rows), chunk_size):
+            yield frame.iloc[self._rows[start:start + chunk_size]]
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns of the responses."""
+        return list(self.raw_data.columns)
@@ -0,0 +1,409 @@
+"""
+Full-text search over free-text answers for the Stack Overflow Survey Data Analysis Library.
+
+Free-text questions (schema type 'TE', e.g. "other, please specify"
+write-ins) are indexed once into an inverted index from terms to the rows
+that used them. Text is split into word tokens and case folded, and
+optionally stemmed. Queries are ranked with BM25, treating all indexed
+answers of one respondent as one document, and matching row positions can
+be joined with subset views::
+
+    hits = search_text('kubernetes operator')
+    rows = text_index().rows_matching('kubernetes')
+    respondents().where('Country == "Germany"').within(rows).count()
+
+Indexes are cached per loaded dataset and saved in the cache directory
+(see core.cache_dir), so later sessions load them instead of rebuilding.
+"""
+
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backends import data_location
+from .core import cache_path, file_signature, load_data, resolve_data_path
+from .index import cached
+
+try:
+    from nltk.stem import PorterStemmer
+except ImportError:
+    PorterStemmer = None
+
+TEXT_QUESTION_TYPE = 'TE'
+RESPONDENT_ID_COLUMN = 'ResponseId'
+TEXT_INDEX_FORMAT_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MATCH_MODES = ('any', 'all')
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Suffixes removed by the built-in stemmer, longest first
+_SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ies', 'ers', 'er', 'es', 'ed', 'ly', 's')
+
+
+def _light_stem(token: str) -> str:
+    """Strip one common English suffix, keeping a stem of at least three characters."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == 's' and token.endswith('ss'):
+                return token
+            stem = token[:-len(suffix)]
+            if suffix == 'ies':
+                return stem + 'y'
+            if suffix in ('ing', 'ings', 'ed', 'er', 'ers') and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                # running -> run, but keeps installed -> install
+                return stem[:-1]
+            return stem
+    return token
+
+
+def get_stemmer() -> Callable[[str], str]:
+    """The Porter stemmer from nltk if it is installed, otherwise a light suffix stripper."""
+    if PorterStemmer is not None:
+        return PorterStemmer().stem
+    return _light_stem
+
+
+def tokenize(text: str, stem: bool = False) -> List[str]:
+    """
+    Split text into case-folded word tokens.
+
+    Args:
+        text: Text to tokenize
+        stem: Whether to stem the tokens
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    tokens = _TOKEN_PATTERN.findall(str(text).casefold())
+    if stem:
+        stemmer = get_stemmer()
+        tokens = [stemmer(token) for token in tokens]
+    return tokens
+
+
+class TextIndex:
+    """
+    Inverted index from terms to the rows whose answers contain them.
+
+    Postings are stored CSR-style: the rows containing term ``i`` are
+    ``rows[offsets[i]:offsets[i + 1]]``, sorted ascending, with the number
+    of occurrences in ``term_counts`` at the same positions.
+    """
+
+    def __init__(self, terms: np.ndarray, offsets: np.ndarray, rows: np.ndarray, term_counts: np.ndarray,
+                 doc_lengths: np.ndarray, question_ids: Sequence[str], stem: bool,
+                 respondent_ids: Optional[np.ndarray] = None):
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+        self.term_counts = term_counts
+        self.doc_lengths = doc_lengths
+        self.question_ids = list(question_ids)
+        self.stem = stem
+        self.respondent_ids = respondent_ids
+        self._codes = {term: code for code, term in enumerate(terms)}
+
+        documents = doc_lengths > 0
+        self.n_documents = int(documents.sum())
+        self.average_length = float(doc_lengths[documents].mean()) if self.n_documents else 0.0
+
+    def __repr__(self):
+        return f"TextIndex(questions={self.question_ids!r}, terms={len(self.terms)}, documents={self.n_documents})"
+
+    @property
+    def n_rows(self) -> int:
+        """Number of rows of the indexed responses."""
+        return len(self.doc_lengths)
+
+    def _postings(self, term: str):
+        """Rows and term counts of one term."""
+        code = self._codes.get(term)
+        if code is None:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        start, end = self.offsets[code], self.offsets[code + 1]
+        return self.rows[start:end], self.term_counts[start:end]
+
+    def _query_terms(self, query: str) -> List[str]:
+        """Distinct terms of a query, in order of appearance."""
+        return list(dict.fromkeys(tokenize(query, stem=self.stem)))
+
+    def rows_matching(self, query: str, mode: str = 'all') -> np.ndarray:
+        """
+        Row positions of respondents whose answers match a query.
+
+        Args:
+            query: Query text
+            mode: 'all' to require every query term, 'any' for at least one
+
+        Returns:
+            Sorted array of row positions
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Match mode must be one of: {', '.join(MATCH_MODES)}")
+
+        terms = self._query_terms(query)
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+
+        postings = [self._postings(term)[0] for term in terms]
+        if mode == 'any':
+            return np.unique(np.concatenate(postings))
+
+        # Intersect the shortest posting lists first
+        postings.sort(key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every row for a query (0 for rows without a match)."""
+        scores = np.zeros(self.n_rows, dtype=float)
+        if not self.n_documents:
+            return scores
+
+        for term in self._query_terms(query):
+            rows, counts = self._postings(term)
+            if not len(rows):
+                continue
+            idf = np.log(1 + (self.n_documents - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[rows] / self.average_length)
+            scores[rows] += idf * counts * (BM25_K1 + 1) / (counts + norm)
+        return scores
+
+    def search(self, query: str, top_k: Optional[int] = 10, mode: str = 'any') -> pd.DataFrame:
+        """
+        Rank the respondents whose answers match a query.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return (None for all matches)
+            mode: 'any' (default) ranks rows matching at least one term;
+                'all' only rows matching every term
+
+        Returns:
+            DataFrame with columns row, respondent_id and score, best match first
+        """
+        rows = self.rows_matching(query, mode=mode)
+        scores = self.scores(query)[rows]
+
+        order = np.argsort(-scores, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+        rows = rows[order]
+
+        return pd.DataFrame({
+            'row': rows,
+            'respondent_id': self.respondent_ids[rows] if self.respondent_ids is not None else rows,
+            'score': scores[order],
+        })
+
+    def save(self, path, source_signature=None) -> None:
+        """Write the index to a .npz file."""
+        arrays = {
+            'terms': self.terms.astype(str),
+            'offsets': self.offsets,
+            'postings': self.rows,
+            'term_counts': self.term_counts,
+            'doc_lengths': self.doc_lengths,
+            'question_ids': np.asarray(self.question_ids, dtype=str),
+            'meta': np.asarray([TEXT_INDEX_FORMAT_VERSION, int(self.stem)], dtype=np.int64),
+            'signature': np.asarray(source_signature or (-1, -1), dtype=np.int64),
+        }
+        if self.respondent_ids is not None:
+            arrays['respondent_ids'] = np.asarray(self.respondent_ids)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save().
+
+        Returns:
+            Tuple of the TextIndex and the signature of its data file (or None)
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            version, stem = arrays['meta'].tolist()
+            if version != TEXT_INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported text index format in {path}")
+            signature = tuple(arrays['signature'].tolist())
+            index = cls(
+                terms=arrays['terms'].astype(object),
+                offsets=arrays['offsets'],
+                rows=arrays['postings'],
+                term_counts=arrays['term_counts'],
+                doc_lengths=arrays['doc_lengths'],
+                question_ids=arrays['question_ids'].tolist(),
+                stem=bool(stem),
+                respondent_ids=arrays['respondent_ids'] if 'respondent_ids' in arrays.files else None,
+            )
+        return index, (None if signature == (-1, -1) else signature)
+
+
+def build_text_index(raw_data: pd.DataFrame, question_ids: Sequence[str], stem: bool = False) -> TextIndex:
+    """
+    Build a full-text index over some columns of the responses.
+
+    Args:
+        raw_data: Responses
+        question_ids: Free-text columns to index
+        stem: Whether to stem tokens
+
+    Returns:
+        The TextIndex
+    """
+    row_parts, token_parts = [], []
+    for question_id in question_ids:
+        # Positional index, so token labels are row positions
+        answers = raw_data[question_id].reset_index(drop=True).dropna().astype(str)
+        tokens = answers.str.casefold().str.findall(_TOKEN_PATTERN.pattern).explode().dropna()
+        row_parts.append(tokens.index.to_numpy(dtype=np.int64))
+        token_parts.append(tokens.to_numpy(dtype=object))
+
+    tokens = np.concatenate(token_parts) if token_parts else np.empty(0, dtype=object)
+    rows = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+    if len(tokens) and stem:
+        # Stem each distinct token once
+        distinct, inverse = np.unique(tokens.astype(str), return_inverse=True)
+        stemmer = get_stemmer()
+        tokens = np.asarray([stemmer(str(token)) for token in distinct], dtype=object)[inverse]
+
+    codes, terms = pd.factorize(tokens)
+    pairs = pd.DataFrame({'term': codes, 'row': rows}).value_counts(sort=False).reset_index(name='count')
+    pairs = pairs.sort_values(['term', 'row'], kind='mergesort')
+
+    term_codes = pairs['term'].to_numpy(dtype=np.int64)
+    postings = pairs['row'].to_numpy(dtype=np.int64)
+    counts = pairs['count'].to_numpy(dtype=np.int64)
+
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_codes, minlength=len(terms)), out=offsets[1:])
+    doc_lengths = np.bincount(postings, weights=counts, minlength=len(raw_data)).astype(np.int64)
+
+    respondent_ids = None
+    if RESPONDENT_ID_COLUMN in raw_data.columns:
+        respondent_ids = raw_data[RESPONDENT_ID_COLUMN].to_numpy()
+        if respondent_ids.dtype == object:
+            respondent_ids = respondent_ids.astype(str)
+
+    return TextIndex(np.asarray(terms, dtype=object), offsets, postings, counts, doc_lengths,
+                     question_ids, stem, respondent_ids)
+
+
+def _text_questions(data: Dict[str, pd.DataFrame]) -> List[str]:
+    """Free-text questions of the schema that are present in the responses."""
+    schema = data['schema']
+    columns = set(data['raw data'].columns)
+    return [q for q in schema.loc[schema['type'] == TEXT_QUESTION_TYPE, 'column'] if q in columns]
+
+
+def _index_suffix(question_ids: Sequence[str], stem: bool) -> str:
+    """Cache file suffix identifying the indexed questions and stemming."""
+    key = "\0".join(question_ids) + f"\0{int(stem)}"
+    return f"text-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.npz"
+
+
+def text_index(question_ids: Optional[Sequence[str]] = None, stem: bool = False,
+               file_path: Optional[str] = None) -> TextIndex:
+    """
+    Get the full-text index of some free-text questions, building it if needed.
+
+    The index is cached for the loaded dataset and saved in the cache
+    directory (see core.cache_dir); a saved index is reused while the data file
+    and the number of responses are unchanged.
+
+    Args:
+        question_ids: Columns to index (default: all questions of type 'TE')
+        stem: Whether to stem tokens
+        file_path: Path or URI of the data file. If None, uses resolve_data_path().
+
+    Returns:
+        The TextIndex
+
+    Raises:
+        ValueError: If a question is not found or there is nothing to index
+    """
+    try:
+        data = load_data(file_path)
+        raw_data = data['raw data']
+
+        question_ids = list(question_ids) if question_ids else _text_questions(data)
+        if not question_ids:
+            raise ValueError("No free-text questions found; pass question_ids to choose columns")
+        for question_id in question_ids:
+            if question_id not in raw_data.columns:
+                raise ValueError(f"Question ID '{question_id}' not found in the dataset")
+
+        return cached(raw_data, ('text_index', tuple(question_ids), stem),
+                      lambda: _load_or_build_index(raw_data, question_ids, stem, file_path))
+    except Exception as e:
+        print(f"Error building text index: {e}")
+        raise
+
+
+def _load_or_build_index(raw_data: pd.DataFrame, question_ids: List[str], stem: bool, file_path: Optional[str]) -> TextIndex:
+    """Load the saved text index if it is current, otherwise build and save it."""
+    path = resolve_data_path(file_path)
+    signature = file_signature(path) if os.path.exists(data_location(path)) else None
+    try:
+        saved = cache_path(file_path, _index_suffix(question_ids, stem))
+    except OSError:
+        # Without a usable cache directory the index is built and not saved
+        signature = None
+
+    index = None
+    if signature is not None and saved.exists():
+        try:
+            loaded, saved_signature = TextIndex.load(saved)
+            if saved_signature == signature and loaded.n_rows == len(raw_data):
+                index = loaded
+        except (OSError, ValueError, KeyError):
+            index = None
+
+    if index is None:
+        index = build_text_index(raw_data, question_ids, stem=stem)
+        if signature is not None:
+            try:
+                index.save(saved, signature)
+            except OSError:
+                # The cache is an optimization; a read-only directory is not an error
+                pass
+
+    return index
+
+
+def search_text(query: str, question_ids: Optional[Sequence[str]] = None, top_k: Optional[int] = 10,
+                mode: str = 'any', stem: bool = False) -> pd.DataFrame:
+    """
+    Search free-text answers, best match first.
+
+    Args:
+        query: Query text
+        question_ids: Columns to search (default: all questions of type 'TE')
+        top_k: Number of results to return (None for all matches)
+        mode: 'any' (default) or 'all' query terms must match
+        stem: Whether to stem tokens
+
+    Returns:
+        DataFrame with columns row, respondent_id and score (BM25)
+
+    Raises:
+        ValueError: If the query or a question is invalid
+    """
+    if not query or not isinstance(query, str):
+        raise ValueError("Query must be a non-empty string")
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Match mode must be one of: {', '.join(MATCH_MODES)}")
+
+    return text_index(question_ids, stem=stem).search(query, top_k=top_k, mode=mode)
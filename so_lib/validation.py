@@ -0,0 +1,258 @@
+"""
+Data validation for the Stack Overflow Survey Data Analysis Library.
+
+The survey workbook is checked once, when it is first parsed: schema
+questions must exist in the responses, single-choice answers must not hold
+``;``-delimited lists, multiple-choice vocabularies must be clean, and
+column types must be consistent. The result is stored in the cache
+directory (see core.cache_dir) with a fingerprint of the dataset, so
+loading an unchanged dataset only compares fingerprints.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .index import MC_SEPARATOR, option_index
+
+VALIDATION_FORMAT_VERSION = 1
+VALIDATION_SUFFIX = 'validation.json'
+
+SCHEMA_COLUMNS = ('column', 'question_text', 'type')
+QUESTION_TYPES = ('SC', 'MC', 'TE')
+SEVERITIES = ('error', 'warning', 'info')
+
+# More distinct options than this suggests free text labelled as multiple-choice
+MAX_MC_OPTIONS = 500
+
+# Types pandas infers for columns mixing numbers and strings
+_MIXED_TYPES = ('mixed', 'mixed-integer', 'mixed-integer-float')
+
+
+class ValidationReport:
+    """Issues found in a dataset, with the fingerprint of the dataset checked."""
+
+    def __init__(self, issues: List[Dict[str, object]], fingerprint: Optional[str] = None):
+        self.issues = issues
+        self.fingerprint = fingerprint
+
+    def __repr__(self):
+        return f"ValidationReport(errors={len(self.errors)}, warnings={len(self.warnings)})"
+
+    @property
+    def errors(self) -> List[Dict[str, object]]:
+        """Issues with severity 'error'."""
+        return [issue for issue in self.issues if issue['severity'] == 'error']
+
+    @property
+    def warnings(self) -> List[Dict[str, object]]:
+        """Issues with severity 'warning'."""
+        return [issue for issue in self.issues if issue['severity'] == 'warning']
+
+    @property
+    def ok(self) -> bool:
+        """Whether no errors were found."""
+        return not self.errors
+
+    def to_frame(self) -> pd.DataFrame:
+        """Issues as a DataFrame with columns severity, check, question_id and message."""
+        return pd.DataFrame(self.issues, columns=['severity', 'check', 'question_id', 'message'])
+
+    def raise_for_errors(self) -> None:
+        """
+        Raise if any errors were found.
+
+        Raises:
+            ValueError: Listing the errors
+        """
+        if self.errors:
+            raise ValueError("Invalid dataset: " + "; ".join(issue['message'] for issue in self.errors))
+
+    def save(self, path) -> None:
+        """Write the report to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': VALIDATION_FORMAT_VERSION,
+                'fingerprint': self.fingerprint,
+                'issues': self.issues
+            }, f, indent=1)
+
+    @classmethod
+    def load(cls, path) -> 'ValidationReport':
+        """Read a report written by save()."""
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != VALIDATION_FORMAT_VERSION:
+            raise ValueError(f"Unsupported validation report format in {path}")
+        return cls(state['issues'], state['fingerprint'])
+
+
+def _issue(severity: str, check: str, question_id: Optional[str], message: str) -> Dict[str, object]:
+    """One validation issue."""
+    return {'severity': severity, 'check': check, 'question_id': question_id, 'message': message}
+
+
+def dataset_fingerprint(data: Dict[str, pd.DataFrame], signature=None) -> str:
+    """
+    Fingerprint of a dataset's structure.
+
+    Covers the schema contents, the response columns, their dtypes and the
+    number of responses, plus the data file signature if one is given.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        signature: Optional signature of the data file (see core.file_signature)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(signature).encode('utf-8'))
+    for name in sorted(data):
+        frame = data[name]
+        digest.update(f"\0{name}\0{frame.shape}\0".encode('utf-8'))
+        digest.update("\0".join(f"{column}:{dtype}" for column, dtype in frame.dtypes.items()).encode('utf-8'))
+    if 'schema' in data:
+        digest.update(pd.util.hash_pandas_object(data['schema'].astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _check_mc_column(raw_data: pd.DataFrame, question_id: str) -> List[Dict[str, object]]:
+    """Issues in the answers to a multiple-choice question."""
+    issues = []
+    values = raw_data[question_id]
+
+    if pd.api.types.is_numeric_dtype(values) and values.notna().any():
+        issues.append(_issue('warning', 'dtype', question_id,
+                             f"Multiple-choice question '{question_id}' has numeric answers"))
+        return issues
+
+    answers = values.dropna().astype(str)
+    empty = answers.str.startswith(MC_SEPARATOR) | answers.str.endswith(MC_SEPARATOR) | \
+        answers.str.contains(MC_SEPARATOR * 2, regex=False)
+    if empty.any():
+        issues.append(_issue('warning', 'mc_empty_option', question_id,
+                             f"{int(empty.sum())} answers to '{question_id}' contain empty options"))
+
+    options = pd.Series(option_index(raw_data, question_id).options, dtype=object).astype(str)
+    padded = options[options != options.str.strip()]
+    if len(padded):
+        issues.append(_issue('warning', 'mc_whitespace', question_id,
+                             f"{len(padded)} options of '{question_id}' have surrounding whitespace, e.g. {padded.iloc[0]!r}"))
+
+    folded = options.str.strip().str.casefold()
+    variants = folded[folded.duplicated(keep=False)]
+    if len(variants):
+        examples = sorted(options[variants.index])[:3]
+        issues.append(_issue('warning', 'mc_case_variants', question_id,
+                             f"Options of '{question_id}' differ only by case or whitespace: {', '.join(examples)}"))
+
+    if len(options) > MAX_MC_OPTIONS:
+        issues.append(_issue('warning', 'mc_vocabulary_size', question_id,
+                             f"'{question_id}' has {len(options)} distinct options; it may be free text"))
+    return issues
+
+
+def _check_sc_column(raw_data: pd.DataFrame, question_id: str) -> List[Dict[str, object]]:
+    """Issues in the answers to a single-choice question."""
+    issues = []
+    values = raw_data[question_id].dropna()
+
+    if pd.api.types.infer_dtype(values, skipna=True) in _MIXED_TYPES:
+        issues.append(_issue('warning', 'dtype', question_id,
+                             f"Single-choice question '{question_id}' mixes numeric and text answers"))
+
+    if not pd.api.types.is_numeric_dtype(values):
+        multi = values.astype(str).str.contains(MC_SEPARATOR, regex=False)
+        if multi.any():
+            issues.append(_issue('warning', 'sc_multi_value', question_id,
+                                 f"{int(multi.sum())} answers to single-choice question '{question_id}' "
+                                 f"contain '{MC_SEPARATOR}', e.g. {values[multi].iloc[0]!r}"))
+    return issues
+
+
+def validate_data(data: Dict[str, pd.DataFrame], fingerprint: Optional[str] = None) -> ValidationReport:
+    """
+    Check a dataset for schema and answer inconsistencies.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        fingerprint: Fingerprint to record in the report
+
+    Returns:
+        ValidationReport listing the issues found
+    """
+    for sheet in ('schema', 'raw data'):
+        if sheet not in data:
+            return ValidationReport([_issue('error', 'sheets', None, f"Missing sheet '{sheet}'")], fingerprint)
+
+    schema = data['schema']
+    raw_data = data['raw data']
+
+    missing = [column for column in SCHEMA_COLUMNS if column not in schema.columns]
+    if missing:
+        return ValidationReport(
+            [_issue('error', 'schema_columns', None, f"Schema is missing columns: {', '.join(missing)}")],
+            fingerprint
+        )
+
+    issues = []
+    for question_id in schema.loc[schema['column'].duplicated(), 'column'].unique():
+        issues.append(_issue('error', 'duplicate_question', question_id,
+                             f"Question '{question_id}' is listed more than once in the schema"))
+
+    questions = schema.drop_duplicates('column')
+    for question_id, question_type in zip(questions['column'], questions['type']):
+        if question_type not in QUESTION_TYPES:
+            issues.append(_issue('warning', 'unknown_type', question_id,
+                                 f"Question '{question_id}' has unknown type {question_type!r}"))
+        if question_id not in raw_data.columns:
+            issues.append(_issue('error', 'missing_column', question_id,
+                                 f"Question '{question_id}' is in the schema but not in the responses"))
+        elif question_type == 'MC':
+            issues.extend(_check_mc_column(raw_data, question_id))
+        elif question_type == 'SC':
+            issues.extend(_check_sc_column(raw_data, question_id))
+
+    listed = set(questions['column'])
+    unlisted = [str(column) for column in raw_data.columns if column not in listed]
+    if unlisted:
+        issues.append(_issue('info', 'unlisted_column', None,
+                             f"{len(unlisted)} response columns are not in the schema: {', '.join(unlisted[:5])}"))
+
+    return ValidationReport(issues, fingerprint)
+
+
+def check_dataset(data: Dict[str, pd.DataFrame], report_path, signature=None) -> ValidationReport:
+    """
+    Validate a dataset unless a stored report has the same fingerprint.
+
+    Args:
+        data: Dictionary of DataFrames returned by load_data
+        report_path: Where the report is stored
+        signature: Optional signature of the data file
+
+    Returns:
+        The stored or newly computed ValidationReport
+    """
+    fingerprint = dataset_fingerprint(data, signature)
+
+    if report_path is not None and os.path.exists(report_path):
+        try:
+            report = ValidationReport.load(report_path)
+            if report.fingerprint == fingerprint:
+                return report
+        except (OSError, ValueError, KeyError):
+            pass
+
+    report = validate_data(data, fingerprint)
+    if report_path is not None:
+        try:
+            report.save(report_path)
+        except OSError:
+            # The stored report is an optimization; a read-only directory is not an error
+            pass
+    return report
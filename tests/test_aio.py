@@ -0,0 +1,87 @@
+"""
+Unit tests for the asyncio interface of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import asyncio
+import unittest
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib import aio
+
+class TestAio(unittest.TestCase):
+    """Test cases for aio.py module"""
+
+    def test_query_functions(self):
+        """Test that the coroutines return the same results as the sync functions"""
+        # Patch the load_data function to use our test data
+        test_data = {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2'],
+                'question_text': ['Test question 1?', 'Test multiple-choice question?'],
+                'type': ['SC', 'MC']
+            }),
+            'raw data': pd.DataFrame({
+                'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                'Q2': ['Option X;Option Y', 'Option Z', 'Option X', 'Option Y;Option Z']
+            })
+        }
+
+        def patched_load_data(*args, **kwargs):
+            return test_data
+
+        from so_lib import analysis
+        original_load_data = analysis.load_data
+        try:
+            analysis.load_data = patched_load_data
+
+            async def run():
+                return await asyncio.gather(
+                    aio.distribution_sc('Q1'),
+                    aio.distribution_mc('Q2'),
+                    aio.subset_where('Q2 has "Option Z"'),
+                )
+
+            dist_sc, dist_mc, subset = asyncio.run(run())
+            self.assertEqual(dist_sc['distribution']['Option A'], 50.0)
+            self.assertEqual(dist_mc['distribution']['Option Y'], 50.0)
+            self.assertEqual(len(subset), 2)
+        finally:
+            analysis.load_data = original_load_data
+
+    def test_later_query_functions(self):
+        """Test coroutines of the crosstab, co-occurrence and similarity functions"""
+        test_data = {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2'],
+                'question_text': ['Test question 1?', 'Test multiple-choice question?'],
+                'type': ['SC', 'MC']
+            }),
+            'raw data': pd.DataFrame({
+                'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                'Q2': ['Option X;Option Y', 'Option Z', 'Option X', 'Option Y;Option Z']
+            })
+        }
+        modules = ('analysis', 'cooccurrence', 'similarity')
+        patches = [patch(f'so_lib.{module}.load_data', return_value=test_data) for module in modules]
+        for p in patches:
+            p.start()
+        try:
+            async def run():
+                return await asyncio.gather(
+                    aio.crosstab('Q1', 'Q2'),
+                    aio.top_pairs('Q2'),
+                    aio.similar_respondents(0, n=1),
+                )
+
+            table, pairs, neighbors = asyncio.run(run())
+            self.assertEqual(table['table'].loc['Option A', 'Option X'], 2)
+            self.assertEqual(len(pairs), 2)
+            self.assertEqual(neighbors['neighbor'].tolist(), [2])
+        finally:
+            for p in patches:
+                p.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,12 @@ Unit tests for the analysis module of the Stack Overflow Survey Data Analysis Li
 
 import unittest
 import os
+import tempfile
 import pandas as pd
 from pathlib import Path
+from unittest.mock import patch
 
-from so_lib.analysis import subset_respondents, distribution_sc, distribution_mc
+from so_lib.analysis import subset_respondents, subset_where, distribution_sc, distribution_mc, groupby_stat, crosstab
 
 class TestAnalysis(unittest.TestCase):
     """Test cases for analysis.py module"""
@@ -51,9 +53,17 @@ class TestAnalysis(unittest.TestCase):
         # Override the default data path for testing
         self.original_data_path = os.environ.get('SO_DATA_PATH')
         os.environ['SO_DATA_PATH'] = str(self.test_data_path)
+
+        # Keep cache files (e.g. validation reports) out of the user cache directory
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': self.cache_dir.name})
+        self.environ.start()
     
     def tearDown(self):
         """Clean up test fixtures"""
+        self.environ.stop()
+        self.cache_dir.cleanup()
+
         # Restore the original data path
         if self.original_data_path:
             os.environ['SO_DATA_PATH'] = self.original_data_path
@@ -160,6 +170,90 @@ class TestAnalysis(unittest.TestCase):
             if original_load_data:
                 analysis.load_data = original_load_data
     
+    def test_subset_respondents_mc_exact_tokens(self):
+        """Test that multiple-choice subsets match whole options only"""
+        # Patch the load_data function to use our test data
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Lang'],
+                    'question_text': ['Languages?'],
+                    'type': ['MC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Lang': ['Java;C++', 'JavaScript', 'C#;Java', None, 'C;C++']
+                })
+            }
+        
+        original_load_data = None
+        try:
+            from so_lib import analysis
+            original_load_data = analysis.load_data
+            analysis.load_data = patched_load_data
+            
+            self.assertEqual(len(subset_respondents('Lang', 'Java')), 2)
+            self.assertEqual(len(subset_respondents('Lang', 'C++')), 2)
+            self.assertEqual(len(subset_respondents('Lang', 'C#')), 1)
+            self.assertEqual(len(subset_respondents('Lang', 'C')), 1)
+            self.assertEqual(len(subset_respondents('Lang', 'Rust')), 0)
+            
+            # Substring matching is still available on request
+            self.assertEqual(len(subset_respondents('Lang', 'Java', match='contains')), 3)
+            self.assertEqual(len(subset_respondents('Lang', 'C++', match='contains')), 2)
+            
+            with self.assertRaises(ValueError):
+                subset_respondents('Lang', 'Java', match='regex')
+        finally:
+            # Restore the original function
+            if original_load_data:
+                analysis.load_data = original_load_data
+    
+    def test_subset_where(self):
+        """Test subsetting respondents with a filter expression"""
+        # Patch the load_data function to use our test data
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Q1', 'Q2', 'Q3'],
+                    'question_text': [
+                        'Test question 1?', 
+                        'Test multiple-choice question?', 
+                        'Another test question?'
+                    ],
+                    'type': ['SC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                    'Q2': [
+                        'Option X;Option Y', 
+                        'Option Z', 
+                        'Option X', 
+                        'Option Y;Option Z'
+                    ],
+                    'Q3': ['Yes', 'No', 'Yes', 'Yes']
+                })
+            }
+        
+        original_load_data = None
+        try:
+            from so_lib import analysis
+            original_load_data = analysis.load_data
+            analysis.load_data = patched_load_data
+            
+            subset = subset_where('Q3 == "Yes" and Q2 has "Option Y"')
+            self.assertEqual(len(subset), 2)
+            self.assertEqual(subset['Q1'].tolist(), ['Option A', 'Option C'])
+            
+            subset = subset_where('Q1 == "Option B" or Q1 == "Option C"')
+            self.assertEqual(len(subset), 2)
+            
+            with self.assertRaises(ValueError):
+                subset_where('Unknown == "Yes"')
+        finally:
+            # Restore the original function
+            if original_load_data:
+                analysis.load_data = original_load_data
+    
     def test_distribution_sc(self):
         """Test distribution calculation for single-choice questions"""
         # Patch the load_data function to use our test data
@@ -259,6 +353,118 @@ class TestAnalysis(unittest.TestCase):
             if original_load_data:
                 analysis.load_data = original_load_data
 
+    
+    def test_groupby_stat(self):
+        """Test numeric statistics grouped by single- and multiple-choice answers"""
+        # Patch the load_data function to use our test data
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Q1', 'Q2', 'Years'],
+                    'question_text': [
+                        'Test question 1?', 
+                        'Test multiple-choice question?', 
+                        'Years of experience?'
+                    ],
+                    'type': ['SC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                    'Q2': [
+                        'Option X;Option Y', 
+                        'Option Z', 
+                        'Option X', 
+                        'Option Y;Option Z'
+                    ],
+                    'Years': [2, 'Less than 1 year', 6, 10]
+                })
+            }
+        
+        original_load_data = None
+        try:
+            from so_lib import analysis
+            original_load_data = analysis.load_data
+            analysis.load_data = patched_load_data
+            
+            result = groupby_stat('Years', 'Q1', stats=['count', 'mean', 'max'])
+            self.assertEqual(result['by_question_id'], 'Q1')
+            self.assertEqual(list(result['statistics']), ['Option A', 'Option C', 'Option B'])
+            self.assertEqual(result['statistics']['Option A'], {'count': 2, 'mean': 4.0, 'max': 6.0})
+            # Non-numeric answers are ignored
+            self.assertEqual(result['statistics']['Option B'], {'count': 0, 'mean': None, 'max': None})
+            
+            # A respondent counts toward every option they selected
+            result = groupby_stat('Years', 'Q2', stats=['count', 'median'])
+            self.assertEqual(result['statistics']['Option X'], {'count': 2, 'median': 4.0})
+            self.assertEqual(result['statistics']['Option Y'], {'count': 2, 'median': 6.0})
+            self.assertEqual(result['statistics']['Option Z'], {'count': 1, 'median': 10.0})
+            
+            with self.assertRaises(ValueError):
+                groupby_stat('Years', 'Q1', stats=['mode'])
+            with self.assertRaises(ValueError):
+                groupby_stat('Missing', 'Q1')
+        finally:
+            # Restore the original function
+            if original_load_data:
+                analysis.load_data = original_load_data
+
+
+    def test_crosstab(self):
+        """Test crosstabs of single- and multiple-choice questions"""
+        # Patch the load_data function to use our test data
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Q1', 'Q2', 'Q3'],
+                    'question_text': ['Test question 1?', 'Test multiple-choice question?', 'Another test question?'],
+                    'type': ['SC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                    'Q2': ['Option X;Option Y', 'Option Z', 'Option X', None],
+                    'Q3': ['Yes', 'No', 'Yes', None]
+                })
+            }
+
+        original_load_data = None
+        try:
+            from so_lib import analysis
+            original_load_data = analysis.load_data
+            analysis.load_data = patched_load_data
+
+            result = crosstab('Q1', 'Q2')
+            table = result['table']
+            self.assertEqual(result['column_question_text'], 'Test multiple-choice question?')
+            self.assertEqual(list(table.index), ['Option A', 'Option B', 'Option C'])
+            self.assertEqual(list(table.columns), ['Option X', 'Option Y', 'Option Z'])
+            self.assertEqual(table.loc['Option A'].tolist(), [2, 1, 0])
+            self.assertEqual(table.loc['Option B'].tolist(), [0, 0, 1])
+
+            # Same counts as pandas for two single-choice questions
+            raw_data = patched_load_data()['raw data']
+            expected = pd.crosstab(raw_data['Q1'], raw_data['Q3'])
+            pd.testing.assert_frame_equal(
+                crosstab('Q1', 'Q3')['table'].loc[expected.index, expected.columns],
+                expected, check_dtype=False, check_names=False
+            )
+
+            # Row percentages of an MC row question relative to those who answered Q3
+            table = crosstab('Q2', 'Q3', normalize='index')['table']
+            self.assertEqual(table.loc['Option Y', 'Yes'], 100.0)
+            # Column percentages relative to everyone in the column's group
+            table = crosstab('Q2', 'Q3', normalize='columns')['table']
+            self.assertEqual(table.loc['Option Y', 'Yes'], 50.0)
+
+            with self.assertRaises(ValueError):
+                crosstab('Q1', 'Q2', normalize='all')
+            with self.assertRaises(ValueError):
+                crosstab('Q1', 'Missing')
+        finally:
+            # Restore the original function
+            if original_load_data:
+                analysis.load_data = original_load_data
+
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
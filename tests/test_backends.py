@@ -0,0 +1,205 @@
+"""
+Unit tests for the backends module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import importlib.util
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib import analysis, core
+from so_lib.backends import (
+    CsvBackend, ExcelBackend, ParquetBackend, SqliteBackend,
+    filter_sql, infer_schema, open_backend, parse_location, save_data
+)
+from so_lib.query import parse_query
+
+HAS_PARQUET = importlib.util.find_spec('pyarrow') is not None or importlib.util.find_spec('fastparquet') is not None
+
+class TestBackends(unittest.TestCase):
+    """Test cases for backends.py module"""
+
+    def setUp(self):
+        """Create a dataset and a temporary directory for data and cache files"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp_dir.name)
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': str(self.dir / 'cache')})
+        self.environ.start()
+
+        self.schema = pd.DataFrame({
+            'column': ['Q1', 'Q2', 'Q3', 'Age'],
+            'question_text': ['Test question 1?', 'Test multiple-choice question?', 'Another test question?', 'Age?'],
+            'type': ['SC', 'MC', 'SC', 'TE']
+        })
+        self.raw_data = pd.DataFrame({
+            'Q1': ['Option A', 'Option B', 'Option A', 'Option C', None],
+            'Q2': ['Option X;Option Y', 'Option Z', 'Option X', 'Option Y;Option Z', None],
+            'Q3': ['Yes', 'No', 'Yes', 'Yes', 'No'],
+            'Age': [25.0, 40.0, None, 31.0, 19.0]
+        })
+        self.data = {'schema': self.schema, 'raw data': self.raw_data}
+
+    def tearDown(self):
+        """Remove the temporary files and forget loaded datasets"""
+        core._DATA_CACHE.clear()
+        self.tmp_dir.cleanup()
+        self.environ.stop()
+
+    def test_parse_location(self):
+        """Test choosing the backend by extension or URI scheme"""
+        self.assertEqual(parse_location('survey.xlsx'), ('xlsx', 'survey.xlsx'))
+        self.assertEqual(parse_location('data/Survey.CSV'), ('csv', 'data/Survey.CSV'))
+        self.assertEqual(parse_location('survey.db'), ('sqlite', 'survey.db'))
+        self.assertEqual(parse_location('sqlite:///survey.bin'), ('sqlite', 'survey.bin'))
+        self.assertEqual(parse_location('sqlite:////tmp/survey.bin'), ('sqlite', '/tmp/survey.bin'))
+        self.assertEqual(parse_location('csv:export.txt'), ('csv', 'export.txt'))
+
+        self.assertIsInstance(open_backend('survey.parquet'), ParquetBackend)
+        self.assertIsInstance(open_backend('survey.xlsx'), ExcelBackend)
+
+        with self.assertRaises(ValueError):
+            parse_location('survey.txt')
+
+    def test_csv_with_schema_file(self):
+        """Test reading CSV responses in chunks with a sibling schema file"""
+        path = self.dir / 'survey_results_public.csv'
+        self.raw_data.to_csv(path, index=False)
+        self.schema.rename(columns={'column': 'qname', 'question_text': 'question'}).to_csv(
+            self.dir / 'survey_results_schema.csv', index=False
+        )
+
+        with patch('so_lib.backends.CSV_CHUNK_SIZE', 2):
+            data = core.load_data(str(path))
+
+        pd.testing.assert_frame_equal(data['raw data'], self.raw_data, check_dtype=False)
+        self.assertEqual(list(data['schema']['column']), ['Q1', 'Q2', 'Q3', 'Age'])
+        self.assertEqual(list(data['schema']['type']), ['SC', 'MC', 'SC', 'TE'])
+
+    def test_official_schema_layout(self):
+        """Test that the official schema's selector tells single- from multiple-choice questions"""
+        path = self.dir / 'survey_results_public.csv'
+        self.raw_data.to_csv(path, index=False)
+        pd.DataFrame({
+            'qid': ['QID1', 'QID2', 'QID3', 'QID4'],
+            'qname': ['Q1', 'Q2', 'Q3', 'Age'],
+            'question': ['Question 1?', 'Question 2?', 'Question 3?', 'Age?'],
+            'force_resp': [False, False, False, False],
+            'type': ['MC', 'MC', 'MC', 'TE'],
+            'selector': ['SAVR', 'MAVR', 'DL', 'SL']
+        }).to_csv(self.dir / 'survey_results_schema.csv', index=False)
+
+        data = core.load_data(str(path))
+        self.assertEqual(list(data['schema']['type']), ['SC', 'MC', 'SC', 'TE'])
+        self.assertEqual(list(data['schema']['question_text']), ['Question 1?', 'Question 2?', 'Question 3?', 'Age?'])
+
+        with patch('so_lib.analysis.load_data', return_value=data), \
+                patch('so_lib.analysis.query_backend', return_value=None):
+            self.assertIn('distribution', analysis.distribution_sc('Q1'))
+
+    def test_infer_schema(self):
+        """Test the schema built for responses without a schema file"""
+        schema = infer_schema(self.raw_data)
+        self.assertEqual(list(schema['type']), ['SC', 'MC', 'SC', 'TE'])
+
+        path = self.dir / 'survey.csv'
+        self.raw_data.to_csv(path, index=False)
+        data = CsvBackend(str(path)).read()
+        self.assertEqual(list(data['schema']['type']), ['SC', 'MC', 'SC', 'TE'])
+
+    def test_sqlite_roundtrip(self):
+        """Test writing a dataset to SQLite and loading it back"""
+        path = self.dir / 'survey.sqlite'
+        save_data(self.data, str(path))
+
+        data = core.load_data(f"sqlite:///{path}")
+        pd.testing.assert_frame_equal(data['raw data'], self.raw_data, check_dtype=False)
+        pd.testing.assert_frame_equal(data['schema'], self.schema, check_dtype=False)
+
+        with self.assertRaises(FileNotFoundError):
+            SqliteBackend(str(self.dir / 'missing.sqlite')).metadata()
+        self.assertFalse((self.dir / 'missing.sqlite').exists())
+
+    def test_sqlite_filters_match_query_masks(self):
+        """Test that filters translated to SQL select the same rows as Query.mask"""
+        path = self.dir / 'survey.sqlite'
+        save_data(self.data, str(path))
+        backend = SqliteBackend(str(path))
+
+        for expression in [
+            'Q1 == "Option A"',
+            'Q1 != "Option A"',
+            'not Q1 == "Option A"',
+            'Q2 has "Option Y" or Q3 == "No"',
+            'Q1 in ("Option B", "Option C") and not Q2 has "Option X"',
+            'Age >= 25 and Age < 40',
+            'not Age > 30',
+            'Age in (25, 31) or Q1 in ("Option C", 40)',
+        ]:
+            query = parse_query(expression)
+            expected = np.flatnonzero(query.mask(self.raw_data))
+            selected = backend.select(query.root)
+            np.testing.assert_array_equal(selected.index.to_numpy(), expected, err_msg=expression)
+
+        # Numbers stored as text match numeric membership
+        raw_data = pd.DataFrame({'Years': ['5', '3', '1', None, 'Less than 1 year']})
+        schema = pd.DataFrame({'column': ['Years'], 'question_text': ['Years?'], 'type': ['SC']})
+        path = self.dir / 'years.sqlite'
+        save_data({'schema': schema, 'raw data': raw_data}, str(path))
+        query = parse_query("Years in (1, 5, 'Less than 1 year')")
+        selected = SqliteBackend(str(path)).select(query.root)
+        np.testing.assert_array_equal(selected.index.to_numpy(), np.flatnonzero(query.mask(raw_data)))
+        self.assertEqual(selected.index.tolist(), [0, 2, 4])
+
+        sql, params = filter_sql(parse_query('Q2 has "Option X"').root)
+        self.assertIn('instr', sql)
+        self.assertEqual(params, ['Option X'])
+
+    def test_sqlite_pushdown(self):
+        """Test that analysis functions query SQLite without loading the responses"""
+        path = self.dir / 'survey.sqlite'
+        save_data(self.data, str(path))
+
+        in_memory = {'raw data': self.raw_data, 'schema': self.schema}
+        with patch('so_lib.analysis.load_data', return_value=in_memory):
+            expected_distribution = analysis.distribution_sc('Q1')
+            expected_subset = analysis.subset_where('Q2 has "Option Y" and Q3 == "Yes"')
+            expected_select = analysis.subset_respondents('Q2', 'Option Z')
+
+        with patch('so_lib.core.DEFAULT_DATA_PATH', str(path)), \
+             patch('so_lib.analysis.load_data', side_effect=AssertionError("data was loaded")):
+            distribution = analysis.distribution_sc('Q1')
+            subset = analysis.subset_where('Q2 has "Option Y" and Q3 == "Yes"')
+            selected = analysis.subset_respondents('Q2', 'Option Z')
+
+            with self.assertRaises(ValueError):
+                analysis.distribution_sc('Q2')
+            with self.assertRaises(ValueError):
+                analysis.subset_where('Q9 == "x"')
+
+        self.assertEqual(distribution['question_text'], expected_distribution['question_text'])
+        self.assertEqual(distribution['distribution'], expected_distribution['distribution'])
+        pd.testing.assert_frame_equal(subset, expected_subset, check_dtype=False)
+        pd.testing.assert_frame_equal(selected, expected_select, check_dtype=False)
+
+    @unittest.skipUnless(HAS_PARQUET, "pyarrow is not installed")
+    def test_parquet_roundtrip(self):
+        """Test writing a dataset to Parquet and loading it back"""
+        path = self.dir / 'survey.parquet'
+        save_data(self.data, str(path))
+
+        data = core.load_data(str(path))
+        pd.testing.assert_frame_equal(data['raw data'], self.raw_data, check_dtype=False)
+        self.assertEqual(list(data['schema']['column']), ['Q1', 'Q2', 'Q3', 'Age'])
+
+    @unittest.skipIf(HAS_PARQUET, "a Parquet engine is installed")
+    def test_parquet_requires_engine(self):
+        """Test the error raised when no Parquet engine is installed"""
+        with self.assertRaises(ImportError):
+            ParquetBackend(str(self.dir / 'survey.parquet')).read()
+
+if __name__ == '__main__':
+    unittest.main()
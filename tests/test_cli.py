@@ -11,7 +11,8 @@ import pandas as pd
 from pathlib import Path
 from unittest.mock import patch
 
-from so_lib.cli import main
+from so_lib.cli import format_distribution, main
+from so_lib.ordinal import register_ordinal
 
 class TestCLI(unittest.TestCase):
     """Test cases for the CLI module"""
@@ -55,9 +56,17 @@ class TestCLI(unittest.TestCase):
         # Override the default data path for testing
         self.original_data_path = os.environ.get('SO_DATA_PATH')
         os.environ['SO_DATA_PATH'] = str(self.test_data_path)
+
+        # Keep cache files (e.g. validation reports) out of the user cache directory
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': self.cache_dir.name})
+        self.environ.start()
     
     def tearDown(self):
         """Clean up test fixtures"""
+        self.environ.stop()
+        self.cache_dir.cleanup()
+
         # Restore the original data path
         if self.original_data_path:
             os.environ['SO_DATA_PATH'] = self.original_data_path
@@ -72,12 +81,10 @@ class TestCLI(unittest.TestCase):
         if self.test_data_dir.exists():
             self.test_data_dir.rmdir()
 
-    @patch('sys.stdout', new_callable=io.StringIO)
-    @patch('sys.argv', ['so_lib', 'list-questions', '--data-path'])
-    def test_list_questions_command(self, mock_stdout, mock_argv):
+    def test_list_questions_command(self):
         """Test the list-questions command"""
         # Add data path to args
-        mock_argv.append(str(self.test_data_path))
+        mock_argv = ['so_lib', 'list-questions', '--data-path', str(self.test_data_path)]
         
         # Redirect stdout and run the command
         with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
@@ -186,6 +193,211 @@ class TestCLI(unittest.TestCase):
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
 
+    def test_data_path_is_parsed_once(self):
+        """Test that --data-path is honoured and the workbook is parsed exactly once"""
+        from so_lib import core
+        os.environ.pop('SO_DATA_PATH', None)
+        core._DATA_CACHE.clear()
+
+        with patch('pandas.read_excel', wraps=pd.read_excel) as read_excel, \
+                patch('sys.argv', ['so_lib', 'distribution-sc', 'Q1', '--data-path', str(self.test_data_path)]), \
+                patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                main()
+
+        self.assertIn('Distribution for: Q1', mock_stdout.getvalue())
+        self.assertEqual(read_excel.call_count, 1)
+
+    def _test_data(self):
+        """In-memory test data"""
+        return {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2', 'Q3'],
+                'question_text': [
+                    'Test question 1?', 
+                    'Test multiple-choice question?', 
+                    'Another test question?'
+                ],
+                'type': ['SC', 'MC', 'SC']
+            }),
+            'raw data': pd.DataFrame({
+                'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                'Q2': [
+                    'Option X;Option Y', 
+                    'Option Z', 
+                    'Option X', 
+                    None
+                ],
+                'Q3': ['Yes', 'No', 'Yes', 'Yes']
+            })
+        }
+
+    def _run_with_test_data(self, argv):
+        """Run the CLI against in-memory test data and return its output"""
+        test_data = self._test_data()
+        with patch('so_lib.core.load_data', return_value=test_data), \
+                patch('so_lib.analysis.load_data', return_value=test_data), \
+                patch('so_lib.cli.load_data', return_value=test_data), \
+                patch('so_lib.report.load_data', return_value=test_data), \
+                patch('so_lib.ordinal.load_data', return_value=test_data), \
+                patch('sys.argv', ['so_lib'] + argv), \
+                patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit) as cm:
+                main()
+            self.assertEqual(cm.exception.code, 0)
+            return mock_stdout.getvalue()
+
+    def test_json_format(self):
+        """Test --format json on the distribution commands"""
+        import json
+        output = self._run_with_test_data(['distribution-sc', 'Q1', '--format', 'json'])
+        records = json.loads(output)
+        self.assertEqual(records[0], {'question_id': 'Q1', 'option': 'Option A', 'percentage': 50.0})
+        self.assertEqual(len(records), 3)
+
+        output = self._run_with_test_data(['list-questions', '--format', 'json'])
+        self.assertEqual(json.loads(output)[1]['type'], 'MC')
+
+    def test_jsonl_format(self):
+        """Test --format jsonl streams one record per line"""
+        import json
+        output = self._run_with_test_data(['subset', '--where', 'Q1 == "Option C"', '--format', 'jsonl'])
+        lines = output.strip().split("\n")
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0]), {'Q1': 'Option C', 'Q2': None, 'Q3': 'Yes'})
+
+        output = self._run_with_test_data(['search-options', 'Q2', '--format', 'jsonl'])
+        records = [json.loads(line) for line in output.strip().split("\n")]
+        self.assertEqual([r['option'] for r in records], ['Option X', 'Option Y', 'Option Z'])
+        self.assertEqual(records[0]['frequency'], 2)
+
+    def test_csv_format(self):
+        """Test --format csv writes a header and one row per record"""
+        output = self._run_with_test_data(['search-questions', 'question', '--format', 'csv'])
+        df = pd.read_csv(io.StringIO(output))
+        self.assertEqual(list(df.columns), ['question_id', 'type', 'question_text'])
+        self.assertEqual(df['question_id'].tolist(), ['Q1', 'Q2', 'Q3'])
+
+    def test_table_format(self):
+        """Test that the default format is human-readable text"""
+        output = self._run_with_test_data(['distribution-mc', 'Q2'])
+        self.assertIn('Distribution for: Q2', output)
+        self.assertIn('- Option X: 50.00%', output)
+
+        output = self._run_with_test_data(['subset', 'Q1', 'Option A'])
+        self.assertEqual(output.strip(), 'Created subset with 2 respondents.')
+
+    def test_compare_command(self):
+        """Test comparing two segments from the CLI"""
+        import json
+        argv = ['compare', 'Q3', '--a', 'Q1 == "Option A"', '--b', 'Q1 != "Option A"', '--format', 'json']
+        records = json.loads(self._run_with_test_data(argv))
+        self.assertEqual({r['option'] for r in records}, {'Yes', 'No'})
+        yes = [r for r in records if r['option'] == 'Yes'][0]
+        self.assertEqual((yes['count_a'], yes['count_b']), (2, 1))
+        self.assertEqual(yes['pct_a'], 100.0)
+
+        output = self._run_with_test_data(['compare', '--a', 'Q3 == "Yes"', '--b', 'Q3 == "No"'])
+        self.assertIn('Significant differences', output)
+
+    def test_similarity_commands(self):
+        """Test the similar and cluster commands"""
+        import json
+        with patch('so_lib.similarity.load_data', return_value=self._test_data()):
+            records = json.loads(self._run_with_test_data(['similar', '0', '--top', '2', '--format', 'json']))
+            self.assertEqual(len(records), 2)
+            self.assertEqual(records[0]['neighbor'], 2)
+
+            output = self._run_with_test_data(['cluster', '--k', '2', '--iterations', '5', '--batch-size', '2'])
+            self.assertIn('2 clusters', output)
+
+    def test_report_command(self):
+        """Test writing a Markdown report with a crosstab"""
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.dict(os.environ, {'SO_CACHE_DIR': tmp_dir}):
+            output = os.path.join(tmp_dir, 'report.md')
+            lines = self._run_with_test_data(['report', output, '--crosstab', 'Q1:Q3', '--jobs', '1'])
+            self.assertIn('4 sections (4 rendered, 0 unchanged)', lines)
+
+            with open(output, encoding='utf-8') as f:
+                report = f.read()
+            self.assertIn('## Q1 by Q3', report)
+            self.assertIn('| Option A | 50.0% |', report)
+
+    def test_sample_option(self):
+        """Test estimating distributions and subset sizes with --sample"""
+        import json
+        output = self._run_with_test_data(['distribution-sc', 'Q1', '--sample', '1.0', '--format', 'json'])
+        records = json.loads(output)
+        self.assertEqual(records[0], {'question_id': 'Q1', 'option': 'Option A', 'percentage': 50.0, 'margin': 0.0})
+
+        output = self._run_with_test_data(['distribution-mc', 'Q2', '--sample', '4', '--seed', '1'])
+        self.assertIn('Estimated from a sample of 4 of 4 respondents', output)
+        self.assertIn('± 0.00', output)
+
+        output = self._run_with_test_data(['subset', '--where', 'Q3 == "Yes"', '--sample', '0.5'])
+        self.assertIn('Estimated subset size:', output)
+
+    def test_natural_order(self):
+        """Test listing distribution options in natural order"""
+        dist = {
+            'question_id': 'Age',
+            'question_text': 'Age?',
+            'distribution': {'25-34 years old': 40.0, 'Under 18 years old': 10.0,
+                             'Prefer not to say': 5.0, '18-24 years old': 45.0}
+        }
+        lines = format_distribution(dist, order='natural').split("\n")[4:]
+        self.assertEqual(lines, [
+            '- Under 18 years old: 10.00%',
+            '- 18-24 years old: 45.00%',
+            '- 25-34 years old: 40.00%',
+            '- Prefer not to say: 5.00%'
+        ])
+        self.assertEqual(format_distribution(dist).split("\n")[4], '- 18-24 years old: 45.00%')
+
+        output = self._run_with_test_data(['distribution-sc', 'Q3', '--order', 'natural'])
+        self.assertLess(output.index('- No'), output.index('- Yes'))
+
+    def test_ordinal_command(self):
+        """Test the ordinal distribution and its breakdown by another question"""
+        register_ordinal('Q3', ['No', 'Yes'])
+        try:
+            output = self._run_with_test_data(['ordinal', 'Q3'])
+            self.assertIn('- No: 25.00% (cumulative 25.00%)', output)
+            self.assertIn('Median: Yes', output)
+
+            output = self._run_with_test_data(['ordinal', 'Q3', '--by', 'Q1'])
+            self.assertIn('- Option B: No', output)
+            self.assertIn('- Option A: Yes', output)
+        finally:
+            register_ordinal('Q3', None)
+
+    def test_batch_command(self):
+        """Test running several commands from a file as one batch"""
+        import json
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as commands:
+            commands.write("# comment lines and blank lines are skipped\n\n")
+            commands.write("distribution-sc Q1\n")
+            commands.write("distribution-mc Q2\n")
+            commands.write("subset --where 'Q3 == \"No\"'\n")
+            commands.write("distribution-sc Missing\n")
+            commands.write("not-a-command\n")
+            commands_path = commands.name
+
+        try:
+            for jobs in ('1', '4'):
+                output = self._run_with_test_data(['batch', commands_path, '--jobs', jobs])
+                records = [json.loads(line) for line in output.strip().split("\n")]
+
+                self.assertEqual([r['status'] for r in records], ['ok', 'ok', 'ok', 'error', 'error'])
+                self.assertEqual(records[0]['command'], 'distribution-sc Q1')
+                self.assertEqual(records[0]['results'][0]['percentage'], 50.0)
+                self.assertEqual(len(records[1]['results']), 3)
+                self.assertEqual(records[2]['results'], [{'Q1': 'Option B', 'Q2': 'Option Z', 'Q3': 'No'}])
+                self.assertIn('Missing', records[3]['error'])
+        finally:
+            os.unlink(commands_path)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
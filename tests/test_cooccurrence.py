@@ -0,0 +1,85 @@
+"""
+Unit tests for the cooccurrence module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import pandas as pd
+
+from so_lib.cooccurrence import cooccurrence_matrix, top_pairs, frequent_itemsets, top_combinations
+
+class TestCooccurrence(unittest.TestCase):
+    """Test cases for cooccurrence.py module"""
+
+    def setUp(self):
+        """Patch load_data to return a small multiple-choice dataset"""
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Lang', 'Q1'],
+                    'question_text': ['Languages?', 'Single choice?'],
+                    'type': ['MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Lang': ['A;B;C', 'A;B', 'B;A', 'C', None, 'A;C;B'],
+                    'Q1': ['x', 'y', 'x', 'y', 'x', 'y']
+                })
+            }
+
+        from so_lib import cooccurrence as module
+        self.module = module
+        self.original_load_data = module.load_data
+        module.load_data = patched_load_data
+
+    def tearDown(self):
+        """Restore the original load_data"""
+        self.module.load_data = self.original_load_data
+
+    def test_cooccurrence_matrices(self):
+        """Test counts, lift and Jaccard matrices"""
+        result = cooccurrence_matrix('Lang')
+        self.assertEqual(result['respondents'], 5)
+
+        counts = result['counts']
+        self.assertEqual(counts.loc['A', 'A'], 4)
+        self.assertEqual(counts.loc['A', 'B'], 4)
+        self.assertEqual(counts.loc['B', 'C'], 2)
+        self.assertTrue((counts.to_numpy() == counts.to_numpy().T).all())
+
+        self.assertAlmostEqual(result['lift'].loc['A', 'B'], 4 * 5 / (4 * 4))
+        self.assertAlmostEqual(result['jaccard'].loc['A', 'C'], 2 / (4 + 3 - 2))
+
+        with self.assertRaises(ValueError):
+            cooccurrence_matrix('Q1')
+
+    def test_top_pairs(self):
+        """Test ranking option pairs"""
+        pairs = top_pairs('Lang', n=2)
+        self.assertEqual(list(pairs[['option_a', 'option_b']].iloc[0]), ['A', 'B'])
+        self.assertEqual(len(pairs), 2)
+        self.assertAlmostEqual(pairs['support'].iloc[0], 0.8)
+
+        with self.assertRaises(ValueError):
+            top_pairs('Lang', by='unknown')
+
+    def test_frequent_itemsets(self):
+        """Test Apriori search with a minimum support"""
+        itemsets = frequent_itemsets('Lang', min_support=0.4)
+        found = dict(zip(itemsets['itemset'], itemsets['count']))
+        self.assertEqual(found[('A', 'B')], 4)
+        self.assertEqual(found[('A', 'B', 'C')], 2)
+
+        itemsets = frequent_itemsets('Lang', min_support=0.5)
+        self.assertNotIn(('A', 'C'), set(itemsets['itemset']))
+
+        itemsets = frequent_itemsets('Lang', min_support=0.1, top_k=2)
+        self.assertEqual(len(itemsets), 2)
+
+    def test_top_combinations(self):
+        """Test counting complete answers regardless of option order"""
+        combos = top_combinations('Lang')
+        found = dict(zip(combos['combination'], combos['count']))
+        self.assertEqual(found, {('A', 'B'): 2, ('A', 'B', 'C'): 2, ('C',): 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,20 @@ Unit tests for the core module of the Stack Overflow Survey Data Analysis Librar
 
 import unittest
 import os
+import tempfile
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
-from so_lib.core import load_data, list_questions, search_questions, search_options
+from so_lib import core
+from so_lib.backends import open_backend
+
+from so_lib.core import (
+    load_data, preload, append_responses, list_questions, search_questions, search_options,
+    question_info, validation_report, resolve_data_path, use_data, DEFAULT_DATA_PATH
+)
 
 class TestCore(unittest.TestCase):
     """Test cases for core.py module"""
@@ -51,9 +61,17 @@ class TestCore(unittest.TestCase):
         # Override the default data path for testing
         self.original_data_path = os.environ.get('SO_DATA_PATH')
         os.environ['SO_DATA_PATH'] = str(self.test_data_path)
+
+        # Keep cache files (e.g. validation reports) out of the user cache directory
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': self.cache_dir.name})
+        self.environ.start()
     
     def tearDown(self):
         """Clean up test fixtures"""
+        self.environ.stop()
+        self.cache_dir.cleanup()
+
         # Restore the original data path
         if self.original_data_path:
             os.environ['SO_DATA_PATH'] = self.original_data_path
@@ -77,6 +95,135 @@ class TestCore(unittest.TestCase):
         self.assertEqual(len(data['schema']), 3)
         self.assertEqual(len(data['raw data']), 4)
     
+    def test_load_data_is_cached(self):
+        """Test that an unchanged file is only parsed once"""
+        first = load_data(self.test_data_path)
+        second = load_data(self.test_data_path)
+        self.assertIs(first['raw data'], second['raw data'])
+
+        reloaded = load_data(self.test_data_path, reload=True)
+        self.assertIsNot(first['raw data'], reloaded['raw data'])
+
+    def test_concurrent_loads_share_one_parse(self):
+        """Test that threads loading the same file wait for a single parse"""
+        core._DATA_CACHE.clear()
+        reads = []
+
+        def slow_backend(path):
+            backend = open_backend(path)
+            read = backend.read
+
+            def counted_read():
+                reads.append(path)
+                time.sleep(0.2)
+                return read()
+
+            backend.read = counted_read
+            return backend
+
+        with patch('so_lib.core.open_backend', side_effect=slow_backend), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: load_data(self.test_data_path), range(8)))
+
+        self.assertEqual(len(reads), 1)
+        for data in results:
+            self.assertIs(data['raw data'], results[0]['raw data'])
+        self.assertEqual(core._LOADS, {})
+
+    def test_data_path_resolution(self):
+        """Test that SO_DATA_PATH and use_data choose the file read by default"""
+        self.assertEqual(resolve_data_path(), str(self.test_data_path))
+        self.assertEqual(len(load_data()['raw data']), 4)
+
+        with use_data('other.sqlite') as path:
+            self.assertEqual(path, 'other.sqlite')
+            self.assertEqual(resolve_data_path(), 'other.sqlite')
+            self.assertEqual(resolve_data_path('explicit.xlsx'), 'explicit.xlsx')
+            with use_data(None):
+                self.assertEqual(resolve_data_path(), 'other.sqlite')
+        self.assertEqual(resolve_data_path(), str(self.test_data_path))
+
+        with patch.dict(os.environ, {'SO_DATA_PATH': ''}):
+            self.assertEqual(resolve_data_path(), DEFAULT_DATA_PATH)
+
+    def test_preload(self):
+        """Test that preload loads and indexes the data in the background"""
+        future = preload(self.test_data_path)
+        data = future.result(timeout=30)
+        self.assertEqual(len(data['raw data']), 4)
+        self.assertIs(preload(self.test_data_path), future)
+
+        # Later loads reuse the preloaded DataFrames and their indexes
+        from so_lib.index import frame_cache
+        raw_data = load_data(self.test_data_path)['raw data']
+        self.assertIs(raw_data, data['raw data'])
+        self.assertIn(('option_index', 'Q2'), frame_cache(raw_data))
+        self.assertIn(('answer_counts', 'Q1'), frame_cache(raw_data))
+
+    def test_append_responses(self):
+        """Test appending respondents from a DataFrame, CSV and JSON Lines"""
+        data = append_responses(
+            pd.DataFrame({'Q1': ['Option D'], 'Q2': ['Option X;Option W']}),
+            file_path=self.test_data_path
+        )
+        self.assertEqual(len(data['raw data']), 5)
+        self.assertTrue(pd.isna(data['raw data']['Q3'].iloc[4]))
+
+        csv_path = self.test_data_dir / "batch.csv"
+        jsonl_path = self.test_data_dir / "batch.jsonl"
+        try:
+            pd.DataFrame({'Q1': ['Option A'], 'Q3': ['No']}).to_csv(csv_path, index=False)
+            pd.DataFrame({'Q1': ['Option B']}).to_json(jsonl_path, orient='records', lines=True)
+
+            append_responses(str(csv_path), file_path=self.test_data_path)
+            append_responses(str(jsonl_path), file_path=self.test_data_path)
+
+            raw_data = load_data(self.test_data_path)['raw data']
+            self.assertEqual(len(raw_data), 7)
+            self.assertEqual(raw_data['Q1'].tolist()[-3:], ['Option D', 'Option A', 'Option B'])
+            self.assertEqual(list(raw_data.index), list(range(7)))
+
+            with self.assertRaises(ValueError):
+                append_responses(pd.DataFrame({'Unknown': [1]}), file_path=self.test_data_path)
+        finally:
+            for path in (csv_path, jsonl_path):
+                if path.exists():
+                    path.unlink()
+
+    def test_validation_report(self):
+        """Test that the data is validated when first loaded"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch.dict(os.environ, {'SO_CACHE_DIR': cache_dir}):
+                load_data(self.test_data_path, reload=True)
+                self.assertEqual(len(list(Path(cache_dir).glob('*.validation.json'))), 1)
+
+                report = validation_report(self.test_data_path)
+                self.assertTrue(report.ok)
+                self.assertEqual(report.warnings, [])
+
+    def test_unwritable_cache_dir(self):
+        """Test that data loads and validates when the cache directory can't be created"""
+        with patch.dict(os.environ, {'SO_CACHE_DIR': '/proc/so_lib-missing/cache'}):
+            data = load_data(self.test_data_path, reload=True)
+            self.assertEqual(len(data['raw data']), 4)
+            self.assertTrue(validation_report(self.test_data_path).ok)
+
+    def test_question_info(self):
+        """Test the shared question lookup"""
+        data = load_data(self.test_data_path)
+        self.assertEqual(
+            question_info(data, 'Q2'),
+            {'question_id': 'Q2', 'question_text': 'Test multiple-choice question?', 'type': 'MC'}
+        )
+        self.assertEqual(question_info(data, 'Q1', expected_type='SC')['type'], 'SC')
+
+        with self.assertRaisesRegex(ValueError, 'not found'):
+            question_info(data, 'Missing')
+        with self.assertRaisesRegex(ValueError, 'not a multiple-choice question'):
+            question_info(data, 'Q1', expected_type='MC')
+        with self.assertRaises(ValueError):
+            question_info(data, '')
+
     def test_list_questions(self):
         """Test listing all questions"""
         # Patch the load_data function to use our test data
@@ -162,6 +309,46 @@ class TestCore(unittest.TestCase):
             # Restore the original function
             core.load_data = original_load_data
 
+    def test_search_options_frequencies(self):
+        """Test that options come back with frequencies in a deterministic order"""
+        # Patch the load_data function to use our test data
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Q1', 'Q2', 'Q4'],
+                    'question_text': ['Test question 1?', 'Test multiple-choice question?', 'Free text?'],
+                    'type': ['SC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Q1': ['Option C', 'Option B', 'Option A', 'Option A'],
+                    'Q2': ['Option Z;Option Y', 'Option Y', 'Option X', 'Option Y;Option X'],
+                    'Q4': ['a;b', 'a;b', 'c', None]
+                })
+            }
+        
+        original_load_data = load_data
+        try:
+            from so_lib import core
+            core.load_data = patched_load_data
+            
+            options = search_options('Q1')
+            self.assertEqual(options['options'], ['Option A', 'Option B', 'Option C'])
+            self.assertEqual(options['frequencies'], {'Option A': 2, 'Option B': 1, 'Option C': 1})
+            
+            options = search_options('Q2')
+            self.assertEqual(options['options'], ['Option Y', 'Option X', 'Option Z'])
+            self.assertEqual(options['frequencies']['Option Y'], 3)
+            
+            # Single-choice answers are never split, even if they contain ';'
+            options = search_options('Q4')
+            self.assertEqual(options['options'], ['a;b', 'c'])
+            
+            options = search_options('Q2', 'x')
+            self.assertEqual(options['options'], ['Option X'])
+        finally:
+            # Restore the original function
+            core.load_data = original_load_data
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Unit tests for the cube module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib.cube import AggregateCube, build_cube, load_cube, cube_distribution
+from so_lib.derived import matches, register_derived
+
+class TestCube(unittest.TestCase):
+    """Test cases for cube.py module"""
+
+    def setUp(self):
+        """Patch load_data and keep cube files in a temporary directory"""
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': ['Country', 'Age', 'Remote', 'Lang', 'Comp'],
+                    'question_text': ['Country?', 'Age?', 'Remote?', 'Languages?', 'Compensation?'],
+                    'type': ['SC', 'SC', 'SC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'Country': ['DE', 'DE', 'US', 'US', 'US', 'DE'],
+                    'Age': ['18-24', '25-34', '25-34', '25-34', None, '25-34'],
+                    'Remote': ['Yes', 'No', 'Yes', 'Yes', 'No', 'Yes'],
+                    'Lang': ['A;B', 'B', 'A', None, 'C', 'A'],
+                    'Comp': [100, 200, 'n/a', 400, 500, 300]
+                })
+            }
+
+        from so_lib import cube
+        self.module = cube
+        self.original_load_data = cube.load_data
+        cube.load_data = patched_load_data
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': self.cache_dir.name})
+        self.environ.start()
+
+    def tearDown(self):
+        """Restore load_data and the cache directory"""
+        self.module.load_data = self.original_load_data
+        self.environ.stop()
+        self.cache_dir.cleanup()
+
+    def test_cube_matches_raw_engine(self):
+        """Test that cube answers equal the raw-data answers"""
+        cube = build_cube(['Country', 'Age', 'Remote'], measures=['Comp'], max_workers=2)
+        self.assertEqual(cube.n_rows, 6)
+        self.assertEqual(int(cube.cells['count'].sum()), 6)
+
+        for where in [None, 'Country == "DE"', 'Country == "US" and Age == "25-34"', 'not Remote == "No"']:
+            from_cube = cube_distribution('Remote', where, cube)
+            from_raw = cube_distribution('Remote', where)
+            self.assertEqual(from_cube['source'], 'cube')
+            self.assertEqual(from_raw['source'], 'raw')
+            self.assertEqual(from_cube['distribution'], from_raw['distribution'])
+            self.assertEqual(from_cube['respondents'], from_raw['respondents'])
+
+        dist = cube_distribution('Age', 'Country == "US"', cube)
+        self.assertEqual(dist['distribution'], {'25-34': 100.0})
+
+        self.assertEqual(cube.mean('Comp', 'Country == "DE"'), 200.0)
+        self.assertEqual(cube.mean('Comp', 'Country == "US"'), 450.0)
+
+    def test_fallback_to_raw_engine(self):
+        """Test that questions outside the cube are answered from raw data"""
+        cube = build_cube(['Country'], save=False)
+        self.assertFalse(cube.can_answer('Remote'))
+        self.assertFalse(cube.can_answer('Country', 'Remote == "Yes"'))
+
+        dist = cube_distribution('Country', 'Remote == "Yes"', cube)
+        self.assertEqual(dist['source'], 'raw')
+        self.assertEqual(dist['distribution'], {'DE': 50.0, 'US': 50.0})
+
+        dist = cube_distribution('Lang', 'Country == "DE"', cube)
+        self.assertEqual(dist['source'], 'raw')
+        self.assertAlmostEqual(dist['distribution']['A'], 2 / 3 * 100)
+
+    def test_derived_column_on_raw_engine(self):
+        """Test distributions of derived columns, which are never in a cube"""
+        register_derived('Young', matches('Age == "18-24"'))
+        try:
+            dist = cube_distribution('Young', 'Country == "DE"')
+            self.assertEqual(dist['source'], 'raw')
+            self.assertAlmostEqual(dist['distribution']['No'], 200 / 3)
+        finally:
+            register_derived('Young', None)
+
+    def test_save_and_load(self):
+        """Test persisting a cube to the cache directory"""
+        cube = build_cube(['Country', 'Remote'])
+        loaded = load_cube()
+        self.assertIsInstance(loaded, AggregateCube)
+        self.assertEqual(loaded.dimensions, ['Country', 'Remote'])
+        self.assertEqual(
+            loaded.distribution('Remote', 'Country == "US"'),
+            cube.distribution('Remote', 'Country == "US"')
+        )
+
+    def test_stale_after_append(self):
+        """Test that a cube is not used once responses are appended to the loaded data"""
+        from so_lib import core
+        self.module.load_data = self.original_load_data
+        path = str(Path(self.cache_dir.name) / 'survey.csv')
+        pd.DataFrame({'Q1': ['a', 'a', 'b']}).to_csv(path, index=False)
+        try:
+            with core.use_data(path):
+                cube = build_cube(['Q1'])
+                self.assertEqual(cube_distribution('Q1', cube=cube)['source'], 'cube')
+
+                core.append_responses(pd.DataFrame({'Q1': ['b', 'b', 'b']}))
+                dist = cube_distribution('Q1', cube=cube)
+                self.assertEqual(dist['source'], 'raw')
+                self.assertEqual(dist['respondents'], 6)
+                self.assertAlmostEqual(dist['distribution']['b'], 400 / 6)
+                with self.assertRaises(ValueError):
+                    load_cube()
+        finally:
+            core._DATA_CACHE.clear()
+
+    def test_invalid_dimensions(self):
+        """Test that multiple-choice and unknown dimensions are rejected"""
+        with self.assertRaises(ValueError):
+            build_cube(['Lang'], save=False)
+        with self.assertRaises(ValueError):
+            build_cube(['Missing'], save=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Unit tests for the derived module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib import core
+from so_lib.analysis import crosstab, distribution_mc, distribution_sc, respondents, subset_respondents, subset_where
+from so_lib.derived import bucket, derived_columns, matches, numeric_values, option_count, register_derived
+from so_lib.index import column
+from so_lib.ordinal import ordinal_distribution
+
+class TestDerived(unittest.TestCase):
+    """Test cases for derived.py module"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_data = {
+            'schema': pd.DataFrame({
+                'column': ['YearsCodePro', 'AITools', 'RemoteWork'],
+                'question_text': ['Years coding professionally?', 'AI tools used?', 'Remote work?'],
+                'type': ['SC', 'MC', 'SC']
+            }),
+            'raw data': pd.DataFrame({
+                'YearsCodePro': ['Less than 1 year', 3, 7, '12', 'More than 50 years', None],
+                'AITools': ['ChatGPT;Copilot', 'ChatGPT', None, 'Copilot', 'ChatGPT;Copilot;Gemini', None],
+                'RemoteWork': ['Remote', 'Hybrid', 'Remote', 'In-person', 'Remote', 'Hybrid']
+            })
+        }
+        register_derived('ExperienceBand', bucket('YearsCodePro', [0, 5, 10]), question_text='Experience, banded')
+        register_derived('UsesAI', matches('AITools has "ChatGPT" or AITools has "Copilot"'))
+        register_derived('AIToolCount', option_count('AITools'))
+
+        self.patches = [
+            patch(f'so_lib.{module}.load_data', return_value=self.test_data) for module in ('analysis', 'ordinal')
+        ] + [patch('so_lib.analysis.query_backend', return_value=None)]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        """Remove the registrations"""
+        for p in self.patches:
+            p.stop()
+        for name in ('ExperienceBand', 'UsesAI', 'AIToolCount', 'Tools'):
+            register_derived(name, None)
+
+    def test_builders(self):
+        """Test banding, expression flags and option counts"""
+        raw_data = self.test_data['raw data']
+        np.testing.assert_array_equal(numeric_values(raw_data['YearsCodePro']), [0.5, 3, 7, 12, 50.5, np.nan])
+        bands = column(raw_data, 'ExperienceBand')
+        self.assertEqual(bands.iloc[:5].tolist(), ['0-4', '0-4', '5-9', '10+', '10+'])
+        self.assertTrue(pd.isna(bands.iloc[5]))
+        self.assertEqual(column(raw_data, 'UsesAI').tolist(), ['Yes', 'Yes', 'No', 'Yes', 'Yes', 'No'])
+        self.assertEqual(column(raw_data, 'AIToolCount').tolist(), [2, 1, 0, 1, 3, 0])
+
+        with self.assertRaises(ValueError):
+            bucket('YearsCodePro', [5, 0])
+        with self.assertRaises(ValueError):
+            register_derived('Broken', lambda raw_data: [1, 2])
+            column(raw_data, 'Broken')
+        register_derived('Broken', None)
+
+    def test_usable_as_question(self):
+        """Test derived columns in distributions, crosstabs, subsets and filters"""
+        distribution = distribution_sc('ExperienceBand')
+        self.assertEqual(distribution['question_text'], 'Experience, banded')
+        self.assertEqual(distribution['distribution'], {'0-4': 40.0, '10+': 40.0, '5-9': 20.0})
+
+        table = crosstab('ExperienceBand', 'UsesAI')['table']
+        self.assertEqual(table.loc['10+', 'Yes'], 2)
+        self.assertEqual(table.loc['5-9', 'No'], 1)
+
+        self.assertEqual(len(subset_respondents('UsesAI', 'No')), 2)
+        frame = subset_where('UsesAI == "Yes" and AIToolCount >= 2')
+        self.assertEqual(frame.index.tolist(), [0, 4])
+        self.assertEqual(respondents('ExperienceBand == "10+"').to_frame(['RemoteWork', 'UsesAI'])['UsesAI'].tolist(),
+                         ['Yes', 'Yes'])
+
+        register_derived('Tools', lambda raw_data: raw_data['AITools'].str.replace('Gemini', 'Other'),
+                         question_type='MC', columns=['AITools'])
+        self.assertIn('Other', distribution_mc('Tools')['distribution'])
+        self.assertEqual(ordinal_distribution('ExperienceBand')['levels'], ['0-4', '5-9', '10+'])
+        self.assertEqual(derived_columns()['question_id'].tolist(), ['ExperienceBand', 'UsesAI', 'AIToolCount', 'Tools'])
+
+        with self.assertRaises(ValueError):
+            distribution_sc('Unknown')
+
+    def test_computed_once_and_invalidated(self):
+        """Test that a derived column is computed on first use only, and again when redefined"""
+        calls = []
+
+        def remote(raw_data):
+            calls.append(1)
+            return raw_data['RemoteWork'] == 'Remote'
+
+        register_derived('Tools', remote)
+        self.assertEqual(calls, [])
+        first = distribution_sc('Tools')
+        distribution_sc('Tools')
+        crosstab('Tools', 'UsesAI')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first['distribution'], {True: 50.0, False: 50.0})
+
+        register_derived('Tools', lambda raw_data: raw_data['RemoteWork'] != 'Remote')
+        self.assertEqual(distribution_sc('Tools')['distribution'], {False: 50.0, True: 50.0})
+
+    def test_saved_with_dataset_fingerprint(self):
+        """Test that derived columns of a loaded file are reused across loads and recomputed when it changes"""
+        calls = []
+
+        def remote(raw_data):
+            calls.append(1)
+            return np.where(raw_data['RemoteWork'] == 'Remote', 'Remote', 'Office')
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, {'SO_CACHE_DIR': directory}):
+            path = str(Path(directory) / 'survey.xlsx')
+            with pd.ExcelWriter(path) as writer:
+                self.test_data['schema'].to_excel(writer, sheet_name='schema', index=False)
+                self.test_data['raw data'].to_excel(writer, sheet_name='raw data', index=False)
+
+            register_derived('Tools', remote)
+            for _ in range(2):
+                core._DATA_CACHE.clear()
+                with patch('so_lib.analysis.load_data', side_effect=core.load_data), core.use_data(path):
+                    self.assertEqual(distribution_sc('Tools')['distribution'], {'Remote': 50.0, 'Office': 50.0})
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(len(list(Path(directory).glob('survey.xlsx.*.derived.Tools.*.pkl'))), 1)
+
+            core._DATA_CACHE.clear()
+            with core.use_data(path):
+                core.append_responses(self.test_data['raw data'].iloc[:2])
+                with patch('so_lib.analysis.load_data', side_effect=core.load_data):
+                    self.assertEqual(distribution_sc('Tools')['distribution'], {'Remote': 50.0, 'Office': 50.0})
+            self.assertEqual(len(calls), 2)
+            core._DATA_CACHE.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
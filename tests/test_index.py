@@ -0,0 +1,100 @@
+"""
+Unit tests for the index module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from so_lib import index as index_module
+from so_lib.index import answer_counts, build_option_index, extend_frame_cache, option_index
+
+class TestIndex(unittest.TestCase):
+    """Test cases for index.py module"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.raw_data = pd.DataFrame({
+            'Lang': ['Java;C++', 'JavaScript', None, 'C#;Java;Java', 'C++'],
+        }, index=[10, 11, 12, 13, 14])
+
+    def test_build_option_index(self):
+        """Test that the index maps options to row positions"""
+        index = build_option_index(self.raw_data['Lang'])
+
+        self.assertEqual(list(index.options), ['Java', 'C++', 'JavaScript', 'C#'])
+        self.assertEqual(index.positions('Java').tolist(), [0, 3])
+        self.assertEqual(index.positions('C++').tolist(), [0, 4])
+        self.assertEqual(index.positions('Rust').tolist(), [])
+        self.assertEqual(index.mask('C#').tolist(), [False, False, False, True, False])
+        self.assertIn('JavaScript', index)
+        self.assertNotIn('Java;C++', index)
+
+    def test_counts_ignore_repeated_options(self):
+        """Test that an option repeated within one answer counts once"""
+        counts = build_option_index(self.raw_data['Lang']).counts()
+        self.assertEqual(counts.to_dict(), {'Java': 2, 'C++': 2, 'JavaScript': 1, 'C#': 1})
+
+    def test_option_index_is_cached(self):
+        """Test that the index is built once per DataFrame and question"""
+        first = option_index(self.raw_data, 'Lang')
+        self.assertIs(option_index(self.raw_data, 'Lang'), first)
+        self.assertIsNot(option_index(self.raw_data.copy(), 'Lang'), first)
+
+    def test_concurrent_builds_run_once(self):
+        """Test that threads asking for the same index share one build"""
+        builds = []
+
+        def slow_build(values):
+            builds.append(values.name)
+            time.sleep(0.1)
+            return build_option_index(values)
+
+        raw_data = pd.DataFrame({'Lang': ['Java;C++', 'C#'] * 50, 'Tools': ['Git', 'Docker;Git'] * 50})
+        with patch('so_lib.index.build_option_index', side_effect=slow_build), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda q: option_index(raw_data, q), ['Lang', 'Tools'] * 4))
+
+        self.assertEqual(sorted(builds), ['Lang', 'Tools'])
+        self.assertTrue(all(result is results[0] for result in results[::2]))
+        self.assertEqual(index_module._BUILD_LOCKS, {})
+
+    def test_cached_arrays_are_read_only(self):
+        """Test that queries can't modify shared index arrays"""
+        index = option_index(self.raw_data, 'Lang')
+        with self.assertRaises(ValueError):
+            index.rows[0] = 1
+        with self.assertRaises(ValueError):
+            index.offsets[0] = 1
+
+    def test_extend_matches_rebuild(self):
+        """Test that extending an index gives the same result as rebuilding it"""
+        batch = pd.Series(['Rust;Java', None, 'C++;JavaScript;Rust'])
+        extended = build_option_index(self.raw_data['Lang']).extend(batch)
+        rebuilt = build_option_index(pd.concat([self.raw_data['Lang'], batch]))
+
+        self.assertEqual(extended.n_rows, 8)
+        self.assertEqual(extended.counts().to_dict(), rebuilt.counts().to_dict())
+        for option in rebuilt.options:
+            self.assertEqual(extended.positions(option).tolist(), rebuilt.positions(option).tolist())
+
+    def test_extend_frame_cache(self):
+        """Test that cached values are carried over to the extended DataFrame"""
+        raw_data = pd.DataFrame({'Lang': ['Java;C++', 'C#'], 'Age': ['18-24', '25-34']})
+        option_index(raw_data, 'Lang')
+        answer_counts(raw_data, 'Age')
+
+        batch = pd.DataFrame({'Lang': ['Java'], 'Age': ['25-34']}, index=[2])
+        extended = pd.concat([raw_data, batch])
+        extend_frame_cache(raw_data, extended, batch)
+
+        from so_lib.index import frame_cache
+        cache = frame_cache(extended)
+        self.assertEqual(cache[('option_index', 'Lang')].counts()['Java'], 2)
+        self.assertEqual(cache[('answer_counts', 'Age')].to_dict(), {'25-34': 2, '18-24': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
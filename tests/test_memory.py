@@ -0,0 +1,93 @@
+"""
+Unit tests for the memory module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib import memory
+from so_lib.index import build_option_index
+from so_lib.memory import chunk_rows, memory_report, parse_size, spill_array
+
+class TestMemory(unittest.TestCase):
+    """Test cases for memory.py module"""
+
+    def setUp(self):
+        """Remember the budget settings the tests change"""
+        self.original_env = {key: os.environ.get(key) for key in ('SO_MEMORY_LIMIT', 'SO_SPILL_DIR')}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Restore the budget settings"""
+        for key, value in self.original_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.tmp_dir.cleanup()
+
+    def test_parse_size(self):
+        """Test parsing sizes with and without units"""
+        self.assertEqual(parse_size('1000'), 1000)
+        self.assertEqual(parse_size('512M'), 512 * 1024 ** 2)
+        self.assertEqual(parse_size('1.5GiB'), int(1.5 * 1024 ** 3))
+        self.assertEqual(parse_size(' 4 g '), 4 * 1024 ** 3)
+
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+
+    def test_chunk_rows(self):
+        """Test sizing chunks with and without a budget"""
+        os.environ.pop('SO_MEMORY_LIMIT', None)
+        self.assertEqual(chunk_rows(1000, 50000), 50000)
+        self.assertIsNone(memory_report()['limit'])
+
+        with patch('so_lib.memory.memory_usage', return_value=0):
+            os.environ['SO_MEMORY_LIMIT'] = '4M'
+            self.assertEqual(chunk_rows(1024, 50000), 1024)
+            self.assertEqual(chunk_rows(1024, 50000, minimum=1), 1024)
+            self.assertEqual(chunk_rows(16, 50000), 50000)
+            self.assertEqual(chunk_rows(1024 ** 2, 50000, minimum=1), 1)
+
+            report = memory_report()
+            self.assertEqual(report['limit'], 4 * 1024 ** 2)
+            self.assertEqual(report['available'], 4 * 1024 ** 2)
+
+    def test_chunked_option_index(self):
+        """Test that an option index built in chunks matches one built at once"""
+        values = pd.Series(['A;B', 'C', None, 'B;A;B', 'D;C', 'A', None, 'E'] * 5)
+        expected = build_option_index(values)
+
+        with patch('so_lib.index.chunk_rows', return_value=3):
+            chunked = build_option_index(values)
+
+        self.assertEqual(list(chunked.options), list(expected.options))
+        for option in expected.options:
+            np.testing.assert_array_equal(chunked.positions(option), expected.positions(option))
+
+    def test_spill_array(self):
+        """Test spilling arrays that don't fit in the budget to disk"""
+        array = np.arange(100000, dtype=np.int64)
+
+        os.environ.pop('SO_MEMORY_LIMIT', None)
+        self.assertIs(spill_array(array), array)
+
+        os.environ['SO_MEMORY_LIMIT'] = '1M'
+        os.environ['SO_SPILL_DIR'] = self.tmp_dir.name
+        with patch('so_lib.memory.memory_usage', return_value=0), \
+             patch('so_lib.memory._SPILL_DIR', None):
+            before = memory_report()['spilled_files']
+            spilled = spill_array(array)
+
+            self.assertIsInstance(spilled, np.memmap)
+            self.assertFalse(spilled.flags.writeable)
+            np.testing.assert_array_equal(spilled, array)
+            self.assertTrue(str(memory.spill_dir()).startswith(self.tmp_dir.name))
+            self.assertEqual(memory_report()['spilled_files'], before + 1)
+
+if __name__ == '__main__':
+    unittest.main()
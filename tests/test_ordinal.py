@@ -0,0 +1,127 @@
+"""
+Unit tests for the ordinal module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib.index import extend_frame_cache, ordinal_codes
+from so_lib.ordinal import (
+    infer_scale, natural_order, ordinal_crosstab, ordinal_distribution, ordinal_scale, register_ordinal
+)
+
+class TestOrdinal(unittest.TestCase):
+    """Test cases for ordinal.py module"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_data = {
+            'schema': pd.DataFrame({
+                'column': ['Age', 'YearsCode', 'Sat', 'Q2'],
+                'question_text': ['Age?', 'Years coding?', 'Satisfaction?', 'Test multiple-choice question?'],
+                'type': ['SC', 'SC', 'SC', 'MC']
+            }),
+            'raw data': pd.DataFrame({
+                'Age': ['25-34 years old', 'Under 18 years old', '18-24 years old', '25-34 years old',
+                        'Prefer not to say', None, '35-44 years old'],
+                'YearsCode': [7, 'Less than 1 year', 3, 'More than 50 years', 12, None, 3],
+                'Sat': ['Agree', 'Low', 'High', 'Medium', 'High', 'Low', None],
+                'Q2': ['Option X;Option Y', 'Option Y', 'Option X', None, 'Option Y', 'Option X', 'Option Y']
+            })
+        }
+
+    def test_infer_scale(self):
+        """Test inferring scales from ranges, numbers and known scales"""
+        scale = infer_scale(['10,000 or more employees', '2 to 9 employees', "I don’t know",
+                             'Just me - I am a freelancer, sole proprietor, etc.', '100 to 499 employees'])
+        self.assertEqual(scale.levels, (
+            'Just me - I am a freelancer, sole proprietor, etc.', '2 to 9 employees',
+            '100 to 499 employees', '10,000 or more employees'
+        ))
+        np.testing.assert_array_equal(scale.values, [1, 5.5, 299.5, 10000.5])
+
+        scale = infer_scale(['12', 'More than 50 years', '50', 'Less than 1 year', '3'])
+        self.assertEqual(scale.levels, ('Less than 1 year', '3', '12', '50', 'More than 50 years'))
+
+        scale = infer_scale(['Agree', 'Strongly disagree', 'Neither agree nor disagree'])
+        self.assertEqual(scale.levels, ('Strongly disagree', 'Neither agree nor disagree', 'Agree'))
+        np.testing.assert_array_equal(scale.values, [1, 3, 4])
+
+        self.assertIsNone(infer_scale(['Option A', 'Option B']))
+        self.assertIsNone(infer_scale(['Agree', 'Option B']))
+
+    def test_ordinal_scale_sources(self):
+        """Test registered, schema and inferred scales"""
+        data = self.test_data
+        self.assertEqual(ordinal_scale(data, 'Age').source, 'inferred')
+        with self.assertRaises(ValueError):
+            ordinal_scale(data, 'Sat')
+        with self.assertRaises(ValueError):
+            ordinal_scale(data, 'Q2')
+
+        schema = data['schema'].assign(order=[None, None, 'Low;Medium;High', None])
+        scale = ordinal_scale({'schema': schema, 'raw data': data['raw data']}, 'Sat')
+        self.assertEqual((scale.levels, scale.source), (('Low', 'Medium', 'High'), 'schema'))
+
+        register_ordinal('Sat', ['Low', 'Medium', 'High', 'Agree'], [0, 1, 2, 2])
+        try:
+            scale = ordinal_scale(data, 'Sat')
+            self.assertEqual(scale.source, 'registered')
+            np.testing.assert_array_equal(scale.values, [0, 1, 2, 2])
+        finally:
+            register_ordinal('Sat', None)
+
+    def test_ordinal_codes(self):
+        """Test encoding answers once and extending codes for appended rows"""
+        raw_data = self.test_data['raw data']
+        levels = ('Less than 1 year', '3', '7', '12', 'More than 50 years')
+        codes = ordinal_codes(raw_data, 'YearsCode', levels)
+        np.testing.assert_array_equal(codes, [2, 0, 1, 4, 3, -1, 1])
+        self.assertFalse(codes.flags.writeable)
+        self.assertIs(ordinal_codes(raw_data, 'YearsCode', levels).base, codes.base)
+
+        batch = pd.DataFrame({column: [None] for column in raw_data.columns}).assign(YearsCode=['12'])
+        extended = pd.concat([raw_data, batch], ignore_index=True)
+        extend_frame_cache(raw_data, extended, batch)
+        np.testing.assert_array_equal(ordinal_codes(extended, 'YearsCode', levels), [2, 0, 1, 4, 3, -1, 1, 3])
+
+    def test_ordinal_distribution(self):
+        """Test ordered, cumulative distributions with median and mean"""
+        with patch('so_lib.ordinal.load_data', return_value=self.test_data):
+            dist = ordinal_distribution('Age')
+
+        self.assertEqual(dist['levels'], ['Under 18 years old', '18-24 years old', '25-34 years old', '35-44 years old'])
+        self.assertEqual(dist['respondents'], 5)
+        self.assertEqual(list(dist['distribution'].values()), [20.0, 20.0, 40.0, 20.0])
+        self.assertEqual(list(dist['cumulative'].values()), [20.0, 40.0, 80.0, 100.0])
+        self.assertEqual(dist['median'], '25-34 years old')
+        self.assertEqual(dist['median_value'], 29.5)
+        self.assertAlmostEqual(dist['mean'], (17.5 + 21 + 29.5 * 2 + 39.5) / 5)
+
+    def test_ordinal_crosstab(self):
+        """Test medians and cumulative percentages per option of another question"""
+        with patch('so_lib.ordinal.load_data', return_value=self.test_data):
+            result = ordinal_crosstab('Age', 'Q2')
+
+        table = result['table']
+        self.assertEqual(list(table.index), ['Option Y', 'Option X'])
+        self.assertEqual(list(table.columns), result['levels'])
+        self.assertEqual(list(table.loc['Option X']), [0, 1, 1, 0])
+        self.assertEqual(list(table.loc['Option Y']), [1, 0, 1, 1])
+        self.assertEqual(list(result['cumulative'].loc['Option Y'].round(2)), [33.33, 33.33, 66.67, 100.0])
+        self.assertEqual(result['median']['Option Y'], '25-34 years old')
+        self.assertEqual(result['median']['Option X'], '18-24 years old')
+        self.assertAlmostEqual(result['mean']['Option X'], 25.25)
+
+    def test_natural_order(self):
+        """Test natural ordering of answers with and without a scale"""
+        self.assertEqual(
+            natural_order(['35-44 years old', 'Prefer not to say', 'Under 18 years old', '18-24 years old']),
+            ['Under 18 years old', '18-24 years old', '35-44 years old', 'Prefer not to say']
+        )
+        self.assertEqual(natural_order(['Option 10', 'option 2', 'Option 1']), ['Option 1', 'option 2', 'Option 10'])
+
+if __name__ == '__main__':
+    unittest.main()
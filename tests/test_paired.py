@@ -0,0 +1,81 @@
+"""
+Unit tests for the paired module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import math
+import pandas as pd
+
+from so_lib.paired import paired_questions, paired_metrics, all_paired_metrics
+
+class TestPaired(unittest.TestCase):
+    """Test cases for paired.py module"""
+
+    def setUp(self):
+        """Patch load_data to return a dataset with two question pairs"""
+        def patched_load_data(*args, **kwargs):
+            return {
+                'schema': pd.DataFrame({
+                    'column': [
+                        'LanguageHaveWorkedWith', 'LanguageWantToWorkWith',
+                        'DatabaseHaveWorkedWith', 'DatabaseWantToWorkWith',
+                        'PlatformHaveWorkedWith', 'Q1'
+                    ],
+                    'question_text': ['Used?', 'Want?', 'Used?', 'Want?', 'Used?', 'Single?'],
+                    'type': ['MC', 'MC', 'MC', 'MC', 'MC', 'SC']
+                }),
+                'raw data': pd.DataFrame({
+                    'LanguageHaveWorkedWith': ['Python;Rust', 'Python', 'Java', None, 'Python'],
+                    'LanguageWantToWorkWith': ['Rust', 'Python;Go', None, 'Rust', 'Python'],
+                    'DatabaseHaveWorkedWith': ['SQLite', 'SQLite', None, None, 'Postgres'],
+                    'DatabaseWantToWorkWith': ['Postgres', 'SQLite', None, None, 'Postgres'],
+                    'PlatformHaveWorkedWith': ['AWS', None, None, None, None],
+                    'Q1': ['a', 'b', 'a', 'b', 'a']
+                })
+            }
+
+        from so_lib import paired
+        self.module = paired
+        self.original_load_data = paired.load_data
+        paired.load_data = patched_load_data
+
+    def tearDown(self):
+        """Restore the original load_data"""
+        self.module.load_data = self.original_load_data
+
+    def test_paired_questions(self):
+        """Test discovering question pairs from the schema"""
+        pairs = paired_questions()
+        self.assertEqual([p['prefix'] for p in pairs], ['Language', 'Database'])
+        self.assertEqual(pairs[0]['want_question_id'], 'LanguageWantToWorkWith')
+
+    def test_paired_metrics(self):
+        """Test joint counts and admired/desired percentages"""
+        result = paired_metrics('Language')
+        self.assertEqual(result['respondents'], 5)
+
+        metrics = result['metrics']
+        self.assertEqual(list(metrics.index), ['Python', 'Rust', 'Java', 'Go'])
+        self.assertEqual(metrics.loc['Python', ['have', 'want', 'both']].tolist(), [3, 2, 2])
+        self.assertAlmostEqual(metrics.loc['Python', 'admired'], 2 / 3 * 100)
+        self.assertAlmostEqual(metrics.loc['Rust', 'desired'], 2 / 5 * 100)
+        self.assertEqual(metrics.loc['Rust', 'want_only'], 1)
+        self.assertEqual(metrics.loc['Java', 'admired'], 0)
+        self.assertTrue(math.isnan(metrics.loc['Go', 'admired']))
+
+        # Either question identifier works as well
+        self.assertEqual(paired_metrics('LanguageWantToWorkWith')['prefix'], 'Language')
+
+        with self.assertRaises(ValueError):
+            paired_metrics('Platform')
+
+    def test_all_paired_metrics(self):
+        """Test computing every pair in parallel"""
+        results = all_paired_metrics(max_workers=2)
+        self.assertEqual(set(results), {'Language', 'Database'})
+        self.assertEqual(results['Database']['metrics'].loc['Postgres', 'both'], 1)
+        self.assertEqual(results['Database']['respondents'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
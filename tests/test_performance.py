@@ -0,0 +1,167 @@
+"""
+Performance tests for the Stack Overflow Survey Data Analysis Library.
+
+These guard complexity and caching rather than absolute speed: analysis
+functions must scale linearly with the number of respondents, cached
+results must be much faster than the first computation, and a data file
+must be parsed once per command. A medium synthetic dataset is generated
+once for the whole module.
+"""
+
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib import core
+from so_lib.analysis import distribution_mc, distribution_sc
+from so_lib.cli import main
+
+LANGUAGES = [
+    'Bash/Shell', 'C', 'C#', 'C++', 'Dart', 'Go', 'HTML/CSS', 'Java', 'JavaScript', 'Kotlin',
+    'PHP', 'PowerShell', 'Python', 'R', 'Ruby', 'Rust', 'SQL', 'Swift', 'TypeScript', 'Zig'
+]
+MAIN_BRANCH = ['I am a developer by profession', 'I am learning to code', 'I code primarily as a hobby']
+REMOTE_WORK = ['Remote', 'Hybrid (some remote, some in-person)', 'In-person']
+AGES = ['Under 18 years old', '18-24 years old', '25-34 years old', '35-44 years old', '45-54 years old']
+
+# Respondents of the largest generated dataset, and of the workbook used by the CLI tests
+N_ROWS = 80000
+N_WORKBOOK_ROWS = 5000
+
+SCHEMA = pd.DataFrame({
+    'column': ['MainBranch', 'LanguageHaveWorkedWith', 'RemoteWork', 'Age'],
+    'question_text': ['Which best describes you?', 'Languages worked with?', 'Remote work?', 'Age?'],
+    'type': ['SC', 'MC', 'SC', 'SC']
+})
+
+_dataset = None
+_tmp_dir = None
+
+
+def generate_responses(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic survey responses with realistic multiple-choice answers."""
+    rng = np.random.default_rng(seed)
+    selected = rng.random((n_rows, len(LANGUAGES))) < 0.2
+    languages = np.array(LANGUAGES, dtype=object)
+    answers = [';'.join(languages[row]) or None for row in selected]
+
+    return pd.DataFrame({
+        'MainBranch': rng.choice(MAIN_BRANCH, n_rows),
+        'LanguageHaveWorkedWith': answers,
+        'RemoteWork': rng.choice(REMOTE_WORK, n_rows),
+        'Age': rng.choice(AGES, n_rows),
+    })
+
+
+def setUpModule():
+    """Generate the dataset and write the workbook once for all tests"""
+    global _dataset, _tmp_dir
+    _dataset = generate_responses(N_ROWS)
+    _tmp_dir = tempfile.mkdtemp(prefix='so_lib-perf-')
+    with pd.ExcelWriter(Path(_tmp_dir) / 'survey.xlsx') as writer:
+        SCHEMA.to_excel(writer, sheet_name='schema', index=False)
+        _dataset.iloc[:N_WORKBOOK_ROWS].to_excel(writer, sheet_name='raw data', index=False)
+
+
+def tearDownModule():
+    """Remove the workbook"""
+    shutil.rmtree(_tmp_dir, ignore_errors=True)
+
+
+def fresh_data(n_rows: int) -> dict:
+    """A new copy of the first n_rows respondents, with nothing cached for it"""
+    return {'schema': SCHEMA, 'raw data': _dataset.iloc[:n_rows].reset_index(drop=True).copy()}
+
+
+def best_time(function, repeat: int = 3, setup=None) -> float:
+    """Shortest wall time of several runs of function(setup())"""
+    times = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class TestPerformance(unittest.TestCase):
+    """Complexity and caching guarantees of the analysis functions and CLI"""
+
+    def setUp(self):
+        """Isolate the data path and cache directory"""
+        self.workbook = str(Path(_tmp_dir) / 'survey.xlsx')
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': str(Path(_tmp_dir) / 'cache')})
+        self.environ.start()
+        os.environ.pop('SO_DATA_PATH', None)
+        core._DATA_CACHE.clear()
+
+    def tearDown(self):
+        """Restore the environment and forget loaded datasets"""
+        core._DATA_CACHE.clear()
+        self.environ.stop()
+
+    def _cold_distribution_time(self, n_rows: int) -> float:
+        """Time of distribution_mc on data it has never seen"""
+        def run(data):
+            with patch('so_lib.analysis.load_data', return_value=data):
+                distribution_mc('LanguageHaveWorkedWith')
+        return best_time(run, setup=lambda: fresh_data(n_rows))
+
+    def test_distribution_mc_is_linear_in_rows(self):
+        """Test that 4x the respondents takes well under 16x (quadratic) the time"""
+        small = self._cold_distribution_time(N_ROWS // 4)
+        large = self._cold_distribution_time(N_ROWS)
+        self.assertLess(large / small, 10, f"{N_ROWS // 4} rows: {small:.4f}s, {N_ROWS} rows: {large:.4f}s")
+
+    def test_cached_calls_are_100x_faster(self):
+        """Test that repeated distributions reuse the cached indexes"""
+        data = fresh_data(N_ROWS)
+        for function, question_id in ((distribution_mc, 'LanguageHaveWorkedWith'), (distribution_sc, 'RemoteWork')):
+            with patch('so_lib.analysis.load_data', return_value=data), \
+                    patch('so_lib.analysis.query_backend', return_value=None):
+                start = time.perf_counter()
+                first = function(question_id)
+                cold = time.perf_counter() - start
+                warm = best_time(lambda _: function(question_id), repeat=5)
+                self.assertEqual(function(question_id)['distribution'], first['distribution'])
+
+            self.assertGreater(cold / warm, 100, f"{question_id}: first {cold:.5f}s, cached {warm:.6f}s")
+
+    def test_one_read_excel_per_cli_command(self):
+        """Test that every CLI command parses the workbook exactly once"""
+        commands = [
+            ['distribution-sc', 'RemoteWork'],
+            ['distribution-mc', 'LanguageHaveWorkedWith'],
+            ['subset', '--where', 'LanguageHaveWorkedWith has "Rust" and Age == "25-34 years old"'],
+            ['ordinal', 'Age', '--by', 'RemoteWork'],
+        ]
+        for command in commands:
+            core._DATA_CACHE.clear()
+            with patch('pandas.read_excel', wraps=pd.read_excel) as read_excel, \
+                    patch('sys.argv', ['so_lib'] + command + ['--data-path', self.workbook]), \
+                    patch('sys.stdout', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+
+            self.assertEqual(cm.exception.code, 0, command)
+            self.assertEqual(read_excel.call_count, 1, command)
+
+    def test_repeated_loads_do_not_parse_again(self):
+        """Test that later calls in the same process reuse the parsed workbook"""
+        with patch('pandas.read_excel', wraps=pd.read_excel) as read_excel:
+            with core.use_data(self.workbook):
+                for _ in range(3):
+                    distribution_sc('RemoteWork')
+                    distribution_mc('LanguageHaveWorkedWith')
+
+        self.assertEqual(read_excel.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
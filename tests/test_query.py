@@ -0,0 +1,93 @@
+"""
+Unit tests for the query module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import pandas as pd
+
+from so_lib.query import parse_query, And, Or, Not, Predicate
+
+class TestQuery(unittest.TestCase):
+    """Test cases for query.py module"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.raw_data = pd.DataFrame({
+            'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+            'Q2': [
+                'Option X;Option Y',
+                'Option Z',
+                'Option X',
+                'Option Y;Option Z'
+            ],
+            'Q3': ['Yes', 'No', 'Yes', None],
+            'Years': [1, 12, 5, None]
+        })
+
+    def test_parse_structure(self):
+        """Test that expressions parse into the expected node tree"""
+        query = parse_query('Q1 == "Option A" and (Q2 has "Option X" or not Q3 == "No")')
+        self.assertIsInstance(query.root, And)
+        self.assertIsInstance(query.root.children[0], Predicate)
+        self.assertIsInstance(query.root.children[1], Or)
+        self.assertIsInstance(query.root.children[1].children[1], Not)
+        self.assertEqual(query.columns, ['Q1', 'Q2', 'Q3'])
+
+    def test_parse_is_cached(self):
+        """Test that the same expression is only parsed once"""
+        self.assertIs(parse_query('Q1 == "Option A"'), parse_query('Q1 == "Option A"'))
+
+    def test_equality_and_membership(self):
+        """Test ==, != and in predicates"""
+        self.assertEqual(parse_query('Q1 == "Option A"').mask(self.raw_data).tolist(),
+                         [True, False, True, False])
+        # != only matches respondents who answered
+        self.assertEqual(parse_query('Q3 != "Yes"').mask(self.raw_data).tolist(),
+                         [False, True, False, False])
+        self.assertEqual(parse_query("Q1 in ('Option B', 'Option C')").mask(self.raw_data).tolist(),
+                         [False, True, False, True])
+
+    def test_has_matches_exact_tokens(self):
+        """Test that has matches whole ;-delimited options"""
+        self.assertEqual(parse_query('Q2 has "Option Y"').mask(self.raw_data).tolist(),
+                         [True, False, False, True])
+        self.assertEqual(parse_query('Q2 has "Option"').mask(self.raw_data).tolist(),
+                         [False, False, False, False])
+
+    def test_numeric_comparison(self):
+        """Test numeric comparison predicates"""
+        self.assertEqual(parse_query('Years >= 5').mask(self.raw_data).tolist(),
+                         [False, True, True, False])
+
+        # Numbers stored as text match numeric membership, as they do ==
+        raw_data = pd.DataFrame({'Years': ['5', '3', '1', None, 'Less than 1 year']})
+        self.assertEqual(parse_query('Years in (1, 5)').mask(raw_data).tolist(),
+                         [True, False, True, False, False])
+        self.assertEqual(parse_query("Years in (3, 'Less than 1 year')").mask(raw_data).tolist(),
+                         [False, True, False, False, True])
+        self.assertEqual(parse_query('Years in (1, 12)').mask(self.raw_data).tolist(),
+                         [True, True, False, False])
+
+    def test_boolean_combinations(self):
+        """Test and/or/not combinations"""
+        mask = parse_query('Q1 == "Option A" and Q2 has "Option X" and Q3 == "Yes"').mask(self.raw_data)
+        self.assertEqual(mask.tolist(), [True, False, True, False])
+
+        mask = parse_query('Q1 == "Option C" or Q2 has "Option Z"').mask(self.raw_data)
+        self.assertEqual(mask.tolist(), [False, True, False, True])
+
+        mask = parse_query('not (Q1 == "Option A" or Q3 == "No")').mask(self.raw_data)
+        self.assertEqual(mask.tolist(), [False, False, False, True])
+
+    def test_invalid_queries(self):
+        """Test that invalid expressions raise ValueError"""
+        for expression in ['', 'Q1 ==', 'Q1 "A"', 'Q1 == "A" and', 'Q1 < "A"', '(Q1 == "A"']:
+            with self.assertRaises(ValueError):
+                parse_query(expression)
+
+        with self.assertRaises(ValueError):
+            parse_query('Missing == "A"').mask(self.raw_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the report module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib.report import build_report, render_section, report_sections, svg_bar_chart
+
+class TestReport(unittest.TestCase):
+    """Test cases for report.py module"""
+
+    def setUp(self):
+        """Create test data and a temporary directory for reports and cache files"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp_dir.name)
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': str(self.dir / 'cache')})
+        self.environ.start()
+
+        self.data = {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2', 'Q3'],
+                'question_text': ['Test question 1?', 'Test multiple-choice question?', 'Another <test> question?'],
+                'type': ['SC', 'MC', 'SC']
+            }),
+            'raw data': pd.DataFrame({
+                'Q1': ['Option A', 'Option B', 'Option A', 'Option C'],
+                'Q2': ['Option X;Option Y', 'Option Z', 'Option X', 'Option Y;Option Z'],
+                'Q3': ['Yes', 'No', 'Yes', 'Yes']
+            })
+        }
+        self.patches = [
+            patch('so_lib.report.load_data', side_effect=lambda *args, **kwargs: self.data),
+            patch('so_lib.analysis.load_data', side_effect=lambda *args, **kwargs: self.data),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        """Restore load_data and remove the temporary files"""
+        for p in self.patches:
+            p.stop()
+        self.tmp_dir.cleanup()
+        self.environ.stop()
+
+    def test_report_sections(self):
+        """Test the results computed for each section"""
+        sections = report_sections(crosstabs=[('Q1', 'Q3')])
+        self.assertEqual([s['id'] for s in sections],
+                         ['distribution:Q1', 'distribution:Q2', 'distribution:Q3', 'crosstab:Q1:Q3'])
+        self.assertEqual(sections[0]['rows'][0], ['Option A', 50.0])
+        self.assertEqual(sections[3]['columns'], ['Yes', 'No'])
+        self.assertEqual(sections[3]['rows'][0], ['Option A', [100.0, 0.0]])
+
+        sections = report_sections(['Q2'], top=2)
+        self.assertEqual(len(sections[0]['rows']), 2)
+
+    def test_render_section(self):
+        """Test HTML with SVG charts and Markdown tables"""
+        section = report_sections(['Q3'])[0]
+        fragment = render_section(section, 'html')
+        self.assertIn('<svg', fragment)
+        self.assertIn('Another &lt;test&gt; question?', fragment)
+        self.assertIn('75.0%', fragment)
+
+        fragment = render_section(section, 'markdown')
+        self.assertIn('## Q3', fragment)
+        self.assertIn('| Yes | 75.0% |', fragment)
+
+        self.assertEqual(svg_bar_chart([('a', 10.0), ('b', 5.0)]).count('<rect'), 2)
+
+    def test_build_report_is_incremental(self):
+        """Test that a rebuild only renders sections whose results changed"""
+        output = self.dir / 'report.html'
+        summary = build_report(str(output), crosstabs=[('Q1', 'Q2')], jobs=2)
+        self.assertEqual((summary['sections'], summary['rendered'], summary['reused']), (4, 4, 0))
+        document = output.read_text(encoding='utf-8')
+        self.assertTrue(document.startswith('<!DOCTYPE html>'))
+        self.assertIn('href="#distribution:Q2"', document)
+
+        summary = build_report(str(output), crosstabs=[('Q1', 'Q2')], jobs=1)
+        self.assertEqual((summary['rendered'], summary['reused']), (0, 4))
+        self.assertEqual(output.read_text(encoding='utf-8'), document)
+
+        # A changed answer re-renders only the sections that depend on it
+        self.data['raw data'] = self.data['raw data'].assign(Q3=['Yes', 'No', 'No', 'Yes'])
+        summary = build_report(str(output), crosstabs=[('Q1', 'Q2')], jobs=1)
+        self.assertEqual((summary['rendered'], summary['reused']), (1, 3))
+
+        markdown = self.dir / 'report.md'
+        build_report(str(markdown), question_ids=['Q1'], jobs=1)
+        self.assertTrue(markdown.read_text(encoding='utf-8').startswith('# Stack Overflow Developer Survey'))
+
+        with self.assertRaises(ValueError):
+            build_report(str(output), report_format='pdf')
+
+    def test_build_report_without_cache_directory(self):
+        """Test that a report is still written when the cache directory can't be created"""
+        blocker = self.dir / 'blocker'
+        blocker.write_text('not a directory', encoding='utf-8')
+        output = self.dir / 'report.md'
+        with patch.dict(os.environ, {'SO_CACHE_DIR': str(blocker / 'cache')}):
+            for _ in range(2):
+                summary = build_report(str(output), jobs=1)
+                self.assertEqual((summary['rendered'], summary['reused']), (3, 0))
+        self.assertIn('## Q1', output.read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
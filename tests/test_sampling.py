@@ -0,0 +1,95 @@
+"""
+Unit tests for the sampling module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib.analysis import count_respondents, distribution_mc, distribution_sc
+from so_lib.sampling import Estimate, draw_sample, sample_size
+
+class TestSampling(unittest.TestCase):
+    """Test cases for sampling.py module"""
+
+    def setUp(self):
+        """Create a two-year dataset large enough to sample from"""
+        rng = np.random.default_rng(7)
+        n_rows = 20000
+        self.raw_data = pd.DataFrame({
+            'Year': rng.choice([2023, 2024], n_rows, p=[0.25, 0.75]),
+            'Q1': rng.choice(['Option A', 'Option B', 'Option C', None], n_rows, p=[0.5, 0.2, 0.1, 0.2]),
+            'Q2': rng.choice(['Option X;Option Y', 'Option Y', 'Option Z;Option X', None], n_rows)
+        })
+        self.schema = pd.DataFrame({
+            'column': ['Year', 'Q1', 'Q2'],
+            'question_text': ['Survey year?', 'Test question 1?', 'Test multiple-choice question?'],
+            'type': ['TE', 'SC', 'MC']
+        })
+        self.test_data = {'raw data': self.raw_data, 'schema': self.schema}
+
+    def test_sample_size(self):
+        """Test fractions and row counts"""
+        self.assertEqual(sample_size(0.1, 20000), 2000)
+        self.assertEqual(sample_size(500, 20000), 500)
+        self.assertEqual(sample_size(50000, 20000), 20000)
+
+        for invalid in (0.0, 1.5, 0, -3, '10', True):
+            with self.assertRaises(ValueError):
+                sample_size(invalid, 20000)
+
+    def test_draw_sample(self):
+        """Test that samples are stratified, deterministic and cached"""
+        drawn = draw_sample(self.raw_data, 0.1, seed=3)
+        self.assertEqual(len(drawn), 2000)
+        self.assertIs(draw_sample(self.raw_data, 2000, seed=3), drawn)
+        self.assertTrue(np.all(np.diff(drawn.rows) > 0))
+        pd.testing.assert_frame_equal(drawn.frame, self.raw_data.iloc[drawn.rows].reset_index(drop=True))
+
+        # Each year is represented in proportion to its size
+        years = self.raw_data['Year'].value_counts()
+        sampled_years = drawn.frame['Year'].value_counts()
+        for year, count in years.items():
+            self.assertLessEqual(abs(sampled_years[year] - count / 10), 1)
+
+        other = draw_sample(self.raw_data, 0.1, seed=4)
+        self.assertFalse(np.array_equal(other.rows, drawn.rows))
+
+    def test_sampled_distributions(self):
+        """Test that estimates are within their margins of the exact values"""
+        with patch('so_lib.analysis.load_data', return_value=self.test_data):
+            for function, question_id in ((distribution_sc, 'Q1'), (distribution_mc, 'Q2')):
+                exact = function(question_id)
+                estimated = function(question_id, sample=0.2, seed=1)
+
+                self.assertNotIn('margin', exact)
+                self.assertEqual(estimated['sample']['size'], 4000)
+                self.assertEqual(set(estimated['distribution']), set(exact['distribution']))
+                for option, percentage in estimated['distribution'].items():
+                    margin = estimated['margin'][option]
+                    self.assertGreater(margin, 0)
+                    self.assertLess(abs(percentage - exact['distribution'][option]), 2 * margin)
+
+                # The whole population is an exact answer
+                everyone = function(question_id, sample=1.0)
+                for option, percentage in exact['distribution'].items():
+                    self.assertAlmostEqual(everyone['distribution'][option], percentage)
+                    self.assertAlmostEqual(everyone['margin'][option], 0)
+
+    def test_count_respondents(self):
+        """Test exact and estimated subset counts"""
+        with patch('so_lib.analysis.load_data', return_value=self.test_data):
+            exact = count_respondents('Q2 has "Option X"')
+            self.assertEqual(exact, int(self.raw_data['Q2'].str.contains('Option X', na=False).sum()))
+
+            estimate = count_respondents('Q2 has "Option X"', sample=0.2, seed=2)
+            self.assertIsInstance(estimate, Estimate)
+            self.assertLess(abs(estimate.value - exact), 2 * estimate.margin)
+
+            self.assertEqual(count_respondents(sample=0.2), Estimate(20000.0, 0.0))
+            with self.assertRaises(ValueError):
+                count_respondents('Q9 == "x"', sample=0.2)
+
+if __name__ == '__main__':
+    unittest.main()
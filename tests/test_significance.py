@@ -0,0 +1,100 @@
+"""
+Unit tests for the significance module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from scipy import stats
+from unittest.mock import patch
+
+from so_lib.significance import adjust_p_values, compare, compare_all
+
+class TestSignificance(unittest.TestCase):
+    """Test cases for significance.py module"""
+
+    def setUp(self):
+        """Create two segments of different sizes with known answers"""
+        # Segment Pro: 60 respondents, Segment Learn: 40 respondents
+        remote = ['Remote'] * 45 + ['Office'] * 15 + ['Remote'] * 10 + ['Office'] * 26 + [None] * 4
+        langs = ['Python;SQL'] * 30 + ['SQL'] * 30 + ['Python'] * 35 + [None] * 5
+        self.test_data = {
+            'schema': pd.DataFrame({
+                'column': ['Branch', 'Remote', 'Lang'],
+                'question_text': ['Branch?', 'Where do you work?', 'Languages?'],
+                'type': ['SC', 'SC', 'MC']
+            }),
+            'raw data': pd.DataFrame({
+                'Branch': ['Pro'] * 60 + ['Learn'] * 40,
+                'Remote': remote,
+                'Lang': langs
+            })
+        }
+        self.patcher = patch('so_lib.analysis.load_data', return_value=self.test_data)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Stop patching load_data"""
+        self.patcher.stop()
+
+    def test_compare_sc(self):
+        """Test per-option z-tests and chi-square tests for a single-choice question"""
+        result = compare('Remote', 'Branch == "Pro"', 'Branch == "Learn"', correction='none')
+        self.assertEqual(result['respondents_a'], 60)
+        self.assertEqual(result['respondents_b'], 40)
+
+        table = result['results']
+        self.assertEqual(table.loc['Remote', 'count_a'], 45)
+        self.assertAlmostEqual(table.loc['Remote', 'pct_a'], 75.0)
+        self.assertAlmostEqual(table.loc['Remote', 'pct_b'], 10 / 36 * 100)
+
+        # Pooled two-proportion z-test
+        p = 55 / 96
+        z = (45 / 60 - 10 / 36) / np.sqrt(p * (1 - p) * (1 / 60 + 1 / 36))
+        self.assertAlmostEqual(table.loc['Remote', 'statistic'], z)
+        self.assertAlmostEqual(table.loc['Remote', 'p_value'], 2 * stats.norm.sf(abs(z)))
+        self.assertTrue(table.loc['Remote', 'significant'])
+
+        # Matches scipy's 2x2 chi-square test with Yates' correction
+        result = compare('Remote', 'Branch == "Pro"', 'Branch == "Learn"', test='chi2')
+        expected = stats.chi2_contingency([[45, 15], [10, 26]], correction=True)
+        self.assertAlmostEqual(result['results'].loc['Remote', 'statistic'], expected[0])
+        self.assertAlmostEqual(result['results'].loc['Remote', 'p_value'], expected[1])
+
+    def test_compare_mc(self):
+        """Test that multiple-choice shares are relative to the whole segment"""
+        table = compare('Lang', 'Branch == "Pro"', 'Branch == "Learn"')['results']
+        self.assertAlmostEqual(table.loc['SQL', 'pct_a'], 100.0)
+        self.assertAlmostEqual(table.loc['SQL', 'pct_b'], 0.0)
+        self.assertAlmostEqual(table.loc['Python', 'pct_b'], 35 / 40 * 100)
+        self.assertTrue(table['significant'].all())
+
+    def test_adjust_p_values(self):
+        """Test multiple-comparison corrections"""
+        p = np.array([0.01, 0.04, 0.03, 0.005])
+        np.testing.assert_allclose(adjust_p_values(p, 'bonferroni'), [0.04, 0.16, 0.12, 0.02])
+        np.testing.assert_allclose(adjust_p_values(p, 'holm'), [0.03, 0.06, 0.06, 0.02])
+        np.testing.assert_allclose(adjust_p_values(p, 'fdr_bh'), [0.02, 0.04, 0.04, 0.02])
+        np.testing.assert_allclose(adjust_p_values(p, 'none'), p)
+        with self.assertRaises(ValueError):
+            adjust_p_values(p, 'sidak')
+
+    def test_compare_all(self):
+        """Test comparing segments on every question in one batch"""
+        table = compare_all('Branch == "Pro"', 'Branch == "Learn"', correction='bonferroni')
+        self.assertEqual(set(table['question_id']), {'Branch', 'Remote', 'Lang'})
+        self.assertTrue((np.diff(table['p_adjusted']) >= 0).all())
+
+        single = compare('Remote', 'Branch == "Pro"', 'Branch == "Learn"', correction='none')['results']
+        rows = table[table['question_id'] == 'Remote'].set_index('option')
+        np.testing.assert_allclose(rows['p_value'], single.loc[rows.index, 'p_value'])
+        np.testing.assert_allclose(rows['p_adjusted'], np.minimum(rows['p_value'] * len(table), 1))
+
+        with self.assertRaises(ValueError):
+            compare('Remote', 'Branch == "Pro"', 'Branch == "Learn"', test='t')
+        with self.assertRaises(ValueError):
+            compare('Missing', 'Branch == "Pro"', 'Branch == "Learn"')
+
+
+if __name__ == '__main__':
+    unittest.main()
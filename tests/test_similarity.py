@@ -0,0 +1,97 @@
+"""
+Unit tests for the similarity module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib.similarity import cluster_respondents, encode_respondents, similar_respondents
+
+class TestSimilarity(unittest.TestCase):
+    """Test cases for similarity.py module"""
+
+    def setUp(self):
+        """Create two obvious personas plus some respondents in between"""
+        front = {'Role': 'Frontend', 'Lang': 'JavaScript;TypeScript;CSS', 'Remote': 'Yes'}
+        data = {'Role': 'Data', 'Lang': 'Python;SQL', 'Remote': 'No'}
+        rows = [front] * 20 + [data] * 20 + [
+            {'Role': 'Frontend', 'Lang': 'JavaScript;Python', 'Remote': 'No'},
+            {'Role': None, 'Lang': None, 'Remote': None},
+        ]
+        self.raw_data = pd.DataFrame(rows)
+        self.raw_data.insert(0, 'ResponseId', np.arange(100, 100 + len(rows)))
+        self.test_data = {
+            'schema': pd.DataFrame({
+                'column': ['ResponseId', 'Role', 'Lang', 'Remote'],
+                'question_text': ['ID', 'Role?', 'Languages?', 'Remote?'],
+                'type': ['TE', 'SC', 'MC', 'SC']
+            }),
+            'raw data': self.raw_data
+        }
+        self.patcher = patch('so_lib.similarity.load_data', return_value=self.test_data)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Stop patching load_data"""
+        self.patcher.stop()
+
+    def test_encode_respondents(self):
+        """Test the sparse binary encoding of SC and MC answers"""
+        features = encode_respondents()
+        self.assertEqual(features.matrix.shape, (42, 9))
+        self.assertEqual(features.labels[:2], ['Role: Frontend', 'Role: Data'])
+        self.assertEqual(features.sizes[0], 5)
+        self.assertEqual(features.sizes[40], 4)
+        self.assertEqual(features.sizes[41], 0)
+        self.assertIs(encode_respondents(), features)
+
+        with self.assertRaises(ValueError):
+            encode_respondents(['Missing'])
+
+    def test_similar_respondents(self):
+        """Test nearest neighbours against brute-force similarities"""
+        neighbours = similar_respondents(40, n=3, metric='jaccard')
+        self.assertEqual(neighbours['row'].tolist(), [40, 40, 40])
+        self.assertNotIn(40, neighbours['neighbor'].tolist())
+
+        # Row 40 shares Frontend + JavaScript with personas of size 5 (2 / 7),
+        # and Python + No with personas of size 4 (2 / 6)
+        self.assertTrue((neighbours['neighbor'] >= 20).all())
+        self.assertAlmostEqual(neighbours['similarity'].iloc[0], 2 / 6)
+        self.assertEqual(neighbours['respondent_id'].iloc[0], 100 + neighbours['neighbor'].iloc[0])
+
+        cosine = similar_respondents([0, 25], n=2)
+        self.assertEqual(len(cosine), 4)
+        self.assertTrue((cosine['similarity'] == 1.0).all())
+        self.assertTrue((cosine[cosine['row'] == 0]['neighbor'] < 20).all())
+
+        with self.assertRaises(ValueError):
+            similar_respondents(42)
+        with self.assertRaises(ValueError):
+            similar_respondents(0, metric='euclidean')
+
+    def test_cluster_respondents(self):
+        """Test that mini-batch k-means separates the personas"""
+        result = cluster_respondents(k=2, batch_size=16, iterations=20, seed=1)
+        labels = result['labels']
+        self.assertEqual(len(labels), 42)
+        self.assertEqual(len(set(labels[:20])), 1)
+        self.assertEqual(len(set(labels[20:40])), 1)
+        self.assertNotEqual(labels[0], labels[20])
+        self.assertEqual(result['sizes'].sum(), 42)
+
+        front = labels[0]
+        self.assertAlmostEqual(result['centers'].loc[front, 'Remote: Yes'], 20 / result['sizes'][front])
+        self.assertIn('Lang: TypeScript', [feature for feature, _, _ in result['profiles'][front]])
+
+        again = cluster_respondents(k=2, batch_size=16, iterations=20, seed=1)
+        np.testing.assert_array_equal(again['labels'], labels)
+
+        with self.assertRaises(ValueError):
+            cluster_respondents(k=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the subset module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from so_lib.query import Predicate
+from so_lib.subset import Subset
+
+class TestSubset(unittest.TestCase):
+    """Test cases for subset.py module"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.schema = pd.DataFrame({
+            'column': ['Q1', 'Q2', 'Q3'],
+            'question_text': ['Test question 1?', 'Test multiple-choice question?', 'Another test question?'],
+            'type': ['SC', 'MC', 'SC']
+        })
+        self.raw_data = pd.DataFrame({
+            'Q1': ['Option A', 'Option B', 'Option A', 'Option C', None],
+            'Q2': ['Option X;Option Y', 'Option Z', 'Option X', 'Option Y;Option Z', None],
+            'Q3': ['Yes', 'No', 'Yes', 'Yes', 'No']
+        })
+        self.view = Subset(self.raw_data, self.schema)
+
+    def test_count_and_chaining(self):
+        """Test counting and narrowing a view without copying rows"""
+        self.assertEqual(self.view.count(), 5)
+
+        yes = self.view.where('Q3 == "Yes"')
+        self.assertEqual(yes.count(), 3)
+        self.assertEqual(yes.rows.tolist(), [0, 2, 3])
+
+        chained = yes.select('Q2', 'Option Y')
+        self.assertEqual(chained.rows.tolist(), [0, 3])
+        self.assertEqual(chained.select('Q1', 'Option C').rows.tolist(), [3])
+        self.assertEqual(self.view.select('Q2', 'Option', match='contains').count(), 4)
+
+        # Views are independent of each other and can't be modified in place
+        self.assertEqual(yes.count(), 3)
+        with self.assertRaises(ValueError):
+            chained.rows[0] = 1
+
+    def test_where_tests_only_subset_rows(self):
+        """Test that narrowing a subset evaluates the filter on its rows only"""
+        yes = self.view.where('Q3 == "Yes"')
+        evaluate = Predicate.evaluate
+        with patch.object(Predicate, 'evaluate', autospec=True, side_effect=evaluate) as predicate:
+            narrowed = yes.where('Q1 == "Option A"')
+
+        self.assertEqual(narrowed.rows.tolist(), [0, 2])
+        self.assertEqual(predicate.call_args.args[2].tolist(), [0, 2, 3])
+
+    def test_column_and_distribution(self):
+        """Test reading one column and distributions of a view"""
+        yes = self.view.where('Q3 == "Yes"')
+        self.assertEqual(yes.column('Q1').tolist(), ['Option A', 'Option A', 'Option C'])
+
+        dist = yes.distribution('Q1')
+        self.assertEqual(dist['question_text'], 'Test question 1?')
+        self.assertAlmostEqual(dist['distribution']['Option A'], 2 / 3 * 100)
+
+        # Multiple-choice percentages are relative to all respondents in the view
+        dist = yes.distribution('Q2')
+        self.assertAlmostEqual(dist['distribution']['Option X'], 2 / 3 * 100)
+        self.assertAlmostEqual(dist['distribution']['Option Z'], 1 / 3 * 100)
+
+        empty = self.view.select('Q1', 'Option D')
+        self.assertEqual(empty.count(), 0)
+        self.assertEqual(empty.distribution('Q2')['distribution'], {})
+
+        with self.assertRaises(ValueError):
+            yes.column('Unknown')
+
+    def test_to_frame(self):
+        """Test materializing a view"""
+        frame = self.view.where('Q1 == "Option A"').to_frame(['Q1', 'Q3'])
+        self.assertEqual(list(frame.columns), ['Q1', 'Q3'])
+        self.assertEqual(frame.index.tolist(), [0, 2])
+
+        chunks = list(self.view.iter_frames(2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        pd.testing.assert_frame_equal(pd.concat(chunks), self.raw_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for the text module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib.subset import Subset
+from so_lib.text import TextIndex, build_text_index, search_text, text_index, tokenize
+
+class TestText(unittest.TestCase):
+    """Test cases for text.py module"""
+
+    def setUp(self):
+        """Create a dataset with free-text answers and a temporary cache directory"""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {'SO_CACHE_DIR': self.cache_dir.name})
+        self.environ.start()
+
+        self.schema = pd.DataFrame({
+            'column': ['ResponseId', 'Country', 'OtherTools', 'Comments'],
+            'question_text': ['Response ID', 'Country?', 'Other tools?', 'Any comments?'],
+            'type': ['SC', 'SC', 'TE', 'TE']
+        })
+        self.raw_data = pd.DataFrame({
+            'ResponseId': [101, 102, 103, 104, 105],
+            'Country': ['DE', 'US', 'DE', 'US', 'DE'],
+            'OtherTools': ['Kubernetes operators', 'Terraform', None, 'kubernetes, KUBERNETES and helm', 'Vim'],
+            'Comments': ['Testing is hard', None, 'I tested Terraform', 'Great survey', None]
+        })
+        self.data_path = Path(self.cache_dir.name) / 'survey.xlsx'
+        self.data_path.write_bytes(b'placeholder')
+
+        data = {'schema': self.schema, 'raw data': self.raw_data}
+        from so_lib import text
+        self.module = text
+        self.original_load_data = text.load_data
+        text.load_data = lambda *args, **kwargs: data
+
+    def tearDown(self):
+        """Restore load_data and the cache directory"""
+        self.module.load_data = self.original_load_data
+        self.environ.stop()
+        self.cache_dir.cleanup()
+
+    def test_tokenize(self):
+        """Test tokenization, case folding and stemming"""
+        self.assertEqual(tokenize('Kubernetes, KUBERNETES & C++!'), ['kubernetes', 'kubernetes', 'c'])
+        self.assertEqual(tokenize('Testing tested tests', stem=True)[0], tokenize('test', stem=True)[0])
+        self.assertEqual(len(set(tokenize('Testing tested tests', stem=True))), 1)
+
+    def test_search_ranking(self):
+        """Test BM25 ranking and respondent IDs"""
+        hits = search_text('kubernetes')
+        self.assertEqual(hits['respondent_id'].tolist(), [104, 101])
+        self.assertTrue((np.diff(hits['score']) <= 0).all())
+
+        hits = search_text('kubernetes terraform', top_k=None)
+        self.assertEqual(sorted(hits['row'].tolist()), [0, 1, 2, 3])
+        self.assertTrue(search_text('kubernetes terraform', mode='all').empty)
+
+        # Only the chosen columns are searched
+        self.assertEqual(search_text('terraform', question_ids=['Comments'])['row'].tolist(), [2])
+        self.assertTrue(search_text('nothing matches').empty)
+
+        with self.assertRaises(ValueError):
+            search_text('')
+        with self.assertRaises(ValueError):
+            text_index(['Unknown'])
+
+    def test_stemming_and_join(self):
+        """Test stemmed search and joining hits with a subset view"""
+        index = text_index(stem=True)
+        self.assertEqual(index.rows_matching('test').tolist(), [0, 2])
+        self.assertEqual(text_index().rows_matching('test').tolist(), [])
+
+        view = Subset(self.raw_data, self.schema).where('Country == "DE"')
+        self.assertEqual(view.within(index.rows_matching('kubernetes')).rows.tolist(), [0])
+
+    def test_persisted_index(self):
+        """Test that the index is saved once and reloaded for the same data file"""
+        index = build_text_index(self.raw_data, ['OtherTools', 'Comments'])
+        path = Path(self.cache_dir.name) / 'index.npz'
+        index.save(path, (1, 2))
+
+        loaded, signature = TextIndex.load(path)
+        self.assertEqual(signature, (1, 2))
+        self.assertEqual(loaded.respondent_ids.tolist(), [101, 102, 103, 104, 105])
+        pd.testing.assert_frame_equal(loaded.search('kubernetes helm'), index.search('kubernetes helm'))
+
+        text_index(file_path=str(self.data_path))
+        saved = list(Path(self.cache_dir.name).glob('survey.xlsx.*.text-*.npz'))
+        self.assertEqual(len(saved), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
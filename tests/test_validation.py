@@ -0,0 +1,103 @@
+"""
+Unit tests for the validation module of the Stack Overflow Survey Data Analysis Library.
+"""
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+from so_lib.validation import ValidationReport, check_dataset, dataset_fingerprint, validate_data
+
+class TestValidation(unittest.TestCase):
+    """Test cases for validation.py module"""
+
+    def setUp(self):
+        """Set up a dataset with one of each kind of issue"""
+        self.data = {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q2'],
+                'question_text': ['Single?', 'Multiple?', 'Missing?', 'Mixed?', 'Odd type?', 'Multiple again?'],
+                'type': ['SC', 'MC', 'SC', 'SC', 'XX', 'MC']
+            }),
+            'raw data': pd.DataFrame({
+                'Q1': ['A', 'A;B', 'B', None],
+                'Q2': ['X;Y', 'x;Z', ' Y;Z', 'X;;Y'],
+                'Q4': [1, 'two', 3, None],
+                'Q5': ['a', 'b', 'c', 'd'],
+                'Extra': [1, 2, 3, 4]
+            })
+        }
+        self.clean = {
+            'schema': pd.DataFrame({
+                'column': ['Q1', 'Q2'],
+                'question_text': ['Single?', 'Multiple?'],
+                'type': ['SC', 'MC']
+            }),
+            'raw data': pd.DataFrame({'Q1': ['A', 'B'], 'Q2': ['X;Y', 'Y']})
+        }
+
+    def test_validate_data(self):
+        """Test that each check reports its issue"""
+        report = validate_data(self.data)
+        checks = {(issue['check'], issue['question_id']) for issue in report.issues}
+
+        self.assertIn(('duplicate_question', 'Q2'), checks)
+        self.assertIn(('missing_column', 'Q3'), checks)
+        self.assertIn(('sc_multi_value', 'Q1'), checks)
+        self.assertIn(('dtype', 'Q4'), checks)
+        self.assertIn(('unknown_type', 'Q5'), checks)
+        self.assertIn(('mc_empty_option', 'Q2'), checks)
+        self.assertIn(('mc_whitespace', 'Q2'), checks)
+        self.assertIn(('mc_case_variants', 'Q2'), checks)
+        self.assertIn(('unlisted_column', None), checks)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(len(report.errors), 2)
+        self.assertEqual(list(report.to_frame().columns), ['severity', 'check', 'question_id', 'message'])
+        with self.assertRaises(ValueError):
+            report.raise_for_errors()
+
+        clean = validate_data(self.clean)
+        self.assertTrue(clean.ok)
+        self.assertEqual(clean.issues, [])
+
+        broken = validate_data({'schema': pd.DataFrame({'column': ['Q1']}), 'raw data': pd.DataFrame()})
+        self.assertEqual(broken.errors[0]['check'], 'schema_columns')
+
+    def test_fingerprint(self):
+        """Test that the fingerprint changes with the dataset's structure"""
+        fingerprint = dataset_fingerprint(self.clean, (1, 2))
+        self.assertEqual(fingerprint, dataset_fingerprint(dict(self.clean), (1, 2)))
+        self.assertNotEqual(fingerprint, dataset_fingerprint(self.clean, (1, 3)))
+
+        appended = dict(self.clean, **{'raw data': pd.concat([self.clean['raw data']] * 2)})
+        self.assertNotEqual(fingerprint, dataset_fingerprint(appended, (1, 2)))
+
+        relabelled = dict(self.clean, schema=self.clean['schema'].assign(type=['SC', 'SC']))
+        self.assertNotEqual(fingerprint, dataset_fingerprint(relabelled, (1, 2)))
+
+    def test_check_dataset_skips_revalidation(self):
+        """Test that an unchanged dataset only compares fingerprints"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'report.json'
+            report = check_dataset(self.data, path, (1, 2))
+            self.assertTrue(path.exists())
+
+            with patch('so_lib.validation.validate_data') as validate:
+                stored = check_dataset(self.data, path, (1, 2))
+                validate.assert_not_called()
+            self.assertEqual(stored.issues, report.issues)
+            self.assertEqual(stored.fingerprint, report.fingerprint)
+
+            with patch('so_lib.validation.validate_data', wraps=validate_data) as validate:
+                check_dataset(self.data, path, (1, 3))
+                validate.assert_called_once()
+
+            self.assertIsInstance(ValidationReport.load(path), ValidationReport)
+
+
+if __name__ == '__main__':
+    unittest.main()